@@ -44,20 +44,31 @@ INSTALLED_APPS = [
 ]
 
 # Configuración de Django-Q2
+# Las tareas pasan casi todo el tiempo esperando HTTP/navegador: más workers que CPUs
+Q_WORKERS = int(os.environ.get('Q_WORKERS', 8))
+
 Q_CLUSTER = {
     'name': 'sistema_reportes',
-    'workers': 4,        # Cuántas tareas simultáneas puede procesar
+    'workers': Q_WORKERS,
     'recycle': 500,      # Reinicia workers cada 500 tareas (libera memoria)
     'timeout': 28800,    # Aumentado a 8h por volumen de datos y rate limits
     'retry': 86400,      # 24h - en la práctica nunca reintenta (debe ser > timeout)
+    'max_attempts': 1,   # Una tarea fallida no se vuelve a encolar
     'orm': 'default',    # Usa tu DB, no Redis
     'save_limit': 250,   # Cuántas tareas exitosas guarda en el historial
-    'queue_limit': 500,  # Límite de la cola
-    'cpu_affinity': 1,   # Optimización de CPU
+    'queue_limit': Q_WORKERS,  # No reservar más tareas de las que se pueden correr a la vez
+    'bulk': 1,           # De a una tarea por lectura: son largas y no conviene acapararlas
     'label': 'Django Q',
     'sync': False,       # Modo asíncrono: requiere worker separado
 }
 
+# Concurrencia de servicios
+VTEX_SELLER_WORKERS = 32  # Requests simultáneas al buscar sellers de pedidos VTEX
+CARREFOUR_EAN_WORKERS = 3  # Búsquedas de EANs en paralelo si la tarea no indica otra cantidad
+CARREFOUR_EAN_WORKERS_MAX = 5  # Tope de búsquedas de EANs en paralelo por tarea (un navegador cada una)
+CARREFOUR_CATEGORIA_WORKERS = 5  # Búsquedas de categorías en paralelo por tarea
+TAREAS_IO_WORKERS = 16  # Hilos para I/O bloqueante (asyncio.to_thread) dentro de cada worker de Django-Q
+
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -1,5 +1,40 @@
+import atexit
+import logging
+import os
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
 from django.apps import AppConfig
 
 
+def _loguear_en_segundo_plano() -> None:
+    """
+    Pasa los handlers del logger raiz (consola y debug.log) detras de un
+    QueueListener: los logs solo se encolan y la escritura ocurre en un hilo
+    aparte, sin frenar el event loop de las tareas.
+    """
+    raiz = logging.getLogger()
+    handlers = [handler for handler in raiz.handlers if not isinstance(handler, QueueHandler)]
+    if not handlers:
+        return
+    cola: queue.SimpleQueue = queue.SimpleQueue()
+    listener = QueueListener(cola, *handlers, respect_handler_level=True)
+    for handler in handlers:
+        raiz.removeHandler(handler)
+    raiz.addHandler(QueueHandler(cola))
+    listener.start()
+    atexit.register(listener.stop)
+    # Los workers de Django-Q que se forkean no heredan el hilo del listener
+    if hasattr(os, 'register_at_fork'):
+        os.register_at_fork(after_in_child=listener.start)
+
+
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self) -> None:
+        # Solo el cluster de Django-Q corre tareas en un event loop; runserver,
+        # migrate o pytest conservan sus handlers tal cual
+        if 'qcluster' in sys.argv:
+            _loguear_en_segundo_plano()
@@ -210,6 +210,19 @@ class ReporteVtex(models.Model):
     def __str__(self) -> str:
         return f"Reporte VTEX #{self.id} ({self.fecha_inicio} - {self.fecha_fin})"
 
+    @classmethod
+    def con_filtros(cls) -> QuerySet[ReporteVtex]:
+        """
+        Reportes con sus filtros_aplicados precargados (tipo y valor incluidos),
+        para recorrerlos sin una consulta por reporte ni por filtro.
+        """
+        return cls.objects.prefetch_related(
+            models.Prefetch(
+                'filtros_aplicados',
+                queryset=FiltroReporteVtex.objects.select_related('tipo_filtro', 'valor_filtro'),
+            )
+        )
+
     def obtener_filtros_por_tipo(self, codigo_tipo: str) -> QuerySet[ValorFiltroVtex]:
         """
         Obtiene los valores de filtro aplicados para un tipo específico.
@@ -233,7 +246,12 @@ class ReporteVtex(models.Model):
             dict: {parametro_api: [valor1, valor2, ...]}
         """
         filtros_api: dict[str, list[str]] = {}
-        for filtro in self.filtros_aplicados.select_related('tipo_filtro', 'valor_filtro').all():
+        # Con ReporteVtex.con_filtros() sale de la precarga, sin consultas;
+        # si no, una sola consulta con el tipo y el valor de cada filtro
+        filtros = self.filtros_aplicados.all()
+        if 'filtros_aplicados' not in getattr(self, '_prefetched_objects_cache', {}):
+            filtros = filtros.select_related('tipo_filtro', 'valor_filtro')
+        for filtro in filtros:
             param = filtro.tipo_filtro.parametro_api
             if param not in filtros_api:
                 filtros_api[param] = []
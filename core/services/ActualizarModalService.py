@@ -16,6 +16,10 @@ logger: logging.Logger = logging.getLogger(__name__)
 
 class ActualizarModalService:
 
+    def __init__(self, sesion_http: requests.Session | None = None) -> None:
+        # Sesión HTTP: el GET y el PUT de cada SKU reutilizan la misma conexión
+        self._http: requests.Session = sesion_http or requests.Session()
+
     async def ejecutar(self, tarea: TareaCatalogacion, lista_skus: list[dict]) -> None:
         """
         Para cada SKU: GET datos actuales, modifica ModalType, PUT datos actualizados.
@@ -47,7 +51,7 @@ class ActualizarModalService:
 
                 # GET datos actuales
                 try:
-                    resp_get = requests.get(f"{base_url}/{sku_id}", headers=headers, timeout=30)
+                    resp_get = self._http.get(f"{base_url}/{sku_id}", headers=headers, timeout=30)
                     if resp_get.status_code != 200:
                         await self._log(tarea, f"Error GET SKU {sku_id}: HTTP {resp_get.status_code}")
                         resultados.append({
@@ -73,7 +77,7 @@ class ActualizarModalService:
                 # Modificar ModalType y PUT
                 datos_sku['ModalType'] = modal_nuevo
                 try:
-                    resp_put = requests.put(f"{base_url}/{sku_id}", headers=headers, json=datos_sku, timeout=30)
+                    resp_put = self._http.put(f"{base_url}/{sku_id}", headers=headers, json=datos_sku, timeout=30)
                     if resp_put.status_code == 200:
                         await self._log(tarea, f"SKU {sku_id} actualizado: {modal_anterior} -> {modal_nuevo}")
                         resultados.append({
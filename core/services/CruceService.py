@@ -51,48 +51,45 @@ class CruceService:
 
             # Actualizar estado a PROCESANDO
             cruce.estado = Cruce.Estado.PROCESANDO
-            await sync_to_async(cruce.save)()
+            await sync_to_async(cruce.save)(update_fields=['estado'])
 
             logger.info(f"Generando cruce #{cruce_id}")
 
-            # Obtener los reportes seleccionados
-            reporte_vtex = None
-            reporte_payway = None
-            reporte_cdp = None
-            reporte_janis = None
-
-            if reporte_vtex_id:
-                reporte_vtex = await sync_to_async(ReporteVtex.objects.get)(id=reporte_vtex_id)
-            if reporte_payway_id:
-                reporte_payway = await sync_to_async(ReportePayway.objects.get)(id=reporte_payway_id)
-            if reporte_cdp_id:
-                reporte_cdp = await sync_to_async(ReporteCDP.objects.get)(id=reporte_cdp_id)
-            if reporte_janis_id:
-                reporte_janis = await sync_to_async(ReporteJanis.objects.get)(id=reporte_janis_id)
-
-            # Obtener las transacciones de cada reporte
+            # Obtener las transacciones de cada reporte seleccionado, filtrando
+            # directo por su ID (sin consultar antes la fila del reporte)
             transacciones_vtex = []
             transacciones_payway = []
             transacciones_cdp = []
             transacciones_janis = []
 
-            if reporte_vtex:
+            if reporte_vtex_id:
                 transacciones_vtex = await sync_to_async(list)(
-                    reporte_vtex.transacciones.all()
+                    TransaccionVtex.objects.filter(reporte_id=reporte_vtex_id)
                 )
-            if reporte_payway:
+            if reporte_payway_id:
                 transacciones_payway = await sync_to_async(list)(
-                    reporte_payway.transacciones.all()
+                    TransaccionPayway.objects.filter(reporte_id=reporte_payway_id)
                 )
-            if reporte_cdp:
+            if reporte_cdp_id:
                 transacciones_cdp = await sync_to_async(list)(
-                    reporte_cdp.transacciones.all()
+                    TransaccionCDP.objects.filter(reporte_id=reporte_cdp_id)
                 )
-            if reporte_janis:
+            if reporte_janis_id:
                 transacciones_janis = await sync_to_async(list)(
-                    reporte_janis.transacciones.all()
+                    TransaccionJanis.objects.filter(reporte_id=reporte_janis_id)
                 )
 
+            # Un reporte seleccionado que ya no existe hace fallar el cruce en
+            # lugar de cruzarlo como si no tuviera transacciones. Solo se
+            # consulta el reporte cuando no trajo transacciones (al borrarlo se
+            # borran en cascada): con datos, el filtro ya probo que existe.
+            await self._verificar_reportes_existen(
+                (ReporteVtex, reporte_vtex_id, 'VTEX', transacciones_vtex),
+                (ReportePayway, reporte_payway_id, 'Payway', transacciones_payway),
+                (ReporteCDP, reporte_cdp_id, 'CDP', transacciones_cdp),
+                (ReporteJanis, reporte_janis_id, 'Janis', transacciones_janis),
+            )
+
             logger.info(
                 f"Transacciones obtenidas - VTEX: {len(transacciones_vtex)}, "
                 f"Payway: {len(transacciones_payway)}, CDP: {len(transacciones_cdp)}, "
@@ -115,7 +112,7 @@ class CruceService:
             # Actualizar estado a COMPLETADO y fecha_realizado
             cruce.estado = Cruce.Estado.COMPLETADO
             cruce.fecha_realizado = date.today()
-            await sync_to_async(cruce.save)()
+            await sync_to_async(cruce.save)(update_fields=['estado', 'fecha_realizado'])
 
             logger.info(
                 f"Cruce #{cruce_id} generado exitosamente. "
@@ -130,11 +127,25 @@ class CruceService:
             logger.error(f"Error al generar cruce #{cruce_id}: {str(e)}", exc_info=True)
             try:
                 cruce.estado = Cruce.Estado.ERROR
-                await sync_to_async(cruce.save)()
+                await sync_to_async(cruce.save)(update_fields=['estado'])
             except:
                 pass
             return False
 
+    @staticmethod
+    async def _verificar_reportes_existen(*reportes: tuple[type, int | None, str, list]) -> None:
+        """
+        Verifica que exista cada reporte seleccionado (modelo, id, nombre,
+        transacciones); los que tienen id None no se seleccionaron y los que
+        trajeron transacciones existen, asi que solo se consultan los vacios.
+
+        Raises:
+            ValueError: Si algún reporte seleccionado ya no existe
+        """
+        for modelo, reporte_id, nombre, transacciones in reportes:
+            if reporte_id and not transacciones and not await sync_to_async(modelo.objects.filter(pk=reporte_id).exists)():
+                raise ValueError(f"El reporte {nombre} #{reporte_id} seleccionado para el cruce ya no existe")
+
     async def cruzar_transacciones(
         self,
         transacciones_vtex: list[TransaccionVtex],
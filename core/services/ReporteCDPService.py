@@ -72,7 +72,7 @@ class ReporteCDPService:
 
             # Actualizar estado a PROCESANDO
             reporte.estado = ReporteCDP.Estado.PROCESANDO
-            await sync_to_async(reporte.save)()
+            await sync_to_async(reporte.save)(update_fields=['estado'])
 
             logger.info(f"Generando reporte CDP desde {fecha_inicio} hasta {fecha_fin}")
 
@@ -93,7 +93,7 @@ class ReporteCDPService:
 
             # Actualizar estado a COMPLETADO
             reporte.estado = ReporteCDP.Estado.COMPLETADO
-            await sync_to_async(reporte.save)()
+            await sync_to_async(reporte.save)(update_fields=['estado'])
 
             logger.info(
                 f"Reporte CDP #{reporte_id} generado exitosamente. "
@@ -108,7 +108,7 @@ class ReporteCDPService:
             logger.error(f"Error de configuracion: {str(e)}")
             try:
                 reporte.estado = ReporteCDP.Estado.ERROR
-                await sync_to_async(reporte.save)()
+                await sync_to_async(reporte.save)(update_fields=['estado'])
             except:
                 pass
             return False
@@ -116,7 +116,7 @@ class ReporteCDPService:
             logger.error(f"Error al generar reporte CDP #{reporte_id}: {str(e)}", exc_info=True)
             try:
                 reporte.estado = ReporteCDP.Estado.ERROR
-                await sync_to_async(reporte.save)()
+                await sync_to_async(reporte.save)(update_fields=['estado'])
             except:
                 pass
             return False
@@ -28,13 +28,15 @@ class ReporteJanisService:
     # Tamaño de página máximo
     PAGE_SIZE = 100
 
-    def __init__(self, ruta_carpeta: str | None = None) -> None:
+    def __init__(self, ruta_carpeta: str | None = None, sesion_http: requests.Session | None = None) -> None:
         """
         Inicializa el servicio de reportes Janis.
 
         Args:
             ruta_carpeta: Ruta donde se guardarán los archivos descargados.
                          Si no se proporciona, usa MEDIA_ROOT de Django.
+            sesion_http: Sesión HTTP a reutilizar (la del worker de Django-Q).
+                         Si no se proporciona, crea una propia.
         """
         if ruta_carpeta is None:
             self.ruta_carpeta: str = settings.MEDIA_ROOT
@@ -43,6 +45,9 @@ class ReporteJanisService:
 
         os.makedirs(self.ruta_carpeta, exist_ok=True)
 
+        # Sesión HTTP: reutiliza la conexión entre páginas de la API
+        self._http: requests.Session = sesion_http or requests.Session()
+
     async def _obtener_credenciales(self) -> UsuarioJanis:
         """
         Obtiene credenciales de Janis desde la base de datos.
@@ -79,7 +84,7 @@ class ReporteJanisService:
 
             # Actualizar estado a PROCESANDO
             reporte.estado = ReporteJanis.Estado.PROCESANDO
-            await sync_to_async(reporte.save)()
+            await sync_to_async(reporte.save)(update_fields=['estado'])
 
             logger.info(f"Generando reporte Janis desde {fecha_inicio} hasta {fecha_fin}")
 
@@ -98,7 +103,7 @@ class ReporteJanisService:
 
             # Actualizar estado a COMPLETADO
             reporte.estado = ReporteJanis.Estado.COMPLETADO
-            await sync_to_async(reporte.save)()
+            await sync_to_async(reporte.save)(update_fields=['estado'])
 
             logger.info(
                 f"Reporte Janis #{reporte_id} generado exitosamente. "
@@ -113,7 +118,7 @@ class ReporteJanisService:
             logger.error(f"Error de configuración: {str(e)}")
             try:
                 reporte.estado = ReporteJanis.Estado.ERROR
-                await sync_to_async(reporte.save)()
+                await sync_to_async(reporte.save)(update_fields=['estado'])
             except:
                 pass
             return False
@@ -121,7 +126,7 @@ class ReporteJanisService:
             logger.error(f"Error al generar reporte Janis #{reporte_id}: {str(e)}", exc_info=True)
             try:
                 reporte.estado = ReporteJanis.Estado.ERROR
-                await sync_to_async(reporte.save)()
+                await sync_to_async(reporte.save)(update_fields=['estado'])
             except:
                 pass
             return False
@@ -262,7 +267,7 @@ class ReporteJanisService:
             headers = self._get_headers(credenciales, page)
 
             try:
-                response = requests.get(url, headers=headers, params=params, timeout=60)
+                response = self._http.get(url, headers=headers, params=params, timeout=60)
                 response.raise_for_status()
             except requests.exceptions.RequestException as e:
                 logger.error(f"Error en request a Janis API: {e}")
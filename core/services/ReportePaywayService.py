@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import asyncio
+
 from asgiref.sync import sync_to_async
 
 from core.models import UsuarioPayway, ReportePayway, TransaccionPayway
@@ -114,15 +116,10 @@ class ReportePaywayService:
             ruta_csv = os.path.join(self.ruta_carpeta, nombre_csv)
             await archivo_descargado.save_as(ruta_csv)
 
-            # Convertir CSV a Excel
-            datos = pd.read_csv(ruta_csv, delimiter="\t", encoding="ISO-8859-1", dtype=str, index_col=False)
-            datos.columns = datos.columns.str.strip()
+            # Convertir CSV a Excel en un hilo, sin frenar el event loop
             nombre_excel = nombre_csv.replace(".csv", ".xlsx")
             ruta_excel = os.path.join(self.ruta_carpeta, nombre_excel)
-            datos.to_excel(ruta_excel, index=False)
-
-            # Eliminar el CSV original para ahorrar espacio
-            os.remove(ruta_csv)
+            await asyncio.to_thread(self._convertir_csv_a_excel, ruta_csv, ruta_excel)
 
             logger.info(f"Archivo convertido exitosamente: {nombre_excel}")
             return ruta_excel
@@ -131,6 +128,14 @@ class ReportePaywayService:
             logger.error(f"Error al descargar y convertir archivo: {e}", exc_info=True)
             return None
 
+    @staticmethod
+    def _convertir_csv_a_excel(ruta_csv: str, ruta_excel: str) -> None:
+        """Convierte el CSV descargado de Payway a Excel y elimina el CSV original para ahorrar espacio."""
+        datos = pd.read_csv(ruta_csv, delimiter="\t", encoding="ISO-8859-1", dtype=str, index_col=False)
+        datos.columns = datos.columns.str.strip()
+        datos.to_excel(ruta_excel, index=False)
+        os.remove(ruta_csv)
+
     async def buscar_dia(self, fecha: datetime, pagina: Page) -> None:
         """
         Configura la búsqueda para un día completo (00:00 - 23:59).
@@ -259,7 +264,7 @@ class ReportePaywayService:
         self,
         fecha_inicio: str,
         fecha_fin: str,
-        nuevo_reporte: ReportePayway
+        reporte_id: int
     ) -> int | None:
         """
         Genera un reporte completo de transacciones para un rango de fechas.
@@ -267,7 +272,7 @@ class ReportePaywayService:
         Args:
             fecha_inicio: Fecha de inicio en formato DD/MM/YYYY.
             fecha_fin: Fecha de fin en formato DD/MM/YYYY.
-            nuevo_reporte: Objeto ReportePayway
+            reporte_id: ID del reporte creado en la base de datos.
 
         Returns:
             int: ID del reporte generado, o None si falla.
@@ -289,10 +294,9 @@ class ReportePaywayService:
             self.contrasena = credenciales_payway.clave
 
             # Actualizar estado a PROCESANDO
-            nuevo_reporte.estado = ReportePayway.Estado.PROCESANDO
-            await sync_to_async(nuevo_reporte.save)()
+            await self._actualizar_estado(reporte_id, ReportePayway.Estado.PROCESANDO)
 
-            logger.info(f"Iniciando generación de reporte {nuevo_reporte.id} desde {fecha_inicio} hasta {fecha_fin}")
+            logger.info(f"Iniciando generación de reporte {reporte_id} desde {fecha_inicio} hasta {fecha_fin}")
 
             async with async_playwright() as navegador:
                 navegador_web = await navegador.chromium.launch(headless=False)
@@ -320,8 +324,10 @@ class ReportePaywayService:
                 if not self.lista_archivos_excel:
                     raise ValueError("No se descargaron archivos de transacciones")
 
-                # Unir todos los archivos Excel en uno solo
-                lista_datos = [pd.read_excel(archivo) for archivo in self.lista_archivos_excel]
+                # Unir todos los archivos Excel en uno solo (se leen en hilos)
+                lista_datos = await asyncio.gather(*(
+                    asyncio.to_thread(pd.read_excel, archivo) for archivo in self.lista_archivos_excel
+                ))
                 datos_finales = pd.concat(lista_datos, ignore_index=True)
 
                 # Eliminar duplicados por id de operación (los intervalos solapados pueden generar repetidos)
@@ -333,19 +339,18 @@ class ReportePaywayService:
                 # Insertar transacciones en la base de datos usando transacción atómica
                 logger.info(f"Insertando {len(datos_finales)} transacciones en la base de datos...")
 
-                await sync_to_async(self.guardar_transacciones_sincrinico)(datos_finales,nuevo_reporte)
+                await sync_to_async(self.guardar_transacciones_sincrinico)(datos_finales, reporte_id)
 
 
-                logger.info(f"Finalizada la generación del reporte {nuevo_reporte.id}")
+                logger.info(f"Finalizada la generación del reporte {reporte_id}")
 
-                return nuevo_reporte.id
+                return reporte_id
 
         except Exception as e:
             logger.error(f"Error al generar reporte: {e}", exc_info=True)
 
             # Actualizar estado a ERROR
-            nuevo_reporte.estado = ReportePayway.Estado.ERROR
-            await sync_to_async(nuevo_reporte.save)()
+            await self._actualizar_estado(reporte_id, ReportePayway.Estado.ERROR)
 
             raise
 
@@ -355,7 +360,12 @@ class ReportePaywayService:
             if navegador_web:
                 logger.info("Proceso de navegación finalizado")
 
-    def guardar_transacciones_sincrinico(self, transacciones: pd.DataFrame, reporte: ReportePayway) -> None:
+    @staticmethod
+    async def _actualizar_estado(reporte_id: int, estado: str) -> None:
+        """UPDATE directo del estado del reporte, sin cargar ni pisar el resto de la fila."""
+        await sync_to_async(ReportePayway.objects.filter(pk=reporte_id).update)(estado=estado)
+
+    def guardar_transacciones_sincrinico(self, transacciones: pd.DataFrame, reporte_id: int) -> None:
         reportes_objeto: list[TransaccionPayway] = []
         for indice, transaccion in transacciones.iterrows():
             # Parsear la fecha del formato DD/MM/YYYY HH:MM:SS al formato de Django
@@ -382,7 +392,7 @@ class ReportePaywayService:
                 monto=monto_str,
                 estado=str(transaccion["Estado"]).strip(),
                 tarjeta=str(transaccion["Tarjeta"]).strip(),
-                reporte=reporte
+                reporte_id=reporte_id
             )
             reportes_objeto.append(transacion_objeto)
             # Log cada 100 transacciones para no saturar el log
@@ -393,5 +403,4 @@ class ReportePaywayService:
         TransaccionPayway.objects.bulk_create(reportes_objeto,batch_size=1000)
 
         # Actualizar estado a COMPLETADO
-        reporte.estado = ReportePayway.Estado.COMPLETADO
-        reporte.save()
+        ReportePayway.objects.filter(pk=reporte_id).update(estado=ReportePayway.Estado.COMPLETADO)
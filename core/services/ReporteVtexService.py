@@ -12,7 +12,10 @@ from datetime import datetime, timedelta
 import asyncio
 import aiohttp
 from aiolimiter import AsyncLimiter
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pandas as pd
 
 logger = logging.getLogger(__name__)
@@ -25,16 +28,19 @@ class ReporteVtexService:
 
     # Rate limiting: 90 requests/segundo = 5400/minuto (margen de seguridad sobre 6000)
     RATE_LIMIT_PER_SECOND = 90
-    # Máximo de conexiones simultáneas abiertas
-    MAX_CONCURRENT_CONNECTIONS = 50
+    # Máximo de conexiones simultáneas abiertas (se puede ajustar con
+    # settings.VTEX_SELLER_WORKERS)
+    MAX_CONCURRENT_CONNECTIONS = 32
 
-    def __init__(self, ruta_carpeta: str | None = None) -> None:
+    def __init__(self, ruta_carpeta: str | None = None, sesion_http: requests.Session | None = None) -> None:
         """
         Inicializa el servicio de reportes VTEX.
 
         Args:
             ruta_carpeta: Ruta donde se guardarán los archivos descargados.
                          Si no se proporciona, usa MEDIA_ROOT de Django.
+            sesion_http: Sesión HTTP a reutilizar (la del worker de Django-Q).
+                         Si no se proporciona, crea una propia.
         """
         # Si no se proporciona ruta, usar MEDIA_ROOT
         if ruta_carpeta is None:
@@ -45,16 +51,48 @@ class ReporteVtexService:
         # Asegurar que el directorio existe
         os.makedirs(self.ruta_carpeta, exist_ok=True)
 
+        # Conexiones simultáneas: el semáforo y el pool de aiohttp usan el mismo valor
+        self.max_conexiones: int = getattr(
+            settings, 'VTEX_SELLER_WORKERS', self.MAX_CONCURRENT_CONNECTIONS
+        )
+
+        # Sesión HTTP para el listado de pedidos (keep-alive + reintentos)
+        self._http: requests.Session = sesion_http or self.crear_sesion_http()
+
         # Rate limiter y semáforo se inicializan en el contexto async
         self._rate_limiter: AsyncLimiter | None = None
         self._semaphore: asyncio.Semaphore | None = None
 
+    @staticmethod
+    def crear_sesion_http(reintentar: bool = True) -> requests.Session:
+        """
+        Crea la sesión HTTP usada para paginar pedidos (y las que comparten las
+        tareas de un worker de Django-Q, ver core.tasks).
+
+        Con *reintentar* los reintentos se resuelven en el adapter: backoff
+        exponencial con jitter ante 429/5xx de los GET, respetando el header
+        Retry-After de VTEX. Sin él, la sesión devuelve cada respuesta tal cual
+        para que el servicio maneje el estado HTTP. El pool guarda una conexión
+        keep-alive por hilo de I/O del worker.
+        """
+        retry = Retry(
+            total=3,
+            backoff_factor=0.3,
+            backoff_jitter=0.2,
+            status_forcelist=[429, 502, 503, 504],
+            respect_retry_after_header=True,
+            allowed_methods=["GET"],
+        ) if reintentar else 0
+        sesion = requests.Session()
+        sesion.mount("https://", HTTPAdapter(max_retries=retry, pool_maxsize=settings.TAREAS_IO_WORKERS))
+        return sesion
+
     def _init_async_controls(self) -> None:
         """Inicializa rate limiter y semáforo para contexto async."""
         if self._rate_limiter is None:
             self._rate_limiter = AsyncLimiter(self.RATE_LIMIT_PER_SECOND, 1)
         if self._semaphore is None:
-            self._semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_CONNECTIONS)
+            self._semaphore = asyncio.Semaphore(self.max_conexiones)
 
     async def _obtener_credenciales(self) -> UsuarioVtex:
         """
@@ -87,17 +125,17 @@ class ReporteVtexService:
             bool: True si se generó exitosamente, False en caso contrario
         """
         try:
-            # Obtener el reporte de la base de datos
-            reporte = await sync_to_async(ReporteVtex.objects.get)(id=reporte_id)
+            # Obtener el reporte junto con sus filtros (tipo y valor) ya resueltos
+            reporte = await sync_to_async(ReporteVtex.con_filtros().get)(id=reporte_id)
 
             # Actualizar estado a PROCESANDO
             reporte.estado = ReporteVtex.Estado.PROCESANDO
-            await sync_to_async(reporte.save)()
+            await sync_to_async(reporte.save)(update_fields=['estado'])
 
             logger.info(f"Generando reporte VTEX desde {fecha_inicio} hasta {fecha_fin}")
 
-            # Obtener filtros desde las relaciones del reporte
-            filtros = await sync_to_async(reporte.obtener_filtros_para_api)()
+            # Obtener filtros desde las relaciones ya precargadas (sin consultas extra)
+            filtros = reporte.obtener_filtros_para_api()
             if filtros:
                 logger.info(f"Filtros aplicados: {filtros}")
 
@@ -108,8 +146,8 @@ class ReporteVtexService:
             # Obtener credenciales desde la base de datos
             credenciales = await self._obtener_credenciales()
 
-            # Descargar pedidos (envolver método síncrono en sync_to_async)
-            pedidos_vtex = await sync_to_async(self.descargarVtex)(
+            # Descargar pedidos
+            pedidos_vtex = await self.descargarVtex(
                 fecha_inicio,
                 fecha_fin,
                 credenciales,
@@ -122,7 +160,7 @@ class ReporteVtexService:
 
             # Actualizar estado a COMPLETADO
             reporte.estado = ReporteVtex.Estado.COMPLETADO
-            await sync_to_async(reporte.save)()
+            await sync_to_async(reporte.save)(update_fields=['estado'])
 
             logger.info(
                 f"Reporte VTEX #{reporte_id} generado exitosamente. "
@@ -137,7 +175,7 @@ class ReporteVtexService:
             logger.error(f"Error de configuración: {str(e)}")
             try:
                 reporte.estado = ReporteVtex.Estado.ERROR
-                await sync_to_async(reporte.save)()
+                await sync_to_async(reporte.save)(update_fields=['estado'])
             except:
                 pass
             return False
@@ -145,7 +183,7 @@ class ReporteVtexService:
             logger.error(f"Error al generar reporte VTEX #{reporte_id}: {str(e)}", exc_info=True)
             try:
                 reporte.estado = ReporteVtex.Estado.ERROR
-                await sync_to_async(reporte.save)()
+                await sync_to_async(reporte.save)(update_fields=['estado'])
             except:
                 pass
             return False
@@ -167,36 +205,44 @@ class ReporteVtexService:
             logger.warning("DataFrame de transacciones vacío, no hay nada que guardar")
             return 0
 
-        transacciones_objetos = []
+        # Parsear fechas UTC de toda la columna de una vez — Django maneja la
+        # conversión a hora Argentina automáticamente
+        fechas = pd.to_datetime(
+            transacciones_df['creationDate'], utc=True, errors='coerce', format='ISO8601'
+        )
+        fechas_invalidas = fechas.isna()
+        if fechas_invalidas.any():
+            logger.warning(
+                f"Descartadas {int(fechas_invalidas.sum())} transacciones con fecha inválida: "
+                f"{transacciones_df.loc[fechas_invalidas, 'orderId'].tolist()}"
+            )
+        transacciones_df = transacciones_df.assign(creationDate=fechas)[~fechas_invalidas]
 
-        for _, row in transacciones_df.iterrows():
-            try:
-                # Parsear fecha UTC — Django maneja la conversión a hora Argentina automáticamente
-                fecha_hora = pd.to_datetime(row['creationDate'], utc=True).to_pydatetime()
+        # Obtener el valor del pedido (viene en centavos, dividir por 100)
+        if 'totalValue' in transacciones_df.columns:
+            valores = pd.to_numeric(transacciones_df['totalValue'], errors='coerce') / 100
+            transacciones_df = transacciones_df.assign(
+                totalValue=valores.astype(object).where(valores.notna(), None)
+            )
 
-                # Obtener el valor del pedido (viene en centavos, dividir por 100)
-                valor_raw = row.get('totalValue', None)
-                valor = None
-                if valor_raw is not None:
-                    try:
-                        valor = float(valor_raw) / 100  # VTEX devuelve valores en centavos
-                    except (ValueError, TypeError):
-                        valor = None
+        transacciones_objetos = []
 
+        for row in transacciones_df.itertuples(index=False):
+            try:
                 transaccion = TransaccionVtex(
-                    numero_pedido=str(row['orderId']),
-                    numero_transaccion=str(row['sequence']),
-                    fecha_hora=fecha_hora,
-                    medio_pago=str(row.get('paymentNames', 'N/A')),
-                    seller=str(row.get('seller', 'No encontrado')),
-                    estado=str(row.get('statusDescription', 'Desconocido')),
-                    valor=valor,
+                    numero_pedido=str(row.orderId),
+                    numero_transaccion=str(row.sequence),
+                    fecha_hora=row.creationDate.to_pydatetime(),
+                    medio_pago=str(getattr(row, 'paymentNames', 'N/A')),
+                    seller=str(getattr(row, 'seller', 'No encontrado')),
+                    estado=str(getattr(row, 'statusDescription', 'Desconocido')),
+                    valor=getattr(row, 'totalValue', None),
                     reporte=reporte
                 )
                 transacciones_objetos.append(transaccion)
 
             except Exception as e:
-                logger.warning(f"Error procesando transacción {row.get('orderId', 'N/A')}: {e}")
+                logger.warning(f"Error procesando transacción {getattr(row, 'orderId', 'N/A')}: {e}")
                 continue
 
         # Inserción en lote (eficiente para grandes volúmenes)
@@ -219,10 +265,11 @@ class ReporteVtexService:
         fin: datetime,
         url: str,
         headers: dict[str, str],
-        filtros: dict[str, list[str]] | None = None
+        filtros: dict[str, list[str]] | None = None,
+        page: int = 1
     ) -> tuple[list[dict[str, Any]], int]:
         """
-        Hace una request y devuelve los pedidos + cantidad de páginas.
+        Hace una request y devuelve los pedidos de una página + cantidad de páginas.
 
         Args:
             ini: Fecha inicio
@@ -230,13 +277,14 @@ class ReporteVtexService:
             url: URL de la API
             headers: Headers con credenciales
             filtros: Diccionario con filtros en formato API (ej: {'f_status': ['invoiced', 'canceled']})
+            page: Número de página a pedir (por defecto la primera)
 
         Returns:
             tuple: (lista de pedidos, cantidad de páginas)
         """
         params = {
             "f_creationDate": f"creationDate:[{self.formatear(ini)} TO {self.formatear(fin)}]",
-            "page": 1,
+            "page": page,
             "per_page": 100,
             "orderBy": "creationDate,asc"
         }
@@ -249,8 +297,8 @@ class ReporteVtexService:
                     # VTEX acepta múltiples valores separados por coma
                     params[parametro] = ','.join(valores)
 
-        response = requests.get(url, headers=headers, params=params)
-        data = response.json()
+        response = self._http.get(url, headers=headers, params=params)
+        data = orjson.loads(response.content)
         return data.get("list", []), data.get("paging", {}).get("pages", 0)
 
     async def buscar_seller_async(
@@ -265,11 +313,11 @@ class ReporteVtexService:
 
         El rate limiter funciona como un "balde de fichas":
         - Tenemos 90 fichas por segundo
-        - Cada request consume 1 ficha
+        - Cada request (incluidos los reintentos) consume 1 ficha
         - Si no hay fichas, espera automáticamente hasta que haya
 
         El semáforo limita conexiones simultáneas:
-        - Máximo 50 requests abiertas al mismo tiempo
+        - Máximo max_conexiones requests abiertas al mismo tiempo
         - Evita saturar el servidor o quedarnos sin file descriptors
 
         Args:
@@ -282,99 +330,92 @@ class ReporteVtexService:
             tuple: (order_id, nombre del seller)
         """
         url_detalle = f"{url_base}/{order_id}"
-
-        # async with rate_limiter: espera si superamos 90 req/seg
-        # async with semaphore: espera si hay 50 conexiones abiertas
-        async with self._rate_limiter:
-            async with self._semaphore:
-                for intento in range(3):
+        timeout = aiohttp.ClientTimeout(total=10)
+
+        for intento in range(3):
+            espera = 2 ** intento  # Backoff exponencial: 1s, 2s, 4s
+            # Cada intento consume su propia ficha: los reintentos también
+            # respetan el rate limit. Las esperas se hacen fuera del semáforo
+            # para no ocupar una conexión mientras se duerme.
+            async with self._rate_limiter:
+                async with self._semaphore:
                     try:
-                        timeout = aiohttp.ClientTimeout(total=10)
                         async with session.get(url_detalle, headers=headers, timeout=timeout) as response:
-                            # Si nos devuelve 429 (rate limited), esperar y reintentar
-                            if response.status == 429:
-                                retry_after = int(response.headers.get('Retry-After', 5))
-                                logger.warning(f"Rate limited por VTEX, esperando {retry_after}s")
-                                await asyncio.sleep(retry_after)
-                                continue
-
                             if response.status == 200:
-                                data = await response.json()
+                                data = orjson.loads(await response.read())
                                 sellers = data.get("sellers", [])
                                 if sellers:
                                     return order_id, sellers[0].get("name", "No encontrado")
                                 return order_id, "Sin seller"
+
+                            # Si nos devuelve 429 (rate limited), esperar lo que indique VTEX
+                            if response.status == 429:
+                                espera = int(response.headers.get('Retry-After', 5))
+                                logger.warning(f"Rate limited por VTEX, esperando {espera}s")
                             else:
                                 logger.warning(f"Status {response.status} para pedido {order_id}")
 
                     except asyncio.TimeoutError:
                         logger.warning(f"Timeout para pedido {order_id}, intento {intento + 1}/3")
-                        await asyncio.sleep(2 ** intento)  # Backoff exponencial: 1s, 2s, 4s
                     except Exception as e:
                         logger.warning(f"Error al buscar seller para {order_id}: {e}")
-                        await asyncio.sleep(2 ** intento)
+
+            if intento < 2:
+                await asyncio.sleep(espera)
 
         return order_id, "Error al obtener seller"
 
     async def obtener_todos_sellers(
         self,
-        pedidos_unicos: dict[str, dict[str, Any]],
+        order_ids: list[str],
         url_base: str,
         headers: dict[str, str]
-    ) -> dict[str, dict[str, Any]]:
+    ) -> list[str]:
         """
         Obtiene sellers para todos los pedidos en paralelo con rate limiting.
 
         Flujo:
-        1. Crea todas las tareas async (una por pedido)
-        2. asyncio.as_completed las ejecuta respetando el rate limiter
-        3. A medida que completan, asigna el seller al pedido (O(1) con dict)
+        1. Crea una corrutina por pedido
+        2. asyncio.gather las ejecuta respetando el rate limiter
+        3. Los resultados vuelven en el mismo orden que order_ids, listos
+           para asignarse como columna sin reindexar
 
         Args:
-            pedidos_unicos: Dict {order_id: pedido_dict}
+            order_ids: IDs de pedidos (sin duplicados)
             url_base: URL base de la API
             headers: Headers con credenciales
 
         Returns:
-            dict: pedidos_unicos con el campo 'seller' agregado
+            list: Nombre del seller de cada pedido, alineado con order_ids
         """
         self._init_async_controls()
 
         # Configurar conector con límite de conexiones
         connector = aiohttp.TCPConnector(
-            limit=self.MAX_CONCURRENT_CONNECTIONS,
-            limit_per_host=self.MAX_CONCURRENT_CONNECTIONS
+            limit=self.max_conexiones,
+            limit_per_host=self.max_conexiones
         )
 
-        async with aiohttp.ClientSession(connector=connector) as session:
-            # Crear todas las tareas
-            tasks = [
-                self.buscar_seller_async(session, order_id, url_base, headers)
-                for order_id in pedidos_unicos.keys()
-            ]
+        total = len(order_ids)
+        completados = 0
 
-            total = len(tasks)
-            logger.info(f"Iniciando búsqueda de sellers para {total} pedidos...")
-
-            # Procesar a medida que completan
-            completados = 0
-            for coro in asyncio.as_completed(tasks):
-                order_id, seller = await coro
-
-                # Asignación O(1) gracias al diccionario
-                if order_id in pedidos_unicos:
-                    pedidos_unicos[order_id]["seller"] = seller
-
-                completados += 1
-                # Log de progreso cada 500 pedidos
-                if completados % 500 == 0:
-                    logger.info(f"Progreso sellers: {completados}/{total} ({100*completados//total}%)")
+        async def buscar(session: aiohttp.ClientSession, order_id: str) -> str:
+            nonlocal completados
+            _, seller = await self.buscar_seller_async(session, order_id, url_base, headers)
+            completados += 1
+            # Log de progreso cada 500 pedidos
+            if completados % 500 == 0:
+                logger.info(f"Progreso sellers: {completados}/{total} ({100*completados//total}%)")
+            return seller
 
+        async with aiohttp.ClientSession(connector=connector) as session:
+            logger.info(f"Iniciando búsqueda de sellers para {total} pedidos...")
+            sellers = await asyncio.gather(*(buscar(session, order_id) for order_id in order_ids))
             logger.info(f"Búsqueda de sellers completada: {completados}/{total}")
 
-        return pedidos_unicos
+        return sellers
 
-    def descargarVtex(
+    async def descargarVtex(
         self,
         fecha_inicio_usuario: str,
         fecha_fin_usuario: str,
@@ -385,6 +426,10 @@ class ReporteVtexService:
         """
         Descarga pedidos de VTEX usando la API.
 
+        Corre en el event loop: el paginado (requests con reintentos) y la
+        exportación a Excel se delegan a threads con asyncio.to_thread, y la
+        búsqueda de sellers se await-ea directamente.
+
         Args:
             fecha_inicio_usuario: Fecha inicio DD/MM/YYYY
             fecha_fin_usuario: Fecha fin DD/MM/YYYY
@@ -410,7 +455,6 @@ class ReporteVtexService:
             hours=23, minutes=59, seconds=59
         ) + timedelta(hours=3)
 
-        per_page = 100
         todos_los_pedidos = []
         fecha_actual = fecha_desde
         delta = timedelta(days=1)
@@ -421,7 +465,9 @@ class ReporteVtexService:
             if fecha_siguiente > fecha_hasta:
                 fecha_siguiente = fecha_hasta
 
-            pedidos, paginas = self.get_pedidos(fecha_actual, fecha_siguiente, url, headers, filtros)
+            pedidos, paginas = await asyncio.to_thread(
+                self.get_pedidos, fecha_actual, fecha_siguiente, url, headers, filtros
+            )
             logger.info(f"Probando con {fecha_actual} a {fecha_siguiente} - {paginas} páginas")
 
             if paginas > 30:
@@ -429,25 +475,15 @@ class ReporteVtexService:
                 logger.info("Demasiadas páginas, achicando intervalo")
                 continue
 
-            # Si está bien, descargamos todas las páginas del subintervalo
-            for page in range(1, paginas + 1):
-                params = {
-                    "f_creationDate": f"creationDate:[{self.formatear(fecha_actual)} TO {self.formatear(fecha_siguiente)}]",
-                    "page": page,
-                    "per_page": per_page,
-                    "orderBy": "creationDate,asc"
-                }
-
-                # Aplicar filtros si se proporcionaron
-                # El formato viene de obtener_filtros_para_api: {parametro_api: [valores]}
-                if filtros:
-                    for parametro, valores in filtros.items():
-                        if valores:
-                            params[parametro] = ','.join(valores)
-
-                response = requests.get(url, headers=headers, params=params)
-                data = response.json()
-                pedidos = data.get("list", [])
+            # Si está bien, la página 1 ya vino con el sondeo: se descargan las restantes
+            todos_los_pedidos.extend(pedidos)
+            if paginas:
+                logger.info(f"Página 1/{paginas} del intervalo - {len(pedidos)} pedidos")
+
+            for page in range(2, paginas + 1):
+                pedidos, _ = await asyncio.to_thread(
+                    self.get_pedidos, fecha_actual, fecha_siguiente, url, headers, filtros, page
+                )
                 todos_los_pedidos.extend(pedidos)
                 logger.info(f"Página {page}/{paginas} del intervalo - {len(pedidos)} pedidos")
 
@@ -456,30 +492,31 @@ class ReporteVtexService:
 
         logger.info(f"Total pedidos descargados: {len(todos_los_pedidos)}")
 
-        pedidos_unicos = {}
-        for pedido in todos_los_pedidos:
-            pedidos_unicos[pedido["orderId"]] = pedido
+        # Columnas necesarias (incluye totalValue para el valor del pedido)
+        columnas_requeridas = ["orderId", "sequence", "creationDate", "paymentNames", "seller", "statusDescription", "totalValue"]
+
+        # Un único DataFrame desde la respuesta de la API hasta el Excel final:
+        # se descartan de entrada las columnas que no se usan
+        pedidos_vtex = pd.DataFrame(todos_los_pedidos)
+        if "orderId" not in pedidos_vtex.columns:
+            pedidos_vtex = pd.DataFrame(columns=["orderId"])
+        pedidos_vtex = pedidos_vtex[[col for col in columnas_requeridas if col in pedidos_vtex.columns]]
 
-        pedidos_duplicados = len(todos_los_pedidos) - len(pedidos_unicos)
-        logger.info(f"Pedidos únicos: {len(pedidos_unicos)} (eliminados {pedidos_duplicados} duplicados)")
+        pedidos_vtex = pedidos_vtex.drop_duplicates(subset="orderId", keep="last", ignore_index=True)
+        pedidos_duplicados = len(todos_los_pedidos) - len(pedidos_vtex)
+        logger.info(f"Pedidos únicos: {len(pedidos_vtex)} (eliminados {pedidos_duplicados} duplicados)")
 
         if incluir_sellers:
             logger.info("Buscando seller de cada pedido (con rate limiting)...")
-            pedidos_unicos = asyncio.run(
-                self.obtener_todos_sellers(pedidos_unicos, url, headers)
+            pedidos_vtex["seller"] = await self.obtener_todos_sellers(
+                pedidos_vtex["orderId"].tolist(), url, headers
             )
         else:
             logger.info("Omitiendo búsqueda de sellers (opción desactivada)")
-            for pedido in pedidos_unicos.values():
-                pedido["seller"] = "No consultado"
+            pedidos_vtex["seller"] = "No consultado"
 
-        # Convertir a DataFrame
-        pedidos_vtex = pd.DataFrame(list(pedidos_unicos.values()))
-
-        # Seleccionar solo las columnas necesarias (incluye totalValue para el valor del pedido)
-        columnas_requeridas = ["orderId", "sequence", "creationDate", "paymentNames", "seller", "statusDescription", "totalValue"]
-        columnas_disponibles = [col for col in columnas_requeridas if col in pedidos_vtex.columns]
-        pedidos_vtex = pedidos_vtex[columnas_disponibles]
+        # Ordenar columnas como las espera guardar_transacciones
+        pedidos_vtex = pedidos_vtex[[col for col in columnas_requeridas if col in pedidos_vtex.columns]]
 
         # Exportar archivo final
         ruta_carpeta = os.path.join(self.ruta_carpeta, "vtex")
@@ -489,7 +526,7 @@ class ReporteVtexService:
             ruta_carpeta,
             f"pedidos_vtex_{fecha_desde.date()}_a_{fecha_hasta.date()}.xlsx"
         )
-        pedidos_vtex.to_excel(archivo_final, index=False)
+        await asyncio.to_thread(pedidos_vtex.to_excel, archivo_final, index=False)
         logger.info(f"Archivo final exportado a: {archivo_final}")
 
         return pedidos_vtex
@@ -1,21 +1,417 @@
 from __future__ import annotations
 
 import asyncio
+import csv
+import itertools
 import logging
+import math
 import os
 import re
+import sys
+import tempfile
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from contextlib import asynccontextmanager, contextmanager
 from datetime import datetime
+from functools import lru_cache, partial
+from typing import BinaryIO
+from urllib.parse import urljoin, urlsplit
 
+import orjson
 import pandas as pd
+import xlsxwriter
 from asgiref.sync import sync_to_async
 from django.conf import settings
-from playwright.async_api import async_playwright
+from django.db.models import F
+from playwright.async_api import (
+    Browser,
+    BrowserContext,
+    Page,
+    Playwright,
+    Route,
+    async_playwright,
+)
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 
 from core.models import TareaCatalogacion
 
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
 logger: logging.Logger = logging.getLogger(__name__)
 
 
+def _bloquear_sin_esperar(archivo: BinaryIO) -> None:
+    """
+    Toma un lock exclusivo sobre *archivo* o lanza OSError si otro lo tiene.
+    El sistema lo suelta al cerrar el archivo o si el proceso muere.
+    """
+    if os.name == "nt":
+        msvcrt.locking(archivo.fileno(), msvcrt.LK_NBLCK, 1)
+    else:
+        fcntl.flock(archivo.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+# Normalizacion de textos de precio
+_ESPACIOS_RE = re.compile(r'\s+')
+_ESPACIOS_PRECIO = str.maketrans({'\u00A0': ' ', '\u202F': ' '})
+_PRECIO_ENTERO_RE = re.compile(r'\d{1,3}(?:\.\d{3})*')
+# Los mismos textos de precio se repiten en muchas tarjetas: se memoiza su limpieza
+TAMANO_CACHE_PRECIOS = 4096
+
+# Valores por defecto de los campos faltantes; se comparten entre todas las filas
+# para no crear un str nuevo por producto (y que pandas los hashee una sola vez)
+SIN_NOMBRE = sys.intern("Sin nombre")
+NO_ESPECIFICADO = sys.intern("No especificado")
+SIN_CUCARDAS = (sys.intern("No tiene"),)
+
+# Limpieza de textos de descuento ("-15% OFF" -> "15" / "15%")
+_NO_DIGITOS_RE = re.compile(r'\D+')
+_NO_DIGITOS_NI_PORCENTAJE_RE = re.compile(r'[^\d%]+')
+
+# Patrones de requests de DynamicYield que se abortan en Carrefour
+DY_PATRONES_BLOQUEO: tuple[str, ...] = (
+    "**/*dynamicyield.com/**",
+    "**/*dy-api.com/**",
+    "**/*dycdn.com/**",
+    "**/*cdn.dynamicyield.com/**",
+    "**/*/dy-*.js*",
+    "**/*/dy/*.js*",
+    "**/*/dynamic*yield*/*",
+)
+
+# Scrollea hasta el final hasta que la cantidad de elementos del selector deja de crecer
+SCROLL_HASTA_ESTABILIZAR_JS = """async (selector) => {
+  let anterior = -1;
+  for (let i = 0; i < 20; i++) {
+    window.scrollTo(0, document.scrollingElement.scrollHeight);
+    await new Promise(r => setTimeout(r, 400));
+    const actual = document.querySelectorAll(selector).length;
+    if (actual === anterior) return actual;
+    anterior = actual;
+  }
+  return anterior;
+}
+"""
+
+# Mayor numero de pagina entre los botones de paginado (atributo value o, si no, su
+# texto), o null si no hay; reemplaza recorrer los botones uno por uno
+MAXIMO_BOTON_PAGINA_JS = """(selectorBotones) => {
+  const esNumero = t => /^\\d+$/.test(t ?? '');
+  const numeros = Array.from(document.querySelectorAll(selectorBotones), boton => {
+    const valor = boton.getAttribute('value');
+    return esNumero(valor) ? valor : boton.innerText.trim();
+  }).filter(esNumero).map(Number);
+  return numeros.length ? Math.max(...numeros) : null;
+}
+"""
+
+# Lleva la pagina hasta el final para que carguen el paginado y las tarjetas diferidas
+SCROLL_AL_FINAL_JS = "window.scrollTo(0, document.scrollingElement.scrollHeight)"
+
+# true cuando el listado ya tiene mas tarjetas que antes de pedir la pagina siguiente
+HAY_MAS_TARJETAS_JS = "([selector, anteriores]) => document.querySelectorAll(selector).length > anteriores"
+
+# Espera (ms) por el boton de la pagina siguiente; solo se agota en la ultima pagina
+ESPERA_BOTON_SIGUIENTE_MS = 2000
+
+# Tipos de recurso y hosts de analytics que no hacen falta para leer los datos
+TIPOS_RECURSO_BLOQUEADOS: frozenset[str] = frozenset({"image", "media", "font", "stylesheet"})
+# En los listados se conservan los estilos: innerText y los botones de paginado dependen de ellos
+TIPOS_RECURSO_BLOQUEADOS_LISTADO: frozenset[str] = TIPOS_RECURSO_BLOQUEADOS - {"stylesheet"}
+HOSTS_ANALYTICS: tuple[str, ...] = (
+    "google-analytics",
+    "doubleclick",
+    "googletagmanager",
+    "hotjar",
+    "facebook.net",
+)
+
+# Script inyectado en cada documento para ocultar y purgar los overlays de DynamicYield
+DY_INIT_SCRIPT = """(() => {
+  const hideCSS = `
+    .dy-modal-container,
+    .dy_full_width_notifications_container,
+    .dynotifyjs-wrapper,
+    .dy-auto-embedder,
+    [class*=" dy_"], [class^="dy_"],
+    [class*=" dy-"], [class^="dy-"],
+    [id^="dy-"], [id*=" dy-"] { display: none !important; visibility: hidden !important; }
+    html, body { pointer-events: auto !important; }
+  `;
+  const style = document.createElement('style');
+  style.setAttribute('data-anti-dy', '1');
+  style.textContent = hideCSS;
+  document.documentElement.appendChild(style);
+
+  const purge = () => {
+    const selectors = [
+      '.dy-modal-container',
+      '.dy_full_width_notifications_container',
+      '.dynotifyjs-wrapper',
+      '.dy-auto-embedder',
+      '[data-dy-exp-id]',
+      '[data-dy-var-id]',
+      '[class*=" dy_"]', '[class^="dy_"]',
+      '[class*=" dy-"]', '[class^="dy-"]',
+      '[id^="dy-"]', '[id*=" dy-"]'
+    ];
+    document.querySelectorAll(selectors.join(',')).forEach(n => {
+      try { n.remove(); } catch {}
+    });
+    const html = document.documentElement, body = document.body;
+    if (html) { html.style.removeProperty('overflow'); html.style.removeProperty('pointer-events'); }
+    if (body) { body.style.removeProperty('overflow'); body.style.removeProperty('pointer-events'); }
+  };
+
+  try { if (window.DY) window.DY = undefined; } catch {}
+  try { if (window.DynamicYield) window.DynamicYield = undefined; } catch {}
+
+  purge();
+
+  const mo = new MutationObserver(() => purge());
+  mo.observe(document.documentElement, { childList: true, subtree: true });
+
+  window.__purgeDY = purge;
+})();
+"""
+
+# Endpoint de Intelligent Search de VTEX con los productos de una coleccion de Carrefour
+CARREFOUR_API_PRODUCTOS = (
+    "https://www.carrefour.com.ar/api/io/_v/api/intelligent-search/v1/"
+    "product_search/productClusterIds/{coleccion}"
+)
+CARREFOUR_API_PAGE_SIZE = 50
+
+# Columnas de los productos de Carrefour, en el orden del Excel final
+CAMPOS_PRODUCTO_CARREFOUR: tuple[str, ...] = (
+    "nombreProducto",
+    "precioComun",
+    "precioTachado",
+    "urlProducto",
+    "cucardas",
+    "vendidoPor",
+    "urlImagen",
+    "arbolCategorias",
+    "ean",
+)
+
+# Carpeta de MEDIA_ROOT donde quedan los Excel generados
+CARPETA_SALIDA = "catalogacion"
+
+# Buffer de escritura de los Excel generados (se escriben a un temporal y se renombran)
+BUFFER_ESCRITURA = 1 << 20
+
+# Cache en MEDIA_ROOT de (arbol de categorias, EAN) por URL de producto de Carrefour
+CACHE_EAN_ARCHIVO = ".ean-cache.json"
+
+# API de catalogo de VTEX; se le agrega el path de la ficha ("/<linkText>/p")
+CARREFOUR_API_CATALOGO = "https://www.carrefour.com.ar/api/catalog_system/pub/products/search"
+
+# Grupos de especificaciones de VTEX que el sitio muestra como cucardas
+CARREFOUR_GRUPOS_CUCARDAS: tuple[str, ...] = ("Cucardas", "Ribbons")
+
+# Selector de cada tarjeta de producto en las paginas de coleccion de Carrefour
+CARREFOUR_SELECTOR_TARJETA = ".valtech-carrefourar-search-result-3-x-galleryItem"
+CARREFOUR_SELECTOR_BOTON_PAGINA = (
+    ".valtech-carrefourar-search-result-3-x-paginationContainer "
+    ".valtech-carrefourar-search-result-3-x-paginationButtonPages button"
+)
+
+# Extrae en una sola llamada los campos crudos de todas las tarjetas de la pagina
+CARREFOUR_TARJETAS_JS = """(selectorTarjeta) => {
+  const texto = (raiz, sel) => {
+    const n = raiz.querySelector(sel);
+    return n ? n.innerText : null;
+  };
+  const textos = (raiz, sel) => Array.from(raiz.querySelectorAll(sel), n => n.innerText);
+
+  return Array.from(document.querySelectorAll(selectorTarjeta), tarjeta => {
+    const imagen = tarjeta.querySelector('.vtex-flex-layout-0-x-flexRow--infoImage img.vtex-product-summary-2-x-imageNormal')
+      || tarjeta.querySelector('.vtex-flex-layout-0-x-flexRow--infoImage img');
+    const link = tarjeta.querySelector('a.vtex-product-summary-2-x-clearLink');
+    return {
+      precioComun: texto(tarjeta, '.valtech-carrefourar-product-price-0-x-sellingPriceValue'),
+      precioTachado: texto(tarjeta, '.valtech-carrefourar-product-price-0-x-listPriceValue'),
+      urlRelativa: link ? link.getAttribute('href') : null,
+      cucardas: [
+        ...textos(tarjeta, '.vtex-flex-layout-0-x-flexRow--rowCucardas [data-specification-group="Cucardas"][data-specification-name="Cucardas"].vtex-product-specifications-1-x-specificationValue'),
+        ...Array.from(tarjeta.querySelectorAll('img.cucarda-coleccion'), n => n.getAttribute('alt')),
+        ...textos(tarjeta, '.vtex-flex-layout-0-x-flexRow--rowRibbons [data-specification-group="Ribbons"].vtex-product-specifications-1-x-specificationValue'),
+        ...textos(tarjeta, '.vtex-flex-layout-0-x-flexRow--rowRibbonsTooltip .tooltipText span'),
+      ],
+      vendidoPor: texto(tarjeta, '.vtex-flex-layout-0-x-flexRow--rowSeller'),
+      nombre: texto(tarjeta, '.vtex-flex-layout-0-x-flexRow--rowName h3.vtex-product-summary-2-x-productNameContainer'),
+      urlImagen: imagen ? imagen.getAttribute('src') : null,
+    };
+  });
+}
+"""
+
+# Selectores de los listados de Fravega
+FRAVEGA_SELECTOR_TARJETA = "article.sc-87b0945d-1.bwMsmt"
+FRAVEGA_SELECTOR_PAGINADO = ".sc-3624d7a8-0.ebdNvu"
+FRAVEGA_SELECTOR_BOTON_PAGINA = ".sc-3624d7a8-1.kgGNyw"
+
+# Extrae en una sola llamada los campos crudos de todas las tarjetas del listado
+FRAVEGA_TARJETAS_JS = """(selectorTarjeta) => {
+  const texto = (raiz, sel) => {
+    const n = raiz.querySelector(sel);
+    return n ? n.innerText : null;
+  };
+  const atributo = (raiz, sel, attr) => {
+    const n = raiz.querySelector(sel);
+    return n ? n.getAttribute(attr) : null;
+  };
+
+  return Array.from(document.querySelectorAll(selectorTarjeta), tarjeta => ({
+    precioComun: texto(tarjeta, 'span.sc-1d9b1d9e-0.OZgQ'),
+    precioTachado: texto(tarjeta, 'span.sc-e081bce1-0.eudnWN'),
+    descuento: texto(tarjeta, "[data-test-id='discount-tag']"),
+    urlRelativa: atributo(tarjeta, 'a.sc-87b0945d-3.dQujLs', 'href'),
+    vendidoPor: texto(tarjeta, 'p.sc-82405aa0-0.dIXwMc'),
+    nombre: texto(tarjeta, 'span.sc-1fa74e6c-0.kUaLHc'),
+    urlImagen: atributo(tarjeta, 'img.sc-d0e786e3-0.jrZdpk', 'src'),
+  }));
+}
+"""
+
+
+# Nombres del breadcrumb de una ficha de Fravega sin el primer nivel (inicio);
+# si el breadcrumb de escritorio no esta, usa el movil completo
+FRAVEGA_BREADCRUMB_JS = """() => {
+  const nombres = (sel) => Array.from(
+    document.querySelectorAll(`${sel} ol[itemtype='https://schema.org/BreadcrumbList'] li[itemprop='itemListElement']`),
+    li => li.querySelector("span[itemprop='name']")?.innerText.trim(),
+  );
+  const escritorio = nombres('div.sc-8071ec51-0').slice(1).filter(Boolean);
+  return escritorio.length ? escritorio : nombres('div.sc-bd34a3c8-0').filter(Boolean);
+}
+"""
+
+# Selectores de Megatone (paginado del listado y links de categoria de la ficha)
+MEGATONE_SELECTOR_PAGINADO = ".BtnPaginado"
+MEGATONE_SELECTOR_CATEGORIAS = "a[href*='/listado/']"
+
+# Mayor numero entre los botones de paginado del listado, o null si no hay
+MEGATONE_MAXIMO_PAGINADO_JS = """(selectorPaginado) => {
+  const numeros = Array.from(document.querySelectorAll(selectorPaginado), b => b.innerText.trim())
+    .filter(t => /^\\d+$/.test(t))
+    .map(Number);
+  return numeros.length ? Math.max(...numeros) : null;
+}
+"""
+
+# Productos del listado de Megatone (variable global que arma el sitio)
+MEGATONE_LISTADO_JS = """() => (typeof GlobalListado !== 'undefined' && GlobalListado.Productos) || []"""
+
+# Cambia de pagina con la funcion de filtros del propio sitio, recordando el listado anterior
+MEGATONE_CAMBIAR_PAGINA_JS = """(numero) => {
+  window.productosAnteriores = GlobalListado.Productos;
+  ObtenerFiltro(numero, 'Pagina', 'Pagina');
+}
+"""
+
+# true cuando GlobalListado tiene productos distintos a los de la pagina anterior
+MEGATONE_LISTADO_NUEVO_JS = """() => typeof GlobalListado !== 'undefined'
+  && Boolean(GlobalListado.Productos)
+  && GlobalListado.Productos !== window.productosAnteriores"""
+
+# SKU de la ficha y textos de sus links de categoria (sin los "Volver")
+MEGATONE_FICHA_JS = """(selectorCategorias) => ({
+  sku: window.sku ?? null,
+  categorias: Array.from(document.querySelectorAll(selectorCategorias))
+    .filter(a => a.getAttribute('href'))
+    .map(a => a.innerText.trim())
+    .filter(t => t && !t.toLowerCase().includes('volver')),
+})
+"""
+
+# Expresion JS (se inserta en los scripts VTEX) con los textos crudos de los JSON-LD
+# de la pagina; se parsean del lado de Python con orjson
+_JSONLD_TEXTOS_JS = """Array.from(
+    document.querySelectorAll('script[type="application/ld+json"]'), script => script.textContent
+  )"""
+
+# Selectores de Oncity (sitio VTEX)
+ONCITY_SELECTOR_TARJETA = ".vtex-product-summary-2-x-containerNormal--product-summary-product"
+ONCITY_SELECTOR_PRECIO_TACHADO = ".vtex-product-price-1-x-listPrice--summary"
+ONCITY_SELECTOR_CUCARDAS = ".vtex-stack-layout-0-x-stackItem--highlights--cucardas"
+ONCITY_SELECTOR_BREADCRUMB = ".vtex-breadcrumb-1-x-link--store-breadcrumb"
+ONCITY_BREADCRUMB_IGNORADOS: frozenset[str] = frozenset({"home", "inicio"})
+ONCITY_SELECTOR_VER_MAS = "a:has-text('Ver más productos')"
+
+# Cualquiera de estos elementos de la tarjeta puede traer el descuento; se consultan juntos
+ONCITY_SELECTOR_DESCUENTO = ", ".join((
+    ".vtex-stack-layout-0-x-stackItem--highlights--topRight",
+    ".vtex-product-summary-2-x-discount",
+    ".vtex-search-result-3-x-discount",
+    "[class*='discount']",
+    "[class*='Discount']",
+))
+
+# Extrae en una sola llamada los JSON-LD del listado (el ItemList trae los productos)
+# y, en el mismo orden, precio tachado, textos de descuento y cucardas de cada tarjeta
+ONCITY_LISTADO_JS = """(sel) => {
+  const jsonLd = """ + _JSONLD_TEXTOS_JS + """;
+
+  const textos = (raiz, s) => Array.from(raiz.querySelectorAll(s), n => n.innerText);
+  const tarjetas = Array.from(document.querySelectorAll(sel.tarjeta), tarjeta => {
+    const tachado = tarjeta.querySelector(sel.precioTachado);
+    return {
+      precioTachado: tachado ? tachado.innerText : null,
+      descuentos: textos(tarjeta, sel.descuento),
+      cucardas: textos(tarjeta, sel.cucardas),
+    };
+  });
+  return {jsonLd, tarjetas};
+}
+"""
+
+# Selectores de Provincia (sitio VTEX)
+PROVINCIA_SELECTOR_TARJETA = "article"
+PROVINCIA_SELECTOR_MOSTRAR_MAS = "button:has-text('Mostrar más'), a:has-text('Mostrar más')"
+PROVINCIA_SELECTOR_CUCARDAS = "[class*='cucarda'], [class*='badge'], [class*='highlight']"
+PROVINCIA_SELECTOR_BREADCRUMB = (
+    ".vtex-breadcrumb-1-x-container--product-breadcrumb .vtex-breadcrumb-1-x-link"
+)
+PROVINCIA_BREADCRUMB_IGNORADOS: frozenset[str] = frozenset({"home", "inicio", "provincia compras"})
+PROVINCIA_SELECTOR_PRECIO_TACHADO = ".vtex-product-price-1-x-listPrice"
+PROVINCIA_SELECTOR_TAG = "[class*='tag']"
+
+# Si la tarjeta no tiene tag, el descuento se busca en estos elementos, en este orden
+PROVINCIA_SELECTORES_DESCUENTO = (
+    ".vtex-stack-layout-0-x-stackItem--highlights",
+    "[class*='discount']",
+    "[class*='badge']",
+)
+
+# Extrae en una sola llamada los JSON-LD del listado (el ItemList trae los productos) y,
+# en el mismo orden, precio tachado, tag, descuentos alternativos y cucardas de cada tarjeta
+PROVINCIA_LISTADO_JS = """(sel) => {
+  const jsonLd = """ + _JSONLD_TEXTOS_JS + """;
+
+  const texto = (raiz, s) => raiz.querySelector(s)?.innerText ?? null;
+  const tarjetas = Array.from(document.querySelectorAll(sel.tarjeta), tarjeta => ({
+    precioTachado: texto(tarjeta, sel.precioTachado),
+    tag: texto(tarjeta, sel.tag),
+    descuentos: sel.descuentos.map(s => texto(tarjeta, s)),
+    cucardas: Array.from(tarjeta.querySelectorAll(sel.cucardas), n => n.innerText.trim()).filter(Boolean),
+  }));
+  return {jsonLd, tarjetas};
+}
+"""
+
+# Textos del breadcrumb y JSON-LD (de ahi sale el EAN) de la ficha de un producto VTEX
+VTEX_FICHA_JS = """(selectorBreadcrumb) => ({
+  categorias: Array.from(document.querySelectorAll(selectorBreadcrumb), n => n.innerText.trim())
+    .filter(Boolean),
+  jsonLd: """ + _JSONLD_TEXTOS_JS + """,
+})
+"""
+
+
 class SellersExternosService:
     """
     Servicio unificado para scraping de sellers externos.
@@ -25,18 +421,39 @@ class SellersExternosService:
     - ejecutar_no_carrefour: scraping de sellers en Fravega, Megatone, Oncity, Provincia
     """
 
+    # Paginas de navegador que se usan en paralelo en el scraping de Carrefour
+    MAX_PARALLEL_PAGES = 4
+
+    # Requests simultaneas a la API de catalogo al enriquecer productos de Carrefour
+    MAX_PARALLEL_API = 16
+
+    # Tamano maximo de la cache HTTP del perfil persistente del navegador (512 MB)
+    TAMANO_CACHE_NAVEGADOR = 512 * 1024 * 1024
+
+    # El progreso se persiste cada N items o cada N segundos
+    FLUSH_CADA_ITEMS = 25
+    FLUSH_CADA_SEGUNDOS = 2.0
+
+    # Maximo de mensajes que el consumidor de logs junta en una sola escritura
+    LOGS_POR_ESCRITURA = 20
+
+    def __init__(self) -> None:
+        self._progreso_pendiente = 0
+        self._ultimo_flush = time.monotonic()
+        self._cola_logs: asyncio.Queue[str] | None = None
+        self._consumidor_logs: asyncio.Task | None = None
+
     # =========================================================================
     # Utilidades de precio
     # =========================================================================
 
     @staticmethod
+    @lru_cache(maxsize=TAMANO_CACHE_PRECIOS)
     def _normalizar_precio_texto(texto: str) -> str:
         """Limpia texto de precio eliminando espacios no estándar y duplicados."""
         if not texto:
             return texto
-        texto = texto.replace('\u00A0', ' ').replace('\u202F', ' ')
-        texto = re.sub(r'\s+', ' ', texto)
-        return texto.strip()
+        return _ESPACIOS_RE.sub(' ', texto.translate(_ESPACIOS_PRECIO)).strip()
 
     @staticmethod
     def _precio_texto_a_float(precio_texto: str) -> float | None:
@@ -48,6 +465,9 @@ class SellersExternosService:
             return None
         try:
             limpio = precio_texto.replace('$', '').replace(' ', '').strip()
+            # Caso comun ("184.999", "500"): entero con puntos de miles
+            if _PRECIO_ENTERO_RE.fullmatch(limpio):
+                return float(limpio.replace('.', ''))
             if ',' in limpio and '.' in limpio:
                 if limpio.rfind(',') > limpio.rfind('.'):
                     limpio = limpio.replace('.', '').replace(',', '.')
@@ -70,6 +490,7 @@ class SellersExternosService:
             return None
 
     @classmethod
+    @lru_cache(maxsize=TAMANO_CACHE_PRECIOS)
     def _calcular_porcentaje_descuento(cls, precio_original: str, precio_final: str) -> str | None:
         """
         Calcula el porcentaje de descuento entre dos precios.
@@ -86,401 +507,707 @@ class SellersExternosService:
             logger.warning("Error calculando descuento: %s", e)
             return None
 
+    @staticmethod
+    def _precios_a_float(precios: pd.Series) -> pd.Series:
+        """
+        Version vectorizada de _precio_texto_a_float sobre una columna de precios en texto.
+        Los valores vacios o no parseables quedan como NaN.
+        """
+        limpio = precios.astype(object).str.replace(r"[$\s]", "", regex=True)
+        ultima_coma = limpio.str.rfind(",")
+        ultimo_punto = limpio.str.rfind(".")
+        sin_puntos = limpio.str.replace(".", "", regex=False)
+
+        # coma decimal (con o sin puntos de miles) / coma de miles con punto decimal
+        normalizado = limpio.mask(ultima_coma > ultimo_punto, sin_puntos.str.replace(",", ".", regex=False))
+        normalizado = normalizado.mask(
+            (ultima_coma >= 0) & (ultimo_punto > ultima_coma), limpio.str.replace(",", "", regex=False)
+        )
+        # solo puntos: son de miles si hay mas de uno o el ultimo grupo tiene mas de 2 digitos
+        solo_puntos = (ultima_coma < 0) & (ultimo_punto >= 0)
+        puntos_de_miles = (limpio.str.count(r"\.") > 1) | (limpio.str.len() - ultimo_punto - 1 > 2)
+        normalizado = normalizado.mask(solo_puntos & puntos_de_miles, sin_puntos)
+
+        return pd.to_numeric(normalizado, errors="coerce")
+
+    @classmethod
+    def _calcular_descuentos(cls, precios_originales: pd.Series, precios_finales: pd.Series) -> pd.Series:
+        """Version vectorizada de _calcular_porcentaje_descuento: "XX%" o None por fila."""
+        original = cls._precios_a_float(precios_originales)
+        final = cls._precios_a_float(precios_finales)
+        hay_descuento = (original > final) & (final != 0)
+        porcentaje = ((original - final) / original * 100).round()
+        descuentos = porcentaje[hay_descuento].astype(int).astype(str) + "%"
+        return descuentos.reindex(precios_originales.index).astype(object).where(hay_descuento, None)
+
+    @staticmethod
+    def _formatear_precio(valor: float | None) -> str | None:
+        """Formatea un precio numerico como lo muestra el sitio (ej: 184999 -> "$ 184.999")."""
+        if valor is None:
+            return None
+        entero, _, decimales = f"{valor:,.2f}".partition(".")
+        texto = entero.replace(",", ".")
+        if decimales != "00":
+            texto = f"{texto},{decimales}"
+        return f"$ {texto}"
+
     # =========================================================================
     # Helpers internos (log, progreso, archivo)
     # =========================================================================
 
+    def _flush_vencido(self) -> bool:
+        return time.monotonic() - self._ultimo_flush > self.FLUSH_CADA_SEGUNDOS
+
+    async def _actualizar_tarea(self, tarea: TareaCatalogacion, **campos) -> None:
+        """UPDATE directo de *campos* sobre la tarea, sin pasar por Model.save()."""
+        await sync_to_async(TareaCatalogacion.objects.filter(pk=tarea.pk).update)(**campos)
+
+    async def _flush(self, tarea: TareaCatalogacion) -> None:
+        """Persiste el progreso acumulado y espera a que se escriban los logs encolados."""
+        if self._progreso_pendiente:
+            pendiente, self._progreso_pendiente = self._progreso_pendiente, 0
+            await self._actualizar_tarea(tarea, progreso_actual=F('progreso_actual') + pendiente)
+            tarea.progreso_actual += pendiente
+        if self._cola_logs is not None:
+            await self._cola_logs.join()
+        self._ultimo_flush = time.monotonic()
+
+    async def _consumir_logs(self, tarea: TareaCatalogacion) -> None:
+        """Escribe los logs encolados en lotes de hasta LOGS_POR_ESCRITURA mensajes."""
+        while True:
+            mensajes = [await self._cola_logs.get()]
+            while len(mensajes) < self.LOGS_POR_ESCRITURA and not self._cola_logs.empty():
+                mensajes.append(self._cola_logs.get_nowait())
+            try:
+                await sync_to_async(tarea.agregar_log)("\n".join(mensajes))
+            except Exception:
+                logger.exception("No se pudieron guardar %d logs de la tarea", len(mensajes))
+            finally:
+                for _ in mensajes:
+                    self._cola_logs.task_done()
+
+    async def _detener_logs(self) -> None:
+        """Espera a que se escriban los logs pendientes y detiene el consumidor."""
+        if self._consumidor_logs is None:
+            return
+        await self._cola_logs.join()
+        self._consumidor_logs.cancel()
+        self._cola_logs = self._consumidor_logs = None
+
     async def _log(self, tarea: TareaCatalogacion, mensaje: str) -> None:
         logger.info(mensaje)
-        await sync_to_async(tarea.agregar_log)(mensaje)
+        if self._consumidor_logs is None:
+            self._cola_logs = asyncio.Queue()
+            self._consumidor_logs = asyncio.create_task(self._consumir_logs(tarea))
+        self._cola_logs.put_nowait(mensaje)
 
     async def _incrementar_progreso(self, tarea: TareaCatalogacion, cantidad: int = 1) -> None:
-        tarea.progreso_actual += cantidad
-        await sync_to_async(tarea.save)(update_fields=['progreso_actual'])
+        self._progreso_pendiente += cantidad
+        if self._progreso_pendiente >= self.FLUSH_CADA_ITEMS or self._flush_vencido():
+            await self._flush(tarea)
 
     async def _set_progreso(self, tarea: TareaCatalogacion, actual: int, total: int | None = None) -> None:
+        self._progreso_pendiente = 0
+        await self._flush(tarea)
+        campos = {'progreso_actual': actual}
+        if total is not None:
+            campos['progreso_total'] = total
+        await self._actualizar_tarea(tarea, **campos)
         tarea.progreso_actual = actual
-        campos = ['progreso_actual']
         if total is not None:
             tarea.progreso_total = total
-            campos.append('progreso_total')
-        await sync_to_async(tarea.save)(update_fields=campos)
+
+    async def _sumar_total(self, tarea: TareaCatalogacion, cantidad: int) -> None:
+        """Suma *cantidad* al total de progreso (los sellers en paralelo comparten la tarea)."""
+        await self._actualizar_tarea(tarea, progreso_total=F('progreso_total') + cantidad)
+        tarea.progreso_total += cantidad
 
     async def _set_estado(self, tarea: TareaCatalogacion, estado: str) -> None:
+        await self._flush(tarea)
+        await self._actualizar_tarea(tarea, estado=estado)
         tarea.estado = estado
-        await sync_to_async(tarea.save)(update_fields=['estado'])
+
+    @staticmethod
+    def _rutas_salida(prefijo: str) -> tuple[str, str]:
+        """
+        Arma el nombre "<prefijo>-<fecha y hora>.xlsx" del Excel de salida y devuelve
+        (ruta absoluta, ruta relativa a MEDIA_ROOT), creando la carpeta si no existe.
+        """
+        nombre_archivo = f"{prefijo}-{datetime.now():%Y%m%d_%H%M%S}.xlsx"
+        carpeta = os.path.join(settings.MEDIA_ROOT, CARPETA_SALIDA)
+        os.makedirs(carpeta, exist_ok=True)
+        return os.path.join(carpeta, nombre_archivo), f"{CARPETA_SALIDA}/{nombre_archivo}"
 
     async def _guardar_archivo(self, tarea: TareaCatalogacion, ruta_relativa: str) -> None:
+        await self._actualizar_tarea(tarea, archivo_resultado=ruta_relativa)
         tarea.archivo_resultado.name = ruta_relativa
-        await sync_to_async(tarea.save)(update_fields=['archivo_resultado'])
+
+    @staticmethod
+    @contextmanager
+    def _archivo_atomico(ruta: str) -> Iterator[BinaryIO]:
+        """
+        Abre un temporal unico junto a *ruta* con un buffer de BUFFER_ESCRITURA
+        bytes y lo renombra a *ruta* al cerrar; si falla la escritura el temporal
+        se borra. Cada escritor usa su propio temporal, asi dos workers que
+        escriben el mismo archivo (p. ej. la cache de EANs) no mezclan contenido.
+        """
+        descriptor, temporal = tempfile.mkstemp(
+            dir=os.path.dirname(ruta) or ".", prefix=f"{os.path.basename(ruta)}.", suffix=".tmp"
+        )
+        try:
+            with open(descriptor, "wb", buffering=BUFFER_ESCRITURA) as archivo:
+                yield archivo
+            os.replace(temporal, ruta)
+        except BaseException:
+            os.remove(temporal)
+            raise
+
+    @classmethod
+    def _escribir_excel(cls, df: pd.DataFrame, ruta: str) -> None:
+        """Escribe el Excel de productos con xlsxwriter en modo constant_memory."""
+        if "cucardas" in df.columns:
+            df["cucardas"] = df["cucardas"].str.join("|")
+        with cls._archivo_atomico(ruta) as archivo, pd.ExcelWriter(
+            archivo,
+            engine="xlsxwriter",
+            engine_kwargs={"options": {"constant_memory": True, "strings_to_urls": False}},
+        ) as writer:
+            df.to_excel(writer, index=False, sheet_name="Productos")
+
+    @classmethod
+    @asynccontextmanager
+    async def _excel_en_curso(cls, ruta: str) -> AsyncIterator[Callable[[list[dict]], None]]:
+        """
+        Abre el Excel de productos con xlsxwriter en modo constant_memory y entrega
+        una funcion que le agrega filas a medida que los productos quedan completos,
+        para no retenerlos en memoria hasta el final; al salir del bloque el libro
+        se cierra en un hilo. Las columnas son las claves del primer producto escrito.
+        """
+        with cls._archivo_atomico(ruta) as archivo:
+            libro = xlsxwriter.Workbook(archivo, {"constant_memory": True, "strings_to_urls": False})
+            try:
+                hoja = libro.add_worksheet("Productos")
+                columnas: list[str] = []
+                filas = 0
+
+                def escribir(productos: list[dict]) -> None:
+                    nonlocal filas
+                    if productos and not columnas:
+                        columnas.extend(productos[0])
+                        hoja.write_row(0, 0, columnas)
+                    for prod in productos:
+                        filas += 1
+                        hoja.write_row(filas, 0, [
+                            "|".join(valor) if isinstance(valor, (list, tuple)) else valor
+                            for valor in (prod.get(columna) for columna in columnas)
+                        ])
+
+                yield escribir
+            finally:
+                await asyncio.to_thread(libro.close)
+
+    @staticmethod
+    def _reservar_perfil(nombre: str) -> tuple[str, BinaryIO]:
+        """
+        Reserva el primer perfil libre de *nombre* (.pw-cache-<nombre>-<n>) y
+        devuelve su ruta y el archivo de lock que lo mantiene tomado.
+
+        Chromium admite un solo proceso por perfil: dos tareas del mismo sitio
+        en workers distintos usan perfiles distintos, y la cantidad de perfiles
+        queda acotada a las ejecuciones simultaneas que hubo.
+        """
+        for numero in itertools.count():
+            ruta = os.path.join(settings.MEDIA_ROOT, f".pw-cache-{nombre}-{numero}")
+            os.makedirs(ruta, exist_ok=True)
+            candado = open(f"{ruta}.lock", "wb")
+            try:
+                _bloquear_sin_esperar(candado)
+            except OSError:
+                candado.close()
+                continue
+            return ruta, candado
+
+    async def _abrir_contexto_persistente(self, pw: Playwright, nombre: str, headless: bool) -> BrowserContext:
+        """
+        Abre un contexto con perfil en disco para reutilizar la cache HTTP entre
+        ejecuciones. Los service workers se bloquean: no hacen falta para leer los
+        datos, se acumulan en el perfil y sus requests no pasan por context.route.
+        El perfil queda reservado hasta que se cierra el contexto.
+        """
+        ruta, candado = self._reservar_perfil(nombre)
+        try:
+            contexto = await pw.chromium.launch_persistent_context(
+                user_data_dir=ruta,
+                headless=headless,
+                args=[f"--disk-cache-size={self.TAMANO_CACHE_NAVEGADOR}"],
+                service_workers="block",
+            )
+        except BaseException:
+            candado.close()
+            raise
+        contexto.on("close", lambda _: candado.close())
+        return contexto
+
+    @staticmethod
+    async def _esperar_tarjetas(pagina: Page, selector: str) -> None:
+        """
+        Espera a que aparezcan las tarjetas de productos y scrollea hasta que su
+        cantidad deja de crecer (carga diferida). Una pagina sin tarjetas no es error.
+        """
+        try:
+            await pagina.wait_for_selector(selector, state="attached", timeout=15000)
+        except PlaywrightTimeoutError:
+            logger.debug("Sin tarjetas '%s' en %s", selector, pagina.url)
+            return
+        cantidad = await pagina.evaluate(SCROLL_HASTA_ESTABILIZAR_JS, selector)
+        logger.debug("%d tarjetas cargadas en %s", cantidad, pagina.url)
+
+    @staticmethod
+    async def _esperar_listado_megatone(pagina: Page) -> None:
+        """Espera a que GlobalListado cambie (primera carga o cambio de pagina); si no cambia, sigue igual."""
+        try:
+            await pagina.wait_for_function(MEGATONE_LISTADO_NUEVO_JS, timeout=15000)
+        except PlaywrightTimeoutError:
+            logger.debug("GlobalListado no cambio en %s", pagina.url)
 
     # =========================================================================
     #  CARREFOUR  -  ejecutar_carrefour
     # =========================================================================
 
+    @staticmethod
+    async def _filtrar_recursos(route: Route) -> None:
+        """Aborta imagenes, fuentes, estilos, media y analytics; el resto sigue a las demas rutas."""
+        await SellersExternosService._abortar_recursos(route, TIPOS_RECURSO_BLOQUEADOS)
+
+    @staticmethod
+    async def _filtrar_recursos_listado(route: Route) -> None:
+        """Como _filtrar_recursos pero deja pasar los estilos; se registra en todo el contexto."""
+        await SellersExternosService._abortar_recursos(route, TIPOS_RECURSO_BLOQUEADOS_LISTADO)
+
+    @staticmethod
+    async def _abortar_recursos(route: Route, tipos: frozenset[str]) -> None:
+        request = route.request
+        if request.resource_type in tipos or any(host in request.url for host in HOSTS_ANALYTICS):
+            await route.abort()
+        else:
+            await route.fallback()
+
+    async def _preparar_contexto_carrefour(self, contexto: BrowserContext) -> None:
+        """Registra el bloqueo de DynamicYield y de recursos pesados en un contexto de Carrefour."""
+        for patron in DY_PATRONES_BLOQUEO:
+            await contexto.route(patron, lambda route: route.abort())
+        # Se registra ultima para evaluarse primero; lo que no aborta pasa a las rutas de DY
+        await contexto.route("**/*", self._filtrar_recursos)
+        await contexto.add_init_script(DY_INIT_SCRIPT)
+
     async def ejecutar_carrefour(self, tarea: TareaCatalogacion, colecciones: list[str], headless: bool = True) -> None:
         """
         Scraping de productos de sellers externos dentro de carrefour.com.ar por coleccion.
 
+        Los productos de cada coleccion se piden a la API de Intelligent Search
+        de VTEX y el EAN y arbol de categorias a la API de catalogo; si alguna
+        API falla se recorre el sitio. Las paginas del sitio se procesan en
+        paralelo sobre un pool de MAX_PARALLEL_PAGES paginas de un mismo
+        contexto persistente.
+
         Args:
             tarea: instancia de TareaCatalogacion para trackeo.
             colecciones: lista de IDs de colecciones VTEX.
         """
         await self._set_estado(tarea, TareaCatalogacion.Estado.PROCESANDO)
         await self._set_progreso(tarea, 0, len(colecciones))
+        ruta_volcado = None
 
         try:
+            carpeta = os.path.join(settings.MEDIA_ROOT, CARPETA_SALIDA)
+            os.makedirs(carpeta, exist_ok=True)
+            descriptor, ruta_volcado = tempfile.mkstemp(prefix="carrefour-", suffix=".csv", dir=carpeta)
+            os.close(descriptor)
+
             async with async_playwright() as pw:
                 await self._log(tarea, "Iniciando navegador")
-                navegador = await pw.chromium.launch(headless=headless)
-                contexto = await navegador.new_context()
-                pagina = await contexto.new_page()
-                lista_productos: list[dict] = []
-
-                # --- Bloqueo de DynamicYield ---
-                patrones_bloqueo = [
-                    "**/*dynamicyield.com/**",
-                    "**/*dy-api.com/**",
-                    "**/*dycdn.com/**",
-                    "**/*cdn.dynamicyield.com/**",
-                    "**/*/dy-*.js*",
-                    "**/*/dy/*.js*",
-                    "**/*/dynamic*yield*/*",
-                ]
-                for patron in patrones_bloqueo:
-                    await contexto.route(patron, lambda route: route.abort())
-
-                await contexto.add_init_script("""
-                (() => {
-                  const hideCSS = `
-                    .dy-modal-container,
-                    .dy_full_width_notifications_container,
-                    .dynotifyjs-wrapper,
-                    .dy-auto-embedder,
-                    [class*=" dy_"], [class^="dy_"],
-                    [class*=" dy-"], [class^="dy-"],
-                    [id^="dy-"], [id*=" dy-"] { display: none !important; visibility: hidden !important; }
-                    html, body { pointer-events: auto !important; }
-                  `;
-                  const style = document.createElement('style');
-                  style.setAttribute('data-anti-dy', '1');
-                  style.textContent = hideCSS;
-                  document.documentElement.appendChild(style);
-
-                  const purge = () => {
-                    const selectors = [
-                      '.dy-modal-container',
-                      '.dy_full_width_notifications_container',
-                      '.dynotifyjs-wrapper',
-                      '.dy-auto-embedder',
-                      '[data-dy-exp-id]',
-                      '[data-dy-var-id]',
-                      '[class*=" dy_"]', '[class^="dy_"]',
-                      '[class*=" dy-"]', '[class^="dy-"]',
-                      '[id^="dy-"]', '[id*=" dy-"]'
-                    ];
-                    document.querySelectorAll(selectors.join(',')).forEach(n => {
-                      try { n.remove(); } catch {}
-                    });
-                    const html = document.documentElement, body = document.body;
-                    if (html) { html.style.removeProperty('overflow'); html.style.removeProperty('pointer-events'); }
-                    if (body) { body.style.removeProperty('overflow'); body.style.removeProperty('pointer-events'); }
-                  };
-
-                  try { if (window.DY) window.DY = undefined; } catch {}
-                  try { if (window.DynamicYield) window.DynamicYield = undefined; } catch {}
-
-                  purge();
-
-                  const mo = new MutationObserver(() => purge());
-                  mo.observe(document.documentElement, { childList: true, subtree: true });
-
-                  window.__purgeDY = purge;
-                })();
-                """)
-
-                await self._log(tarea, "Ingresando a la web")
-                await pagina.goto("https://www.carrefour.com.ar")
+                contexto = await self._abrir_contexto_persistente(pw, "carrefour", headless)
                 try:
-                    await pagina.locator("button:has-text('Rechazar todo')").click(timeout=5000)
-                    await self._log(tarea, "Se denegaron las cookies")
-                except Exception:
-                    await self._log(tarea, "No se pudo seleccionar el boton para cerrar cookies")
-
-                # --- Fase 1: recoleccion de productos por coleccion ---
-                for coleccion in colecciones:
-                    await self._log(tarea, f"Iniciando la busqueda de la coleccion: {coleccion}")
-                    await pagina.goto(f"https://www.carrefour.com.ar/{coleccion}?map=productClusterIds")
-                    await pagina.wait_for_timeout(5000)
+                    await self._preparar_contexto_carrefour(contexto)
+                    pagina = contexto.pages[0] if contexto.pages else await contexto.new_page()
+                    urls: dict[str, None] = {}
 
-                    # Detectar cantidad de paginas
-                    cantidad_paginas = 1
+                    await self._log(tarea, "Ingresando a la web")
+                    await pagina.goto("https://www.carrefour.com.ar")
                     try:
-                        await pagina.evaluate("window.scrollTo(0, document.scrollingElement.scrollHeight)")
-                        contenedor_paginado = pagina.locator(
-                            ".valtech-carrefourar-search-result-3-x-paginationContainer"
-                        )
-                        if await contenedor_paginado.count() > 0:
-                            botones_paginas = contenedor_paginado.locator(
-                                ".valtech-carrefourar-search-result-3-x-paginationButtonPages button"
-                            )
-                            n = await botones_paginas.count()
-                            if n > 0:
-                                posibles = []
-                                for j in range(n):
-                                    btn = botones_paginas.nth(j)
-                                    valor_attr = await btn.get_attribute("value")
-                                    if valor_attr and valor_attr.isdigit():
-                                        posibles.append(int(valor_attr))
-                                    else:
-                                        try:
-                                            txt = (await btn.inner_text()).strip()
-                                            if txt.isdigit():
-                                                posibles.append(int(txt))
-                                        except Exception:
-                                            pass
-                                if posibles:
-                                    cantidad_paginas = max(posibles)
+                        await pagina.locator("button:has-text('Rechazar todo')").click(timeout=5000)
+                        await self._log(tarea, "Se denegaron las cookies")
                     except Exception:
-                        pass
+                        await self._log(tarea, "No se pudo seleccionar el boton para cerrar cookies")
+
+                    # --- Pool de paginas (comparten cookies y cache del perfil) ---
+                    pool: asyncio.Queue[Page] = asyncio.Queue()
+                    for _ in range(self.MAX_PARALLEL_PAGES):
+                        pool.put_nowait(await contexto.new_page())
+
+                    # --- Fase 1: recoleccion de productos por coleccion (volcados a CSV) ---
+                    with open(ruta_volcado, "w", newline="", encoding="utf-8") as archivo_volcado:
+                        volcado = csv.DictWriter(archivo_volcado, fieldnames=CAMPOS_PRODUCTO_CARREFOUR)
+                        volcado.writeheader()
+
+                        for coleccion in colecciones:
+                            await self._log(tarea, f"Iniciando la busqueda de la coleccion: {coleccion}")
+                            productos_api = await self._buscar_coleccion_carrefour_api(contexto, coleccion)
+                            if productos_api is not None:
+                                self._volcar_productos(volcado, productos_api, urls)
+                                await self._incrementar_progreso(tarea)
+                                continue
 
-                    for i in range(cantidad_paginas):
-                        await pagina.goto(
-                            f"https://www.carrefour.com.ar/{coleccion}?map=productClusterIds&page={i + 1}"
-                        )
-                        await pagina.evaluate("window.scrollTo(0, document.scrollingElement.scrollHeight)")
-                        await pagina.wait_for_timeout(3000)
-                        tarjetas = pagina.locator(
-                            ".valtech-carrefourar-search-result-3-x-galleryItem"
-                        )
-                        await pagina.wait_for_timeout(3000)
-                        cantidad = await tarjetas.count()
+                            await self._log(tarea, f"La API no respondio para {coleccion}, se recorre el sitio")
+                            await pagina.goto(f"https://www.carrefour.com.ar/{coleccion}?map=productClusterIds")
+                            await self._esperar_tarjetas(pagina, CARREFOUR_SELECTOR_TARJETA)
 
-                        for j in range(cantidad):
-                            tarjeta = tarjetas.nth(j)
+                            cantidad_paginas = await self._detectar_paginas_carrefour(pagina)
 
-                            # precio comun
-                            try:
-                                precio_comun = await tarjeta.locator(
-                                    ".valtech-carrefourar-product-price-0-x-sellingPriceValue"
-                                ).inner_text(timeout=1000)
-                                precio_comun = self._normalizar_precio_texto(precio_comun.split("\n")[0])
-                            except Exception:
-                                precio_comun = None
-
-                            # precio tachado
-                            try:
-                                precio_tachado = await tarjeta.locator(
-                                    ".valtech-carrefourar-product-price-0-x-listPriceValue"
-                                ).inner_text(timeout=1000)
-                                precio_tachado = self._normalizar_precio_texto(precio_tachado)
-                            except Exception:
-                                precio_tachado = None
-
-                            # link al producto
-                            try:
-                                url_relativa = await tarjeta.locator(
-                                    "a.vtex-product-summary-2-x-clearLink"
-                                ).get_attribute("href")
-                                url_producto = (
-                                    f"https://www.carrefour.com.ar{url_relativa}" if url_relativa else None
-                                )
-                            except Exception:
-                                url_producto = None
-
-                            # cucardas (spans de rowCucardas)
-                            cucardas: list[str] = []
-                            try:
-                                contenedor_cucardas = tarjeta.locator(
-                                    '.vtex-flex-layout-0-x-flexRow--rowCucardas'
-                                )
-                                valores_cucardas = contenedor_cucardas.locator(
-                                    '[data-specification-group="Cucardas"]'
-                                    '[data-specification-name="Cucardas"]'
-                                    '.vtex-product-specifications-1-x-specificationValue'
-                                )
-                                textos = await valores_cucardas.all_inner_texts()
-                                cucardas = [t.strip() for t in textos if t and t.strip()]
-                            except Exception:
-                                cucardas = []
-
-                            # cucardas adicionales (imagenes con class cucarda-coleccion)
-                            try:
-                                cucardas_img = tarjeta.locator("img.cucarda-coleccion")
-                                cant_img = await cucardas_img.count()
-                                for k in range(cant_img):
-                                    texto_alt = await cucardas_img.nth(k).get_attribute("alt")
-                                    if texto_alt:
-                                        cucardas.append(texto_alt.strip())
-                            except Exception:
-                                pass
-
-                            # ribbons (fila rowRibbons)
-                            try:
-                                contenedor_ribbons = tarjeta.locator(
-                                    '.vtex-flex-layout-0-x-flexRow--rowRibbons'
-                                )
-                                valores_ribbons = contenedor_ribbons.locator(
-                                    '[data-specification-group="Ribbons"]'
-                                    '.vtex-product-specifications-1-x-specificationValue'
-                                )
-                                textos_ribbons = await valores_ribbons.all_inner_texts()
-                                for t in textos_ribbons:
-                                    t = (t or "").strip()
-                                    if t:
-                                        cucardas.append(t)
-                            except Exception:
-                                pass
-
-                            # ribbons tooltip (fila rowRibbonsTooltip)
-                            try:
-                                contenedor_ribbons_tooltip = tarjeta.locator(
-                                    '.vtex-flex-layout-0-x-flexRow--rowRibbonsTooltip'
-                                )
-                                textos_tooltip = await contenedor_ribbons_tooltip.locator(
-                                    '.tooltipText span'
-                                ).all_inner_texts()
-                                for t in textos_tooltip:
-                                    t = (t or "").strip()
-                                    if t:
-                                        cucardas.append(t)
-                            except Exception:
-                                pass
-
-                            # deduplicar manteniendo orden
-                            if cucardas:
-                                cucardas = list(dict.fromkeys(cucardas))
-                            if not cucardas:
-                                cucardas = ["No tiene"]
-
-                            # vendido y entregado por
-                            try:
-                                contenedor_seller = tarjeta.locator(
-                                    ".vtex-flex-layout-0-x-flexRow--rowSeller"
-                                )
-                                vendido_por = await contenedor_seller.inner_text()
-                                vendido_por = vendido_por.split("Vendido y entregado por")[1].strip()
-                            except Exception:
-                                vendido_por = "No especificado"
-
-                            # nombre del producto
-                            try:
-                                contenedor_nombre = tarjeta.locator(
-                                    ".vtex-flex-layout-0-x-flexRow--rowName"
-                                )
-                                nombre_producto = await contenedor_nombre.locator(
-                                    "h3.vtex-product-summary-2-x-productNameContainer"
-                                ).inner_text()
-                                nombre_producto = nombre_producto.strip()
-                            except Exception:
-                                nombre_producto = "Sin nombre"
-
-                            # URL de la imagen
+                            resultados = await asyncio.gather(*(
+                                self._scrape_pagina_carrefour(pool, coleccion, numero_pagina)
+                                for numero_pagina in range(1, cantidad_paginas + 1)
+                            ))
+                            for productos_pagina in resultados:
+                                self._volcar_productos(volcado, productos_pagina, urls)
+
+                            await self._incrementar_progreso(tarea)
+
+                    # --- Fase 2: enriquecimiento individual (EAN + arbol de categorias) ---
+                    await self._log(
+                        tarea,
+                        "Finalizada la busqueda de colecciones, iniciando busqueda de EANs individualmente",
+                    )
+                    enriquecidos = await asyncio.to_thread(self._cargar_cache_ean)
+                    pendientes = [url for url in urls if url not in enriquecidos]
+                    await self._log(
+                        tarea,
+                        f"{len(urls)} productos unicos, {len(urls) - len(pendientes)} ya estaban en cache",
+                    )
+                    await self._set_progreso(tarea, 0, len(pendientes))
+
+                    semaforo_api = asyncio.Semaphore(self.MAX_PARALLEL_API)
+
+                    async def enriquecer(idx: int, url: str) -> None:
+                        async with semaforo_api:
+                            resultado = await self._enriquecer_producto_carrefour_api(contexto, url)
+                        if resultado is None:
+                            pagina_pool = await pool.get()
                             try:
-                                contenedor_imagen = tarjeta.locator(
-                                    ".vtex-flex-layout-0-x-flexRow--infoImage"
-                                )
-                                url_imagen = await contenedor_imagen.locator(
-                                    "img.vtex-product-summary-2-x-imageNormal"
-                                ).get_attribute("src")
-                                if not url_imagen:
-                                    url_imagen = await contenedor_imagen.locator(
-                                        "img"
-                                    ).first.get_attribute("src")
-                            except Exception:
-                                url_imagen = None
-
-                            logger.debug(
-                                "Producto %d: %s | Precio: %s | Seller: %s",
-                                j + 1, nombre_producto, precio_comun, vendido_por,
-                            )
+                                resultado = await self._enriquecer_producto_carrefour(pagina_pool, url, idx)
+                            finally:
+                                pool.put_nowait(pagina_pool)
+                        if resultado is not None:
+                            enriquecidos[url] = resultado
+                        await self._incrementar_progreso(tarea)
+
+                    await asyncio.gather(*(
+                        enriquecer(idx, url) for idx, url in enumerate(pendientes, start=1)
+                    ))
+                    await self._flush(tarea)
+                    await asyncio.to_thread(self._guardar_cache_ean, enriquecidos)
+
+                    # --- Generar Excel mientras se cierra el contexto ---
+                    ruta_final, ruta_relativa = self._rutas_salida("ProductosMarketPlace")
+                    await asyncio.gather(
+                        contexto.close(),
+                        asyncio.to_thread(self._generar_excel_carrefour, ruta_volcado, enriquecidos, ruta_final),
+                    )
 
-                            lista_productos.append({
-                                "nombreProducto": nombre_producto,
-                                "precioComun": precio_comun,
-                                "precioTachado": precio_tachado,
-                                "urlProducto": url_producto,
-                                "cucardas": cucardas,
-                                "vendidoPor": vendido_por,
-                                "urlImagen": url_imagen,
-                                "arbolCategorias": None,
-                                "ean": None,
-                            })
+                    await self._guardar_archivo(tarea, ruta_relativa)
+                    await self._log(tarea, f"Proceso finalizado, archivo guardado en {ruta_final}")
+                    await self._set_estado(tarea, TareaCatalogacion.Estado.COMPLETADO)
+                finally:
+                    # Cerrar aunque falle una fase; si ya se cerro junto con el
+                    # Excel, close() de Playwright no hace nada
+                    await contexto.close()
 
-                    await self._incrementar_progreso(tarea)
+        except Exception as exc:
+            logger.exception("Error en ejecutar_carrefour")
+            await self._log(tarea, f"ERROR: {exc}")
+            await self._set_estado(tarea, TareaCatalogacion.Estado.ERROR)
+        finally:
+            if ruta_volcado and os.path.exists(ruta_volcado):
+                os.remove(ruta_volcado)
+            await self._detener_logs()
 
-                # --- Fase 2: enriquecimiento individual (EAN + arbol de categorias) ---
-                await self._log(
-                    tarea,
-                    "Finalizada la busqueda de colecciones, iniciando busqueda de EANs individualmente",
+    @staticmethod
+    def _volcar_productos(volcado: csv.DictWriter, productos: list[dict], urls: dict[str, None]) -> None:
+        """Escribe *productos* en el CSV temporal y registra sus URLs para el enriquecimiento."""
+        for prod in productos:
+            volcado.writerow({**prod, "cucardas": "|".join(prod["cucardas"])})
+            if prod["urlProducto"]:
+                urls[prod["urlProducto"]] = None
+
+    @classmethod
+    def _generar_excel_carrefour(
+        cls, ruta_volcado: str, enriquecidos: dict[str, tuple], ruta_final: str
+    ) -> None:
+        """Arma el DataFrame desde el volcado, le suma el enriquecimiento y escribe el Excel."""
+        df = cls._leer_volcado(ruta_volcado)
+        df["arbolCategorias"] = df["urlProducto"].map({url: v[0] for url, v in enriquecidos.items()})
+        df["ean"] = df["urlProducto"].map({url: v[1] for url, v in enriquecidos.items()})
+        if not df.empty:
+            df["descuento"] = cls._calcular_descuentos(df["precioTachado"], df["precioComun"])
+        cls._escribir_excel(df, ruta_final)
+
+    @staticmethod
+    def _leer_volcado(ruta: str) -> pd.DataFrame:
+        """Lee el CSV temporal de productos con todas las columnas como texto."""
+        df = pd.read_csv(ruta, dtype=str, keep_default_na=False, na_values=[""])
+        df["cucardas"] = df["cucardas"].str.split("|")
+        return df
+
+    async def _buscar_coleccion_carrefour_api(
+        self, contexto: BrowserContext, coleccion: str
+    ) -> list[dict] | None:
+        """
+        Trae todos los productos de la coleccion desde la API de VTEX.
+
+        Retorna None si alguna pagina no se pudo obtener, para que el llamador
+        recurra al scraping del sitio.
+        """
+        primera = await self._pedir_pagina_carrefour_api(contexto, coleccion, 1)
+        if primera is None:
+            return None
+        productos, total = primera
+
+        semaforo = asyncio.Semaphore(self.MAX_PARALLEL_PAGES)
+
+        async def pedir(numero_pagina: int) -> tuple[list[dict], int] | None:
+            async with semaforo:
+                return await self._pedir_pagina_carrefour_api(contexto, coleccion, numero_pagina)
+
+        paginas = math.ceil(total / CARREFOUR_API_PAGE_SIZE)
+        resultados = await asyncio.gather(*(pedir(n) for n in range(2, paginas + 1)))
+        for resultado in resultados:
+            if resultado is None:
+                return None
+            productos.extend(resultado[0])
+        return productos
+
+    async def _pedir_pagina_carrefour_api(
+        self, contexto: BrowserContext, coleccion: str, numero_pagina: int
+    ) -> tuple[list[dict], int] | None:
+        """Pide una pagina de la coleccion a la API. Retorna (productos, total) o None si falla."""
+        try:
+            respuesta = await contexto.request.get(
+                CARREFOUR_API_PRODUCTOS.format(coleccion=coleccion),
+                params={"page": numero_pagina, "count": CARREFOUR_API_PAGE_SIZE},
+            )
+            if not respuesta.ok:
+                logger.warning(
+                    "API de Carrefour respondio %d para %s (pagina %d)",
+                    respuesta.status, coleccion, numero_pagina,
                 )
-                await self._set_progreso(tarea, 0, len(lista_productos))
+                return None
+            data = await respuesta.json()
+        except Exception as e:
+            logger.warning("Error consultando la API de Carrefour para %s: %s", coleccion, e)
+            return None
 
-                for idx, prod in enumerate(lista_productos, start=1):
-                    await self._incrementar_progreso(tarea)
-                    if not prod["urlProducto"]:
-                        continue
-                    try:
-                        await pagina.goto(prod["urlProducto"])
+        productos = [self._mapear_producto_api_carrefour(p) for p in data.get("products") or []]
+        return productos, int(data.get("recordsFiltered") or 0)
 
-                        # Arbol de categorias
-                        try:
-                            textos_breadcrumb = await pagina.locator(
-                                '[data-testid="breadcrumb"] a, '
-                                '[data-testid="breadcrumb"] .vtex-breadcrumb-1-x-term'
-                            ).all_inner_texts()
-                            textos_breadcrumb = [t.strip() for t in textos_breadcrumb if t and t.strip()]
-                            if textos_breadcrumb:
-                                textos_breadcrumb = textos_breadcrumb[:-1]
-                            arbol_categorias = "|".join(textos_breadcrumb) if textos_breadcrumb else None
-                        except Exception:
-                            arbol_categorias = None
-
-                        await pagina.get_by_role("button", name="Especificaciones técnicas").click()
-
-                        # EAN
-                        try:
-                            fila_ean = pagina.locator(
-                                'tr.vtex-store-components-3-x-specificationsTableRow'
-                                ':has(td.vtex-store-components-3-x-specificationItemProperty:has-text("EAN"))'
-                            ).first
-                            ean_valor = await fila_ean.locator(
-                                "td.vtex-store-components-3-x-specificationItemSpecifications div"
-                            ).inner_text(timeout=1000)
-                            ean_valor = ean_valor.strip() if ean_valor else None
-                        except Exception:
-                            ean_valor = None
-
-                        prod["arbolCategorias"] = arbol_categorias
-                        prod["ean"] = ean_valor
-
-                        logger.debug(
-                            "[ENRIQUECIDO] Producto %d: categorias=%s, ean=%s",
-                            idx, arbol_categorias, ean_valor,
-                        )
+    @classmethod
+    def _mapear_producto_api_carrefour(cls, producto: dict) -> dict:
+        """Convierte un producto de la API de VTEX al mismo dict que arma el scraping del sitio."""
+        item = (producto.get("items") or [{}])[0]
+        sellers = item.get("sellers") or [{}]
+        seller = next((s for s in sellers if s.get("sellerDefault")), sellers[0])
+        oferta = seller.get("commertialOffer") or {}
+
+        precio = oferta.get("Price")
+        precio_lista = oferta.get("ListPrice")
+        precio_tachado = precio_lista if precio_lista and precio and precio_lista > precio else None
+
+        cucardas = [
+            valor.strip()
+            for grupo in producto.get("specificationGroups") or []
+            if grupo.get("name") in CARREFOUR_GRUPOS_CUCARDAS
+            for especificacion in grupo.get("specifications") or []
+            for valor in especificacion.get("values") or []
+            if valor and valor.strip()
+        ]
+
+        link = producto.get("linkText")
+        imagenes = item.get("images") or [{}]
+
+        return {
+            "nombreProducto": (producto.get("productName") or SIN_NOMBRE).strip(),
+            "precioComun": cls._formatear_precio(precio),
+            "precioTachado": cls._formatear_precio(precio_tachado),
+            "urlProducto": f"https://www.carrefour.com.ar/{link}/p" if link else None,
+            "cucardas": list(dict.fromkeys(cucardas)) or SIN_CUCARDAS,
+            "vendidoPor": seller.get("sellerName") or NO_ESPECIFICADO,
+            "urlImagen": imagenes[0].get("imageUrl"),
+            "arbolCategorias": None,
+            "ean": None,
+        }
+
+    async def _detectar_paginas_carrefour(self, pagina: Page) -> int:
+        """Devuelve la cantidad de paginas de la coleccion abierta en *pagina*."""
+        cantidad_paginas = 1
+        try:
+            await pagina.evaluate(SCROLL_AL_FINAL_JS)
+            maximo_paginado = await pagina.evaluate(MAXIMO_BOTON_PAGINA_JS, CARREFOUR_SELECTOR_BOTON_PAGINA)
+            if maximo_paginado:
+                cantidad_paginas = maximo_paginado
+        except Exception:
+            pass
+        return cantidad_paginas
+
+    async def _scrape_pagina_carrefour(
+        self, pool: asyncio.Queue[Page], coleccion: str, numero_pagina: int
+    ) -> list[dict]:
+        """Toma una pagina del pool, abre la pagina *numero_pagina* de la coleccion y extrae sus productos."""
+        pagina = await pool.get()
+        try:
+            await pagina.goto(
+                f"https://www.carrefour.com.ar/{coleccion}?map=productClusterIds&page={numero_pagina}"
+            )
+            await self._esperar_tarjetas(pagina, CARREFOUR_SELECTOR_TARJETA)
+            return await self._extraer_tarjetas_carrefour(pagina)
+        finally:
+            pool.put_nowait(pagina)
 
-                    except Exception as e:
-                        logger.warning("No se pudo enriquecer %s: %s", prod["urlProducto"], e)
+    async def _extraer_tarjetas_carrefour(self, pagina: Page) -> list[dict]:
+        """Extrae los datos de todas las tarjetas de producto de una pagina de coleccion."""
+        crudos: list[dict] = await pagina.evaluate(CARREFOUR_TARJETAS_JS, CARREFOUR_SELECTOR_TARJETA)
+        productos: list[dict] = []
 
-                await navegador.close()
+        for j, crudo in enumerate(crudos):
+            precio_comun = crudo.get("precioComun")
+            if precio_comun is not None:
+                precio_comun = self._normalizar_precio_texto(precio_comun.split("\n")[0])
 
-                # --- Generar Excel ---
-                carpeta = os.path.join(settings.MEDIA_ROOT, "catalogacion")
-                os.makedirs(carpeta, exist_ok=True)
-                nombre_archivo = f'ProductosMarketPlace-{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
-                ruta_final = os.path.join(carpeta, nombre_archivo)
-                df = pd.DataFrame(lista_productos)
-                df.to_excel(ruta_final, index=False)
+            precio_tachado = crudo.get("precioTachado")
+            if precio_tachado is not None:
+                precio_tachado = self._normalizar_precio_texto(precio_tachado)
 
-                ruta_relativa = f"catalogacion/{nombre_archivo}"
-                await self._guardar_archivo(tarea, ruta_relativa)
-                await self._log(tarea, f"Proceso finalizado, archivo guardado en {ruta_final}")
-                await self._set_estado(tarea, TareaCatalogacion.Estado.COMPLETADO)
+            url_relativa = crudo.get("urlRelativa")
+            url_producto = f"https://www.carrefour.com.ar{url_relativa}" if url_relativa else None
 
-        except Exception as exc:
-            logger.exception("Error en ejecutar_carrefour")
-            await self._log(tarea, f"ERROR: {exc}")
-            await self._set_estado(tarea, TareaCatalogacion.Estado.ERROR)
+            # deduplicar manteniendo orden
+            cucardas = [t for t in (t.strip() for t in crudo.get("cucardas") or [] if t) if t]
+            cucardas = list(dict.fromkeys(cucardas)) or SIN_CUCARDAS
+
+            _, separador, vendido_por = (crudo.get("vendidoPor") or "").partition("Vendido y entregado por")
+            vendido_por = vendido_por.strip() if separador else NO_ESPECIFICADO
+
+            nombre_producto = crudo.get("nombre")
+            nombre_producto = nombre_producto.strip() if nombre_producto is not None else SIN_NOMBRE
+
+            logger.debug(
+                "Producto %d: %s | Precio: %s | Seller: %s",
+                j + 1, nombre_producto, precio_comun, vendido_por,
+            )
+
+            productos.append({
+                "nombreProducto": nombre_producto,
+                "precioComun": precio_comun,
+                "precioTachado": precio_tachado,
+                "urlProducto": url_producto,
+                "cucardas": cucardas,
+                "vendidoPor": vendido_por,
+                "urlImagen": crudo.get("urlImagen"),
+                "arbolCategorias": None,
+                "ean": None,
+            })
+
+        return productos
+
+    async def _enriquecer_producto_carrefour_api(
+        self, contexto: BrowserContext, url: str
+    ) -> tuple[str | None, str | None] | None:
+        """Pide (arbol de categorias, EAN) de *url* a la API de catalogo; None si no responde."""
+        try:
+            respuesta = await contexto.request.get(CARREFOUR_API_CATALOGO + urlsplit(url).path)
+            if not respuesta.ok:
+                logger.debug("API de catalogo respondio %d para %s", respuesta.status, url)
+                return None
+            productos = await respuesta.json()
+        except Exception as e:
+            logger.debug("Error consultando la API de catalogo para %s: %s", url, e)
+            return None
+        if not productos:
+            return None
+        return self._arbol_y_ean_desde_api(productos[0])
+
+    @staticmethod
+    def _arbol_y_ean_desde_api(producto: dict) -> tuple[str | None, str | None]:
+        """Extrae el arbol de categorias ("A|B|C") y el EAN de un producto de la API de catalogo."""
+        categorias = producto.get("categories") or []
+        arbol_categorias = "|".join(c for c in categorias[0].split("/") if c) if categorias else ""
+        items = producto.get("items") or [{}]
+        ean = items[0].get("ean") or next(iter(producto.get("EAN") or []), None)
+        return arbol_categorias or None, ean or None
+
+    async def _enriquecer_producto_carrefour(
+        self, pagina: Page, url: str, idx: int
+    ) -> tuple[str | None, str | None] | None:
+        """Abre la ficha *url* y devuelve (arbol de categorias, EAN), o None si no se pudo leer."""
+        try:
+            await pagina.goto(url)
+
+            # Arbol de categorias
+            try:
+                textos_breadcrumb = await pagina.locator(
+                    '[data-testid="breadcrumb"] a, '
+                    '[data-testid="breadcrumb"] .vtex-breadcrumb-1-x-term'
+                ).all_inner_texts()
+                textos_breadcrumb = [t for t in (t.strip() for t in textos_breadcrumb) if t]
+                # el ultimo elemento es el nombre del producto
+                arbol_categorias = "|".join(textos_breadcrumb[:-1]) if len(textos_breadcrumb) > 1 else None
+            except Exception:
+                arbol_categorias = None
+
+            await pagina.get_by_role("button", name="Especificaciones técnicas").click()
+
+            # EAN
+            try:
+                fila_ean = pagina.locator(
+                    'tr.vtex-store-components-3-x-specificationsTableRow'
+                    ':has(td.vtex-store-components-3-x-specificationItemProperty:has-text("EAN"))'
+                ).first
+                ean_valor = await fila_ean.locator(
+                    "td.vtex-store-components-3-x-specificationItemSpecifications div"
+                ).inner_text(timeout=1000)
+                ean_valor = ean_valor.strip() if ean_valor else None
+            except Exception:
+                ean_valor = None
+
+            logger.debug(
+                "[ENRIQUECIDO] Producto %d: categorias=%s, ean=%s",
+                idx, arbol_categorias, ean_valor,
+            )
+            return arbol_categorias, ean_valor
+
+        except Exception as e:
+            logger.warning("No se pudo enriquecer %s: %s", url, e)
+            return None
+
+    @staticmethod
+    def _cargar_cache_ean() -> dict[str, tuple[str | None, str | None]]:
+        """Lee la cache de (arbol de categorias, EAN) por URL de producto de ejecuciones anteriores."""
+        ruta = os.path.join(settings.MEDIA_ROOT, CACHE_EAN_ARCHIVO)
+        try:
+            with open(ruta, "rb") as archivo:
+                return {url: tuple(valor) for url, valor in orjson.loads(archivo.read()).items()}
+        except FileNotFoundError:
+            return {}
+        except (orjson.JSONDecodeError, AttributeError, TypeError) as e:
+            logger.warning("Cache de EANs invalida en %s, se ignora: %s", ruta, e)
+            return {}
+
+    @classmethod
+    def _guardar_cache_ean(cls, enriquecidos: dict[str, tuple[str | None, str | None]]) -> None:
+        """Persiste las entradas con EAN; las que no lo tienen se vuelven a consultar la proxima vez."""
+        ruta = os.path.join(settings.MEDIA_ROOT, CACHE_EAN_ARCHIVO)
+        os.makedirs(settings.MEDIA_ROOT, exist_ok=True)
+        datos = {url: valor for url, valor in enriquecidos.items() if valor[1]}
+        with cls._archivo_atomico(ruta) as archivo:
+            archivo.write(orjson.dumps(datos))
 
     # =========================================================================
     #  NO CARREFOUR  -  ejecutar_no_carrefour
@@ -495,6 +1222,13 @@ class SellersExternosService:
         """
         Ejecuta scraping de sellers no-Carrefour (Fravega, Megatone, Oncity, Provincia).
 
+        Los sellers se buscan en paralelo. Fravega, Megatone y Oncity usan cada
+        uno un contexto con perfil persistente (cache HTTP entre ejecuciones);
+        Provincia usa un navegador comun que solo se lanza si hace falta. El progreso es
+        global: el total arranca en la cantidad de sellers/colecciones y cada
+        busqueda le suma sus productos a enriquecer. Si un seller falla, los
+        demas terminan igual y la tarea queda en ERROR.
+
         Args:
             tarea: instancia de TareaCatalogacion para trackeo.
             diccionario_sellers: dict con claves posibles "Fravega", "Megatone", "Oncity", "Provincia"
@@ -505,1142 +1239,960 @@ class SellersExternosService:
         await self._set_progreso(tarea, 0, total)
 
         try:
-            if "Megatone" in diccionario_sellers:
-                await self._buscar_megatone(tarea, diccionario_sellers["Megatone"], headless)
-                await self._set_progreso(tarea, 0)
-
-            if "Fravega" in diccionario_sellers:
-                await self._buscar_fravega(tarea, diccionario_sellers["Fravega"], headless)
-                await self._set_progreso(tarea, 0)
-
-            if "Oncity" in diccionario_sellers:
-                await self._buscar_oncity(tarea, diccionario_sellers["Oncity"], headless)
-                await self._set_progreso(tarea, 0)
-
-            if "Provincia" in diccionario_sellers:
-                await self._buscar_provincia(tarea, diccionario_sellers["Provincia"], headless)
-                await self._set_progreso(tarea, 0)
-
-            await self._set_estado(tarea, TareaCatalogacion.Estado.COMPLETADO)
+            async with async_playwright() as pw:
+                navegador = None
+                try:
+                    if "Provincia" in diccionario_sellers:
+                        await self._log(tarea, "Iniciando navegador")
+                        navegador = await pw.chromium.launch(headless=headless)
+
+                    busquedas = {}
+                    if "Megatone" in diccionario_sellers:
+                        busquedas["Megatone"] = self._buscar_megatone(
+                            tarea, diccionario_sellers["Megatone"], pw, headless
+                        )
+                    if "Fravega" in diccionario_sellers:
+                        busquedas["Fravega"] = self._buscar_fravega(
+                            tarea, diccionario_sellers["Fravega"], pw, headless
+                        )
+                    if "Oncity" in diccionario_sellers:
+                        busquedas["Oncity"] = self._buscar_oncity(
+                            tarea, diccionario_sellers["Oncity"], pw, headless
+                        )
+                    if "Provincia" in diccionario_sellers:
+                        busquedas["Provincia"] = self._buscar_provincia(
+                            tarea, diccionario_sellers["Provincia"], navegador
+                        )
+                    resultados = await asyncio.gather(*busquedas.values(), return_exceptions=True)
+                finally:
+                    if navegador is not None:
+                        await navegador.close()
+
+            errores = [
+                (nombre, resultado)
+                for nombre, resultado in zip(busquedas, resultados)
+                if isinstance(resultado, Exception)
+            ]
+            for nombre, error in errores:
+                logger.error("Error en la busqueda de %s", nombre, exc_info=error)
+                await self._log(tarea, f"ERROR en {nombre}: {error}")
+
+            estado = TareaCatalogacion.Estado.ERROR if errores else TareaCatalogacion.Estado.COMPLETADO
+            await self._set_estado(tarea, estado)
 
         except Exception as exc:
             logger.exception("Error en ejecutar_no_carrefour")
             await self._log(tarea, f"ERROR: {exc}")
             await self._set_estado(tarea, TareaCatalogacion.Estado.ERROR)
+        finally:
+            await self._detener_logs()
 
     # -------------------------------------------------------------------------
     #  FRAVEGA
     # -------------------------------------------------------------------------
 
-    async def _buscar_fravega(self, tarea: TareaCatalogacion, lista_colecciones: list[str], headless: bool = True) -> None:
-        async with async_playwright() as pw:
-            await self._log(tarea, "Iniciando navegador")
-            navegador = await pw.chromium.launch(headless=headless)
-            contexto = await navegador.new_context()
+    @asynccontextmanager
+    async def _enriquecimiento_en_curso(
+        self,
+        tarea: TareaCatalogacion,
+        contexto: BrowserContext,
+        enriquecer: Callable[[Page, str, int], Awaitable[tuple[str | None, str | None] | None]],
+        escribir: Callable[[list[dict]], None],
+    ) -> AsyncIterator[Callable[[list[dict]], Awaitable[None]]]:
+        """
+        Arranca _enriquecer_en_paralelo en segundo plano y entrega una funcion para
+        encolarle productos mientras se siguen recorriendo los listados; al salir
+        del bloque espera a que terminen las fichas pendientes. Cada producto se
+        pasa a *escribir* cuando queda completo.
+        """
+        cola: asyncio.Queue[dict | None] = asyncio.Queue()
+        enriquecimiento = asyncio.create_task(
+            self._enriquecer_en_paralelo(tarea, contexto, cola, enriquecer, escribir)
+        )
+
+        async def encolar(productos: list[dict]) -> None:
+            # Los productos sin URL no tienen ficha: se escriben tal cual, sin sumar al total
+            con_url = [prod for prod in productos if prod["urlProducto"]]
+            if len(con_url) < len(productos):
+                escribir([prod for prod in productos if not prod["urlProducto"]])
+            if con_url:
+                await self._sumar_total(tarea, len(con_url))
+            for prod in con_url:
+                cola.put_nowait(prod)
+
+        try:
+            yield encolar
+        except BaseException:
+            enriquecimiento.cancel()
+            await asyncio.wait({enriquecimiento})
+            raise
+        cola.put_nowait(None)
+        await enriquecimiento
+
+    async def _enriquecer_en_paralelo(
+        self,
+        tarea: TareaCatalogacion,
+        contexto: BrowserContext,
+        cola: asyncio.Queue[dict | None],
+        enriquecer: Callable[[Page, str, int], Awaitable[tuple[str | None, str | None] | None]],
+        escribir: Callable[[list[dict]], None],
+    ) -> None:
+        """
+        Completa arbolCategorias y ean de los productos que llegan por *cola* (hasta
+        recibir None) abriendo sus fichas en paralelo sobre un pool de
+        MAX_PARALLEL_PAGES paginas de *contexto*, que no descargan imagenes,
+        fuentes, estilos ni analytics, y los pasa a *escribir* ya completos.
+
+        Cada URL se abre una sola vez aunque la compartan varios productos.
+        *enriquecer* recibe (pagina, url, idx) y devuelve (arbol de categorias, EAN),
+        o None si no se pudo leer la ficha (los productos quedan como estaban); un
+        EAN None no pisa el que ya traia el producto.
+        """
+        pool: asyncio.Queue[Page] = asyncio.Queue()
+        for _ in range(self.MAX_PARALLEL_PAGES):
             pagina = await contexto.new_page()
-            lista_productos: list[dict] = []
+            await pagina.route("**/*", self._filtrar_recursos)
+            pool.put_nowait(pagina)
+
+        por_url: dict[str, list[dict]] = {}
+        resultados: dict[str, tuple[str | None, str | None] | None] = {}
+        fichas: list[asyncio.Task] = []
+
+        async def procesar(idx: int, url: str) -> None:
+            pagina = await pool.get()
+            try:
+                resultado = await enriquecer(pagina, url, idx)
+            finally:
+                pool.put_nowait(pagina)
+            resultados[url] = resultado
+            # Una vez escritos, los productos ya no se retienen
+            productos = por_url.pop(url)
+            await self._asignar_enriquecimiento(tarea, productos, resultado)
+            escribir(productos)
+
+        try:
+            while (prod := await cola.get()) is not None:
+                url = prod["urlProducto"]
+                if not url:
+                    await self._incrementar_progreso(tarea)
+                    escribir([prod])
+                elif url in resultados:
+                    await self._asignar_enriquecimiento(tarea, [prod], resultados[url])
+                    escribir([prod])
+                elif url in por_url:
+                    # la ficha ya esta en curso; se le asigna al terminar
+                    por_url[url].append(prod)
+                else:
+                    por_url[url] = [prod]
+                    fichas.append(asyncio.create_task(procesar(len(fichas) + 1, url)))
+
+            await asyncio.gather(*fichas)
+        finally:
+            pendientes = [ficha for ficha in fichas if not ficha.done()]
+            for ficha in pendientes:
+                ficha.cancel()
+            if pendientes:
+                await asyncio.wait(pendientes)
+
+    async def _asignar_enriquecimiento(
+        self,
+        tarea: TareaCatalogacion,
+        productos: list[dict],
+        resultado: tuple[str | None, str | None] | None,
+    ) -> None:
+        if resultado is not None:
+            arbol_categorias, ean = resultado
+            for prod in productos:
+                prod["arbolCategorias"] = arbol_categorias
+                if ean is not None:
+                    prod["ean"] = ean
+        await self._incrementar_progreso(tarea, len(productos))
+
+    async def _recorrer_sellers_en_paralelo(
+        self,
+        contexto: BrowserContext,
+        pagina: Page,
+        lista_sellers: list[str],
+        recorrer: Callable[[Page, str], Awaitable[list[dict]]],
+    ) -> list[dict]:
+        """
+        Recorre los listados de *lista_sellers* en paralelo, cada uno en su propia
+        pagina de *contexto* (*pagina* y hasta MAX_PARALLEL_PAGES - 1 paginas mas),
+        y devuelve todos los productos en el orden de los sellers.
+
+        *recorrer* recibe (pagina, seller) y devuelve los productos del seller. Si
+        un seller falla se cancelan los demas y se propaga el error.
+        """
+        pool: asyncio.Queue[Page] = asyncio.Queue()
+        pool.put_nowait(pagina)
+        extras = [
+            await contexto.new_page()
+            for _ in range(min(self.MAX_PARALLEL_PAGES, len(lista_sellers)) - 1)
+        ]
+        for extra in extras:
+            pool.put_nowait(extra)
+
+        async def recorrer_seller(seller: str) -> list[dict]:
+            pagina_seller = await pool.get()
+            try:
+                return await recorrer(pagina_seller, seller)
+            finally:
+                pool.put_nowait(pagina_seller)
+
+        busquedas = [asyncio.create_task(recorrer_seller(seller)) for seller in lista_sellers]
+        try:
+            productos_por_seller = await asyncio.gather(*busquedas)
+        except BaseException:
+            for busqueda in busquedas:
+                busqueda.cancel()
+            await asyncio.wait(busquedas)
+            raise
+        finally:
+            for extra in extras:
+                await extra.close()
+
+        return [prod for productos in productos_por_seller for prod in productos]
+
+    async def _buscar_fravega(
+        self, tarea: TareaCatalogacion, lista_colecciones: list[str], pw: Playwright, headless: bool = True
+    ) -> None:
+        """Fravega usa su propio contexto persistente para conservar la cache entre ejecuciones."""
+        await self._log(tarea, "Abriendo contexto para Fravega")
+        contexto = await self._abrir_contexto_persistente(pw, "fravega", headless)
+        try:
+            await contexto.route("**/*", self._filtrar_recursos_listado)
+            pagina = contexto.pages[0] if contexto.pages else await contexto.new_page()
+            ruta_final, ruta_relativa = self._rutas_salida("ProductosMarketPlace")
 
             await self._log(tarea, "Ingresando a la web")
             await pagina.goto("https://www.fravega.com/", timeout=10000000)
 
-            for coleccion in lista_colecciones:
-                await self._log(tarea, f"Iniciando la busqueda de la coleccion: {coleccion}")
-                await pagina.goto(
-                    f"https://www.fravega.com/l/?vendedor={coleccion}", timeout=100000
-                )
-
-                cantidad_paginas = 1
-                try:
-                    await pagina.evaluate("window.scrollTo(0, document.scrollingElement.scrollHeight)")
-                    contenedor_paginado = pagina.locator(".sc-3624d7a8-0.ebdNvu")
-                    if await contenedor_paginado.count() > 0:
-                        botones_paginas = contenedor_paginado.locator(".sc-3624d7a8-1.kgGNyw")
-                        n = await botones_paginas.count()
-                        if n > 0:
-                            posibles = []
-                            for j in range(n):
-                                btn = botones_paginas.nth(j)
-                                valor_attr = await btn.get_attribute("value")
-                                if valor_attr and valor_attr.isdigit():
-                                    posibles.append(int(valor_attr))
-                                else:
-                                    try:
-                                        txt = (await btn.inner_text()).strip()
-                                        if txt.isdigit():
-                                            posibles.append(int(txt))
-                                    except Exception:
-                                        pass
-                            if posibles:
-                                cantidad_paginas = max(posibles)
-                except Exception:
-                    pass
-
-                logger.debug("Fravega: paginas encontradas = %d", cantidad_paginas)
-
-                for i in range(cantidad_paginas):
+            # Las fichas se enriquecen mientras se recorren los listados y cada
+            # producto completo se escribe en el Excel
+            async with self._excel_en_curso(ruta_final) as escribir, self._enriquecimiento_en_curso(
+                tarea, contexto, self._enriquecer_producto_fravega, escribir
+            ) as encolar:
+                for coleccion in lista_colecciones:
+                    await self._log(tarea, f"Iniciando la busqueda de la coleccion: {coleccion}")
                     await pagina.goto(
-                        f"https://www.fravega.com/l/?vendedor={coleccion}&page={i + 1}",
-                        timeout=100000,
+                        f"https://www.fravega.com/l/?vendedor={coleccion}", timeout=100000
                     )
-                    await pagina.evaluate("window.scrollTo(0, document.scrollingElement.scrollHeight)")
-                    await pagina.wait_for_timeout(3000)
-                    tarjetas = pagina.locator("article.sc-87b0945d-1.bwMsmt")
-                    await pagina.wait_for_timeout(3000)
-                    cantidad = await tarjetas.count()
-
-                    for j in range(cantidad):
-                        tarjeta = tarjetas.nth(j)
-
-                        # precio comun
-                        try:
-                            precio_comun = await tarjeta.locator(
-                                "span.sc-1d9b1d9e-0.OZgQ"
-                            ).inner_text(timeout=2000)
-                            precio_comun = self._normalizar_precio_texto(precio_comun)
-                        except Exception:
-                            precio_comun = None
-
-                        # precio tachado
-                        try:
-                            precio_tachado = await tarjeta.locator(
-                                "span.sc-e081bce1-0.eudnWN"
-                            ).inner_text(timeout=2000)
-                            precio_tachado = self._normalizar_precio_texto(precio_tachado)
-                        except Exception:
-                            precio_tachado = None
-
-                        # descuento
-                        descuento = None
-                        try:
-                            descuento_texto = await tarjeta.locator(
-                                "[data-test-id='discount-tag']"
-                            ).inner_text(timeout=1000)
-                            descuento = ''.join(filter(str.isdigit, descuento_texto))
-                            if descuento:
-                                descuento = f"{descuento}%"
-                            else:
-                                descuento = None
-                        except Exception:
-                            descuento = None
-
-                        # link al producto
-                        try:
-                            url_relativa = await tarjeta.locator(
-                                "a.sc-87b0945d-3.dQujLs"
-                            ).first.get_attribute("href", timeout=1000)
-                            url_producto = (
-                                f"https://www.fravega.com{url_relativa}" if url_relativa else None
-                            )
-                        except Exception:
-                            url_producto = None
-
-                        cucardas = ["No tiene"]
 
-                        # vendido por
-                        try:
-                            vendido_por_texto = await tarjeta.locator(
-                                "p.sc-82405aa0-0.dIXwMc"
-                            ).inner_text(timeout=1000)
-                            if "Vendido por" in vendido_por_texto:
-                                vendido_por = vendido_por_texto.split("Vendido por")[1].strip()
-                            else:
-                                vendido_por = vendido_por_texto.strip()
-                        except Exception:
-                            vendido_por = "No especificado"
-
-                        # nombre del producto
-                        try:
-                            nombre_producto = await tarjeta.locator(
-                                "span.sc-1fa74e6c-0.kUaLHc"
-                            ).inner_text(timeout=1000)
-                            nombre_producto = nombre_producto.strip()
-                        except Exception:
-                            nombre_producto = "Sin nombre"
-
-                        # URL de la imagen
-                        try:
-                            url_imagen = await tarjeta.locator(
-                                "img.sc-d0e786e3-0.jrZdpk"
-                            ).get_attribute("src", timeout=1000)
-                        except Exception:
-                            url_imagen = None
-
-                        logger.debug(
-                            "Fravega Producto %d (Pag %d): %s | Precio: %s",
-                            j + 1, i + 1, nombre_producto, precio_comun,
+                    cantidad_paginas = 1
+                    try:
+                        await pagina.evaluate(SCROLL_AL_FINAL_JS)
+                        maximo_paginado = await pagina.evaluate(
+                            MAXIMO_BOTON_PAGINA_JS, f"{FRAVEGA_SELECTOR_PAGINADO} {FRAVEGA_SELECTOR_BOTON_PAGINA}"
                         )
+                        if maximo_paginado:
+                            cantidad_paginas = maximo_paginado
+                    except Exception:
+                        pass
 
-                        lista_productos.append({
-                            "nombreProducto": nombre_producto,
-                            "precioComun": precio_comun,
-                            "precioTachado": precio_tachado,
-                            "descuento": descuento,
-                            "urlProducto": url_producto,
-                            "cucardas": cucardas,
-                            "vendidoPor": vendido_por,
-                            "urlImagen": url_imagen,
-                            "arbolCategorias": None,
-                            "ean": None,
-                        })
-
-                await self._incrementar_progreso(tarea)
+                    logger.debug("Fravega: paginas encontradas = %d", cantidad_paginas)
 
-            # --- Enriquecimiento ---
-            await self._log(
-                tarea,
-                "Finalizada la busqueda de colecciones, iniciando busqueda de EANs individualmente",
-            )
-            await self._set_progreso(tarea, 0, len(lista_productos))
-
-            for idx, prod in enumerate(lista_productos, start=1):
-                await self._incrementar_progreso(tarea)
-                if not prod["urlProducto"]:
-                    continue
+                    for i in range(cantidad_paginas):
+                        await pagina.goto(
+                            f"https://www.fravega.com/l/?vendedor={coleccion}&page={i + 1}",
+                            timeout=100000,
+                        )
+                        await self._esperar_tarjetas(pagina, FRAVEGA_SELECTOR_TARJETA)
+                        productos_pagina = await self._extraer_tarjetas_fravega(pagina, i + 1)
+                        await encolar(productos_pagina)
 
-                try:
-                    await pagina.goto(prod["urlProducto"], timeout=30000)
-                    await pagina.wait_for_load_state("domcontentloaded", timeout=15000)
+                    await self._incrementar_progreso(tarea)
 
-                    # Arbol de categorias
-                    arbol_categorias = None
-                    try:
-                        elementos_breadcrumb = pagina.locator(
-                            "div.sc-8071ec51-0 "
-                            "ol[itemtype='https://schema.org/BreadcrumbList'] "
-                            "li[itemprop='itemListElement']"
-                        )
-                        count = await elementos_breadcrumb.count()
-                        if count > 1:
-                            textos_breadcrumb = []
-                            for k in range(1, count):
-                                texto = await elementos_breadcrumb.nth(k).locator(
-                                    "span[itemprop='name']"
-                                ).inner_text(timeout=2000)
-                                textos_breadcrumb.append(texto.strip())
-                            if textos_breadcrumb:
-                                arbol_categorias = "|".join(textos_breadcrumb)
-                            else:
-                                # Fallback selector movil
-                                elementos_breadcrumb = pagina.locator(
-                                    "div.sc-bd34a3c8-0 "
-                                    "ol[itemtype='https://schema.org/BreadcrumbList'] "
-                                    "li[itemprop='itemListElement']"
-                                )
-                                count = await elementos_breadcrumb.count()
-                                textos_breadcrumb = []
-                                for k in range(count):
-                                    texto = await elementos_breadcrumb.nth(k).locator(
-                                        "span[itemprop='name']"
-                                    ).inner_text(timeout=2000)
-                                    textos_breadcrumb.append(texto.strip())
-                                if textos_breadcrumb:
-                                    arbol_categorias = "|".join(textos_breadcrumb)
-                    except Exception:
-                        arbol_categorias = None
+                await self._log(
+                    tarea,
+                    "Finalizada la busqueda de colecciones, esperando las fichas pendientes",
+                )
+        finally:
+            # Cerrar aunque el sitio falle: los demas sitios siguen corriendo
+            await contexto.close()
+
+        await self._guardar_archivo(tarea, ruta_relativa)
+        await self._log(tarea, f"Proceso finalizado, archivo guardado en {ruta_final}")
+
+    async def _extraer_tarjetas_fravega(self, pagina: Page, numero_pagina: int) -> list[dict]:
+        """Extrae los datos de todas las tarjetas de producto de un listado de Fravega."""
+        crudos: list[dict] = await pagina.evaluate(FRAVEGA_TARJETAS_JS, FRAVEGA_SELECTOR_TARJETA)
+        productos: list[dict] = []
+
+        for j, crudo in enumerate(crudos):
+            precio_comun = self._normalizar_precio_texto(crudo.get("precioComun"))
+            precio_tachado = self._normalizar_precio_texto(crudo.get("precioTachado"))
+
+            # descuento
+            descuento = _NO_DIGITOS_RE.sub('', crudo.get("descuento") or '')
+            descuento = f"{descuento}%" if descuento else None
+
+            url_relativa = crudo.get("urlRelativa")
+            url_producto = f"https://www.fravega.com{url_relativa}" if url_relativa else None
+
+            vendido_por_texto = crudo.get("vendidoPor")
+            if vendido_por_texto is None:
+                vendido_por = NO_ESPECIFICADO
+            elif "Vendido por" in vendido_por_texto:
+                vendido_por = vendido_por_texto.split("Vendido por")[1].strip()
+            else:
+                vendido_por = vendido_por_texto.strip()
 
-                    ean_valor = None
+            nombre_producto = crudo.get("nombre")
+            nombre_producto = nombre_producto.strip() if nombre_producto is not None else SIN_NOMBRE
 
-                    prod["arbolCategorias"] = arbol_categorias
-                    prod["ean"] = ean_valor
+            logger.debug(
+                "Fravega Producto %d (Pag %d): %s | Precio: %s",
+                j + 1, numero_pagina, nombre_producto, precio_comun,
+            )
 
-                except Exception as e:
-                    logger.warning("No se pudo enriquecer %s: %s", prod.get("urlProducto"), e)
-                    prod["arbolCategorias"] = prod.get("arbolCategorias")
-                    prod["ean"] = prod.get("ean")
+            productos.append({
+                "nombreProducto": nombre_producto,
+                "precioComun": precio_comun,
+                "precioTachado": precio_tachado,
+                "descuento": descuento,
+                "urlProducto": url_producto,
+                "cucardas": SIN_CUCARDAS,
+                "vendidoPor": vendido_por,
+                "urlImagen": crudo.get("urlImagen"),
+                "arbolCategorias": None,
+                "ean": None,
+            })
+
+        return productos
+
+    async def _enriquecer_producto_fravega(
+        self, pagina: Page, url: str, idx: int
+    ) -> tuple[str | None, str | None] | None:
+        """Abre la ficha *url* y devuelve (arbol de categorias, None), o None si no se pudo leer."""
+        try:
+            await pagina.goto(url, wait_until="domcontentloaded", timeout=30000)
 
-            await navegador.close()
+            # Arbol de categorias
+            try:
+                textos_breadcrumb = await pagina.evaluate(FRAVEGA_BREADCRUMB_JS)
+                arbol_categorias = "|".join(textos_breadcrumb) if textos_breadcrumb else None
+            except Exception:
+                arbol_categorias = None
 
-            # --- Generar Excel ---
-            carpeta = os.path.join(settings.MEDIA_ROOT, "catalogacion")
-            os.makedirs(carpeta, exist_ok=True)
-            nombre_archivo = f'ProductosMarketPlace-{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
-            ruta_final = os.path.join(carpeta, nombre_archivo)
-            df = pd.DataFrame(lista_productos)
-            df.to_excel(ruta_final, index=False)
+            logger.debug("[ENRIQUECIDO] Fravega producto %d: categorias=%s", idx, arbol_categorias)
+            return arbol_categorias, None
 
-            ruta_relativa = f"catalogacion/{nombre_archivo}"
-            await self._guardar_archivo(tarea, ruta_relativa)
-            await self._log(tarea, f"Proceso finalizado, archivo guardado en {ruta_final}")
+        except Exception as e:
+            logger.warning("No se pudo enriquecer %s: %s", url, e)
+            return None
 
     # -------------------------------------------------------------------------
     #  MEGATONE
     # -------------------------------------------------------------------------
 
-    async def _buscar_megatone(self, tarea: TareaCatalogacion, lista_sellers: list[str], headless: bool = True) -> None:
-        async with async_playwright() as pw:
-            await self._log(tarea, "Iniciando navegador para Megatone")
-            navegador = await pw.chromium.launch(headless=headless)
-            contexto = await navegador.new_context()
-            pagina = await contexto.new_page()
-            lista_productos: list[dict] = []
+    async def _buscar_megatone(
+        self, tarea: TareaCatalogacion, lista_sellers: list[str], pw: Playwright, headless: bool = True
+    ) -> None:
+        await self._log(tarea, "Abriendo contexto para Megatone")
+        contexto = await self._abrir_contexto_persistente(pw, "megatone", headless)
+        try:
+            await contexto.route("**/*", self._filtrar_recursos_listado)
+            pagina = contexto.pages[0] if contexto.pages else await contexto.new_page()
+            ruta_final, ruta_relativa = self._rutas_salida("ProductosMarketPlace-Megatone")
 
             await self._log(tarea, "Ingresando a Megatone")
             await pagina.goto("https://www.megatone.net/", timeout=10000000)
-            await self._set_progreso(tarea, 0, len(lista_sellers))
 
-            for seller in lista_sellers:
-                await self._log(tarea, f"Iniciando la busqueda del seller: {seller}")
-                await pagina.goto(f"https://www.megatone.net/tiendas/{seller}/", timeout=100000)
-                await pagina.wait_for_timeout(3000)
+            # Las fichas se enriquecen mientras se recorren los listados y cada
+            # producto completo se escribe en el Excel
+            async with self._excel_en_curso(ruta_final) as escribir, self._enriquecimiento_en_curso(
+                tarea, contexto, self._enriquecer_producto_megatone, escribir
+            ) as encolar:
+                for seller in lista_sellers:
+                    await self._log(tarea, f"Iniciando la busqueda del seller: {seller}")
+                    await pagina.goto(f"https://www.megatone.net/tiendas/{seller}/", timeout=100000)
+                    await self._esperar_listado_megatone(pagina)
 
-                # Detectar cantidad de paginas
-                cantidad_paginas = 1
-                try:
-                    botones_paginado = await pagina.query_selector_all(".BtnPaginado")
-                    if botones_paginado:
-                        paginas_numeros = []
-                        for btn in botones_paginado:
-                            texto = await btn.inner_text()
-                            texto = texto.strip()
-                            if texto.isdigit():
-                                paginas_numeros.append(int(texto))
-                        if paginas_numeros:
-                            cantidad_paginas = max(paginas_numeros)
+                    # Detectar cantidad de paginas
+                    cantidad_paginas = 1
+                    try:
+                        maximo_paginado = await pagina.evaluate(
+                            MEGATONE_MAXIMO_PAGINADO_JS, MEGATONE_SELECTOR_PAGINADO
+                        )
+                        if maximo_paginado:
+                            cantidad_paginas = maximo_paginado
                             await self._log(
                                 tarea,
                                 f"Se detectaron {cantidad_paginas} paginas para {seller}",
                             )
-                except Exception as e:
-                    logger.debug("No se pudo detectar paginacion: %s", e)
-                    cantidad_paginas = 1
-
-                # Iterar por cada pagina
-                for num_pagina in range(1, cantidad_paginas + 1):
-                    await self._log(
-                        tarea,
-                        f"Procesando pagina {num_pagina} de {cantidad_paginas} para {seller}",
-                    )
+                    except Exception as e:
+                        logger.debug("No se pudo detectar paginacion: %s", e)
+                        cantidad_paginas = 1
 
-                    if num_pagina > 1:
-                        try:
-                            await pagina.evaluate(f"ObtenerFiltro({num_pagina}, 'Pagina', 'Pagina')")
-                            await pagina.wait_for_timeout(3000)
-                        except Exception as e:
-                            logger.debug("Error al navegar a pagina %d: %s", num_pagina, e)
-                            continue
+                    # Iterar por cada pagina
+                    productos_seller = 0
+                    for num_pagina in range(1, cantidad_paginas + 1):
+                        logger.debug("Megatone: pagina %d de %d para %s", num_pagina, cantidad_paginas, seller)
 
-                    try:
-                        await self._log(
-                            tarea,
-                            f"Extrayendo productos de {seller} pagina {num_pagina} desde JSON",
-                        )
-
-                        productos_json = await pagina.evaluate("""
-                            () => {
-                                if (typeof GlobalListado !== 'undefined' && GlobalListado.Productos) {
-                                    return GlobalListado.Productos;
-                                }
-                                return [];
-                            }
-                        """)
-
-                        await self._log(
-                            tarea,
-                            f"Se encontraron {len(productos_json)} productos para {seller}",
-                        )
-
-                        for idx, prod_json in enumerate(productos_json):
-                            if not isinstance(prod_json, dict):
+                        if num_pagina > 1:
+                            try:
+                                await pagina.evaluate(MEGATONE_CAMBIAR_PAGINA_JS, num_pagina)
+                                await self._esperar_listado_megatone(pagina)
+                            except Exception as e:
+                                logger.debug("Error al navegar a pagina %d: %s", num_pagina, e)
                                 continue
 
-                            nombre_producto = prod_json.get("Nombre", "Sin nombre")
-
-                            precio_comun = None
-                            precio_tachado = None
-                            descuento = None
-
-                            if "Precios" in prod_json and "WEB" in prod_json["Precios"]:
-                                precios_web = prod_json["Precios"]["WEB"]
-                                precio_comun = f"${precios_web.get('Promocional', 0):,.2f}".replace(",", ".")
-                                precio_lista = precios_web.get('Lista', 0)
-                                if precio_lista and precio_lista > precios_web.get('Promocional', 0):
-                                    precio_tachado = f"${precio_lista:,.2f}".replace(",", ".")
-                                porcentaje_off = precios_web.get('PorcentajeOFF', 0)
-                                if porcentaje_off > 0:
-                                    descuento = f"{int(porcentaje_off)}%"
-
-                            url_relativa = prod_json.get("URL", "")
-                            url_producto = (
-                                f"https://www.megatone.net{url_relativa}" if url_relativa else None
-                            )
-
-                            url_imagen = prod_json.get("Imagen", None)
-
-                            vendido_por = seller
-                            if "Marca" in prod_json and isinstance(prod_json["Marca"], dict):
-                                vendido_por = prod_json["Marca"].get("Descripcion", seller)
-
-                            cucardas = ["No tiene"]
-                            if "Plaquetas" in prod_json and prod_json["Plaquetas"]:
-                                try:
-                                    plaquetas_obj = prod_json["Plaquetas"]
-                                    cucardas_lista = []
-                                    if isinstance(plaquetas_obj, dict):
-                                        for key, val in plaquetas_obj.items():
-                                            if isinstance(val, dict):
-                                                nombre = (
-                                                    val.get("Nombre")
-                                                    or val.get("Descripcion")
-                                                    or val.get("Texto")
-                                                    or str(key)
-                                                )
-                                                if nombre:
-                                                    cucardas_lista.append(nombre)
-                                            elif isinstance(val, str) and val:
-                                                cucardas_lista.append(val)
-                                    elif isinstance(plaquetas_obj, list):
-                                        for p_item in plaquetas_obj:
-                                            if isinstance(p_item, dict):
-                                                nombre = (
-                                                    p_item.get("Nombre")
-                                                    or p_item.get("Descripcion")
-                                                    or p_item.get("Texto")
-                                                )
-                                                if nombre:
-                                                    cucardas_lista.append(nombre)
-                                            elif isinstance(p_item, str) and p_item:
-                                                cucardas_lista.append(p_item)
-                                    if cucardas_lista:
-                                        cucardas = cucardas_lista
-                                except Exception:
-                                    cucardas = ["No tiene"]
-
-                            logger.debug(
-                                "Megatone Producto %d: %s | Precio: %s",
-                                idx + 1, nombre_producto, precio_comun,
+                        productos_pagina: list[dict] = []
+                        try:
+                            productos_json = await pagina.evaluate(MEGATONE_LISTADO_JS)
+                            productos_pagina = [
+                                self._mapear_producto_megatone(prod_json, seller)
+                                for prod_json in productos_json
+                                if isinstance(prod_json, dict)
+                            ]
+                        except Exception as e:
+                            await self._log(
+                                tarea,
+                                f"Error al extraer productos de {seller} pagina {num_pagina}: {e}",
                             )
 
-                            lista_productos.append({
-                                "nombreProducto": nombre_producto,
-                                "precioComun": precio_comun,
-                                "precioTachado": precio_tachado,
-                                "descuento": descuento,
-                                "urlProducto": url_producto,
-                                "cucardas": cucardas,
-                                "vendidoPor": vendido_por,
-                                "urlImagen": url_imagen,
-                                "arbolCategorias": None,
-                                "ean": None,
-                            })
-
-                    except Exception as e:
-                        await self._log(
-                            tarea,
-                            f"Error al extraer productos de {seller} pagina {num_pagina}: {e}",
-                        )
-
-                await self._incrementar_progreso(tarea)
-
-            # --- Enriquecimiento ---
-            await self._log(
-                tarea,
-                "Finalizada la busqueda de sellers, iniciando enriquecimiento de productos",
-            )
-            await self._set_progreso(tarea, 0, len(lista_productos))
-
-            for idx, prod in enumerate(lista_productos, start=1):
-                await self._incrementar_progreso(tarea)
-                if not prod["urlProducto"]:
-                    continue
+                        productos_seller += len(productos_pagina)
+                        await encolar(productos_pagina)
 
-                try:
-                    await pagina.goto(prod["urlProducto"], timeout=30000)
-                    await pagina.wait_for_load_state("domcontentloaded", timeout=15000)
-
-                    # EAN/SKU desde variable JavaScript
-                    ean_valor = None
-                    try:
-                        ean_valor = await pagina.evaluate("() => window.sku")
-                    except Exception:
-                        pass
+                    await self._log(
+                        tarea, f"Seller {seller}: {productos_seller} productos en {cantidad_paginas} paginas"
+                    )
+                    await self._incrementar_progreso(tarea)
 
-                    # Arbol de categorias
-                    arbol_categorias = None
-                    try:
-                        enlaces_categorias = await pagina.query_selector_all("a[href*='/listado/']")
-                        categorias = []
-                        for enlace in enlaces_categorias:
-                            texto = await enlace.inner_text()
-                            href = await enlace.get_attribute("href")
-                            if (
-                                href
-                                and texto
-                                and len(texto.strip()) > 0
-                                and "volver" not in texto.lower()
-                            ):
-                                categorias.append(texto.strip())
-
-                        categorias_unicas = []
-                        for cat in categorias:
-                            if cat not in categorias_unicas:
-                                categorias_unicas.append(cat)
-                        if categorias_unicas:
-                            arbol_categorias = "|".join(categorias_unicas)
-                    except Exception:
-                        pass
+                await self._log(
+                    tarea,
+                    "Finalizada la busqueda de sellers, esperando las fichas pendientes",
+                )
+        finally:
+            # Cerrar aunque el sitio falle: los demas sitios siguen corriendo
+            await contexto.close()
 
-                    prod["arbolCategorias"] = arbol_categorias
-                    prod["ean"] = ean_valor
+        await self._guardar_archivo(tarea, ruta_relativa)
+        await self._log(tarea, f"Proceso finalizado, archivo guardado en {ruta_final}")
 
-                except Exception as e:
-                    logger.warning("No se pudo enriquecer %s: %s", prod.get("urlProducto"), e)
-                    prod["arbolCategorias"] = prod.get("arbolCategorias")
-                    prod["ean"] = prod.get("ean")
+    @classmethod
+    def _mapear_producto_megatone(cls, producto: dict, seller: str) -> dict:
+        """Convierte un producto de GlobalListado.Productos de Megatone al dict de productos."""
+        precio_comun = precio_tachado = descuento = None
+        precios_web = (producto.get("Precios") or {}).get("WEB")
+        if precios_web is not None:
+            precio_promocional = precios_web.get("Promocional", 0)
+            precio_comun = cls._formatear_precio(precio_promocional)
+            precio_lista = precios_web.get("Lista", 0)
+            if precio_lista and precio_lista > precio_promocional:
+                precio_tachado = cls._formatear_precio(precio_lista)
+            porcentaje_off = precios_web.get("PorcentajeOFF", 0)
+            if porcentaje_off > 0:
+                descuento = f"{int(porcentaje_off)}%"
+
+        url_relativa = producto.get("URL")
+        marca = producto.get("Marca")
+        plaquetas = producto.get("Plaquetas")
+
+        return {
+            "nombreProducto": producto.get("Nombre", SIN_NOMBRE),
+            "precioComun": precio_comun,
+            "precioTachado": precio_tachado,
+            "descuento": descuento,
+            "urlProducto": f"https://www.megatone.net{url_relativa}" if url_relativa else None,
+            "cucardas": (plaquetas and cls._cucardas_megatone(plaquetas)) or SIN_CUCARDAS,
+            "vendidoPor": marca.get("Descripcion", seller) if isinstance(marca, dict) else seller,
+            "urlImagen": producto.get("Imagen"),
+            "arbolCategorias": None,
+            "ean": None,
+        }
 
-            await navegador.close()
+    @staticmethod
+    def _cucardas_megatone(plaquetas: dict | list) -> list[str]:
+        """Nombres de las plaquetas de un producto de Megatone (vienen como dict o como lista)."""
+        if isinstance(plaquetas, dict):
+            return [
+                (val.get("Nombre") or val.get("Descripcion") or val.get("Texto") or str(key))
+                if isinstance(val, dict) else val
+                for key, val in plaquetas.items()
+                if isinstance(val, dict) or (isinstance(val, str) and val)
+            ]
+        if isinstance(plaquetas, list):
+            nombres = (
+                (item.get("Nombre") or item.get("Descripcion") or item.get("Texto"))
+                if isinstance(item, dict) else (item if isinstance(item, str) else None)
+                for item in plaquetas
+            )
+            return [nombre for nombre in nombres if nombre]
+        return []
 
-            # --- Generar Excel ---
-            carpeta = os.path.join(settings.MEDIA_ROOT, "catalogacion")
-            os.makedirs(carpeta, exist_ok=True)
-            nombre_archivo = f'ProductosMarketPlace-Megatone-{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
-            ruta_final = os.path.join(carpeta, nombre_archivo)
-            df = pd.DataFrame(lista_productos)
-            df.to_excel(ruta_final, index=False)
+    async def _enriquecer_producto_megatone(
+        self, pagina: Page, url: str, idx: int
+    ) -> tuple[str | None, str | None] | None:
+        """Abre la ficha *url* y devuelve (arbol de categorias, EAN), o None si no se pudo leer."""
+        try:
+            await pagina.goto(url, wait_until="domcontentloaded", timeout=30000)
+
+            # EAN/SKU (variable JavaScript) y categorias en una sola llamada
+            ficha = await pagina.evaluate(MEGATONE_FICHA_JS, MEGATONE_SELECTOR_CATEGORIAS)
+            ean_valor = ficha["sku"]
+            # deduplicar manteniendo orden
+            categorias_unicas = list(dict.fromkeys(ficha["categorias"]))
+            arbol_categorias = "|".join(categorias_unicas) if categorias_unicas else None
+
+            logger.debug(
+                "[ENRIQUECIDO] Megatone producto %d: categorias=%s, ean=%s",
+                idx, arbol_categorias, ean_valor,
+            )
+            return arbol_categorias, ean_valor
 
-            ruta_relativa = f"catalogacion/{nombre_archivo}"
-            await self._guardar_archivo(tarea, ruta_relativa)
-            await self._log(tarea, f"Proceso finalizado, archivo guardado en {ruta_final}")
+        except Exception as e:
+            logger.warning("No se pudo enriquecer %s: %s", url, e)
+            return None
 
     # -------------------------------------------------------------------------
     #  ONCITY
     # -------------------------------------------------------------------------
 
-    async def _buscar_oncity(self, tarea: TareaCatalogacion, lista_sellers: list[str], headless: bool = True) -> None:
-        async with async_playwright() as pw:
-            await self._log(tarea, "Iniciando navegador para Oncity")
-            navegador = await pw.chromium.launch(headless=headless)
-            contexto = await navegador.new_context()
-            pagina = await contexto.new_page()
-            lista_productos: list[dict] = []
+    @staticmethod
+    def _json_ld(textos: list[str]) -> Iterator[dict]:
+        """Parsea con orjson los JSON-LD crudos de una pagina VTEX, salteando los invalidos."""
+        for texto in textos:
+            try:
+                data = orjson.loads(texto)
+            except orjson.JSONDecodeError:
+                logger.debug("JSON-LD invalido: %.80s", texto)
+                continue
+            if isinstance(data, dict):
+                yield data
 
-            await self._log(tarea, "Ingresando a Oncity")
-            await pagina.goto("https://www.oncity.com/", timeout=10000000)
-            await self._set_progreso(tarea, 0, len(lista_sellers))
+    @classmethod
+    def _item_list_json_ld(cls, textos: list[str]) -> list:
+        """itemListElement del primer JSON-LD de tipo ItemList de un listado, o [] si no hay."""
+        return next(
+            (
+                data["itemListElement"]
+                for data in cls._json_ld(textos)
+                if data.get("@type") == "ItemList" and data.get("itemListElement")
+            ),
+            [],
+        )
 
-            for seller in lista_sellers:
-                await self._log(tarea, f"Iniciando la busqueda del seller: {seller}")
-                await pagina.goto(
-                    f"https://www.oncity.com/{seller}?map=seller", timeout=100000
+    @classmethod
+    def _ean_json_ld(cls, textos: list[str]) -> str | None:
+        """EAN (gtin13, gtin, ean, mpn o sku) del primer JSON-LD de tipo Product de una ficha."""
+        for data in cls._json_ld(textos):
+            if data.get("@type") == "Product":
+                return (
+                    data.get("gtin13") or data.get("gtin") or data.get("ean")
+                    or data.get("mpn") or data.get("sku") or None
                 )
-                await pagina.wait_for_timeout(3000)
-
-                num_pagina = 1
-                hay_mas_paginas = True
-
-                while hay_mas_paginas:
-                    await self._log(tarea, f"Procesando pagina {num_pagina} para {seller}")
-
-                    await pagina.evaluate("window.scrollTo(0, document.scrollingElement.scrollHeight)")
-                    await pagina.wait_for_timeout(3000)
-
-                    try:
-                        await self._log(
-                            tarea,
-                            f"Extrayendo productos de {seller} pagina {num_pagina} desde JSON-LD",
-                        )
-
-                        productos_json = await pagina.evaluate("""
-                            () => {
-                                const scripts = document.querySelectorAll('script[type="application/ld+json"]');
-                                for (const script of scripts) {
-                                    try {
-                                        const data = JSON.parse(script.textContent);
-                                        if (data['@type'] === 'ItemList' && data.itemListElement) {
-                                            return data.itemListElement;
-                                        }
-                                    } catch (e) {
-                                        console.error('Error parsing JSON-LD:', e);
-                                    }
-                                }
-                                return [];
-                            }
-                        """)
-
-                        await self._log(
-                            tarea,
-                            f"Se encontraron {len(productos_json)} productos en JSON-LD para {seller}",
-                        )
+        return None
 
-                        tarjetas_productos = pagina.locator(
-                            ".vtex-product-summary-2-x-containerNormal--product-summary-product"
-                        )
-                        cantidad_tarjetas = await tarjetas_productos.count()
-
-                        for idx, prod_json in enumerate(productos_json):
-                            if not isinstance(prod_json, dict):
-                                continue
-
-                            item = prod_json.get("item", {})
-                            nombre_producto = item.get("name", "Sin nombre")
-                            sku = item.get("sku", None)
-
-                            precio_comun = None
-                            vendido_por = seller
-
-                            if "offers" in item:
-                                offers = item["offers"]
-                                if isinstance(offers, dict):
-                                    precio_comun = offers.get("lowPrice") or offers.get("price")
-                                    if precio_comun:
-                                        precio_comun = f"$ {precio_comun:,.0f}".replace(",", ".")
-                                    if (
-                                        "offers" in offers
-                                        and isinstance(offers["offers"], list)
-                                        and len(offers["offers"]) > 0
-                                    ):
-                                        first_offer = offers["offers"][0]
-                                        if "seller" in first_offer and isinstance(
-                                            first_offer["seller"], dict
-                                        ):
-                                            vendido_por = first_offer["seller"].get("name", seller)
-
-                            url_producto = item.get("@id", None)
-                            url_imagen = item.get("image", None)
-                            if isinstance(url_imagen, list) and len(url_imagen) > 0:
-                                url_imagen = url_imagen[0]
-
-                            precio_tachado = None
-                            descuento = None
-                            cucardas = ["No tiene"]
-
-                            try:
-                                if idx < cantidad_tarjetas:
-                                    tarjeta_producto = tarjetas_productos.nth(idx)
-
-                                    # Precio tachado
-                                    try:
-                                        precio_tachado_texto = await tarjeta_producto.locator(
-                                            ".vtex-product-price-1-x-listPrice--summary"
-                                        ).inner_text(timeout=2000)
-                                        if precio_tachado_texto and "$" in precio_tachado_texto:
-                                            precio_tachado = self._normalizar_precio_texto(
-                                                precio_tachado_texto
-                                            )
-                                    except Exception:
-                                        pass
-
-                                    # Descuento
-                                    selectores_descuento = [
-                                        ".vtex-stack-layout-0-x-stackItem--highlights--topRight",
-                                        ".vtex-product-summary-2-x-discount",
-                                        ".vtex-search-result-3-x-discount",
-                                        "[class*='discount']",
-                                        "[class*='Discount']",
-                                    ]
-                                    descuento_encontrado = False
-                                    for sel in selectores_descuento:
-                                        try:
-                                            descuento_texto = await tarjeta_producto.locator(
-                                                sel
-                                            ).inner_text(timeout=1000)
-                                            if descuento_texto and (
-                                                '%' in descuento_texto
-                                                or 'off' in descuento_texto.lower()
-                                            ):
-                                                descuento = ''.join(
-                                                    filter(
-                                                        lambda c: c.isdigit() or c == '%',
-                                                        descuento_texto,
-                                                    )
-                                                )
-                                                if descuento and descuento != '%':
-                                                    descuento_encontrado = True
-                                                    break
-                                        except Exception:
-                                            continue
-
-                                    if not descuento_encontrado and precio_tachado and precio_comun:
-                                        descuento_calculado = self._calcular_porcentaje_descuento(
-                                            precio_tachado, precio_comun
-                                        )
-                                        if descuento_calculado:
-                                            descuento = descuento_calculado
-
-                                    # Cucardas
-                                    try:
-                                        cucarda_elements = tarjeta_producto.locator(
-                                            ".vtex-stack-layout-0-x-stackItem--highlights--cucardas"
-                                        )
-                                        count_cucardas = await cucarda_elements.count()
-                                        if count_cucardas > 0:
-                                            cucardas_lista = []
-                                            for k in range(count_cucardas):
-                                                texto_c = await cucarda_elements.nth(k).inner_text(
-                                                    timeout=1000
-                                                )
-                                                if texto_c and texto_c.strip():
-                                                    cucardas_lista.append(texto_c.strip())
-                                            if cucardas_lista:
-                                                cucardas = cucardas_lista
-                                    except Exception:
-                                        pass
-
-                            except Exception:
-                                pass
-
-                            logger.debug(
-                                "Oncity Producto %d: %s | Precio: %s",
-                                idx + 1, nombre_producto, precio_comun,
-                            )
-
-                            lista_productos.append({
-                                "nombreProducto": nombre_producto,
-                                "precioComun": precio_comun,
-                                "precioTachado": precio_tachado,
-                                "descuento": descuento,
-                                "urlProducto": url_producto,
-                                "cucardas": cucardas,
-                                "vendidoPor": vendido_por,
-                                "urlImagen": url_imagen,
-                                "arbolCategorias": None,
-                                "ean": sku,
-                            })
-
-                    except Exception as e:
-                        await self._log(
-                            tarea,
-                            f"Error al extraer productos de {seller} pagina {num_pagina}: {e}",
-                        )
-
-                    # Verificar boton "Ver mas productos"
-                    try:
-                        await pagina.evaluate(
-                            "window.scrollTo(0, document.scrollingElement.scrollHeight)"
-                        )
-                        await pagina.wait_for_timeout(2000)
-
-                        boton_ver_mas = await pagina.query_selector(
-                            "a:has-text('Ver más productos')"
-                        )
+    async def _buscar_oncity(
+        self, tarea: TareaCatalogacion, lista_sellers: list[str], pw: Playwright, headless: bool = True
+    ) -> None:
+        await self._log(tarea, "Abriendo contexto para Oncity")
+        contexto = await self._abrir_contexto_persistente(pw, "oncity", headless)
+        try:
+            await contexto.route("**/*", self._filtrar_recursos_listado)
+            pagina = contexto.pages[0] if contexto.pages else await contexto.new_page()
 
-                        if boton_ver_mas:
-                            href = await boton_ver_mas.get_attribute("href")
-                            if href:
-                                if href.startswith("http"):
-                                    siguiente_url = href
-                                elif href.startswith("?"):
-                                    siguiente_url = f"https://www.oncity.com/{seller}{href}"
-                                else:
-                                    siguiente_url = f"https://www.oncity.com/{href}"
-                                await pagina.goto(siguiente_url, timeout=100000)
-                                await pagina.wait_for_timeout(3000)
-                                num_pagina += 1
-                            else:
-                                hay_mas_paginas = False
-                        else:
-                            hay_mas_paginas = False
-                    except Exception:
-                        hay_mas_paginas = False
+            await self._log(tarea, "Ingresando a Oncity")
+            await pagina.goto("https://www.oncity.com/", timeout=10000000)
 
-                await self._incrementar_progreso(tarea)
+            # Cada seller se recorre en su propia pagina, hasta MAX_PARALLEL_PAGES a la vez
+            lista_productos = await self._recorrer_sellers_en_paralelo(
+                contexto, pagina, lista_sellers, partial(self._buscar_seller_oncity, tarea)
+            )
 
             # --- Enriquecimiento ---
             await self._log(
                 tarea,
                 "Finalizada la busqueda de sellers, iniciando enriquecimiento de productos",
             )
-            await self._set_progreso(tarea, 0, len(lista_productos))
+            # Las fichas se abren en paginas nuevas; la de los listados ya no se usa
+            await pagina.close()
+            ruta_final, ruta_relativa = self._rutas_salida("ProductosMarketPlace-Oncity")
+            async with self._excel_en_curso(ruta_final) as escribir, self._enriquecimiento_en_curso(
+                tarea, contexto, self._enriquecer_producto_oncity, escribir
+            ) as encolar:
+                await encolar(lista_productos)
+                # La cola queda como unica referencia: cada producto se libera al escribirse
+                lista_productos.clear()
+        finally:
+            # Cerrar aunque el sitio falle: los demas sitios siguen corriendo
+            await contexto.close()
+
+        await self._guardar_archivo(tarea, ruta_relativa)
+        await self._log(tarea, f"Proceso finalizado, archivo guardado en {ruta_final}")
+
+    async def _buscar_seller_oncity(self, tarea: TareaCatalogacion, pagina: Page, seller: str) -> list[dict]:
+        """Recorre todas las paginas del listado de *seller* en Oncity y devuelve sus productos."""
+        productos: list[dict] = []
+
+        url_seller = f"https://www.oncity.com/{seller}"
+        await self._log(tarea, f"Iniciando la busqueda del seller: {seller}")
+        await pagina.goto(f"{url_seller}?map=seller", timeout=100000)
+
+        num_pagina = 1
+        hay_mas_paginas = True
+
+        while hay_mas_paginas:
+            logger.debug("Oncity: pagina %d para %s", num_pagina, seller)
+            await self._esperar_tarjetas(pagina, ONCITY_SELECTOR_TARJETA)
+
+            try:
+                listado = await pagina.evaluate(ONCITY_LISTADO_JS, {
+                    "tarjeta": ONCITY_SELECTOR_TARJETA,
+                    "precioTachado": ONCITY_SELECTOR_PRECIO_TACHADO,
+                    "descuento": ONCITY_SELECTOR_DESCUENTO,
+                    "cucardas": ONCITY_SELECTOR_CUCARDAS,
+                })
+                productos_json = self._item_list_json_ld(listado["jsonLd"])
+                tarjetas = listado["tarjetas"]
+
+                for idx, prod_json in enumerate(productos_json):
+                    if not isinstance(prod_json, dict):
+                        continue
 
-            for idx, prod in enumerate(lista_productos, start=1):
-                await self._incrementar_progreso(tarea)
-                if not prod["urlProducto"]:
-                    continue
+                    item = prod_json.get("item", {})
+                    nombre_producto = item.get("name", SIN_NOMBRE)
+                    sku = item.get("sku", None)
 
-                try:
-                    await pagina.goto(prod["urlProducto"], timeout=30000)
-                    await pagina.wait_for_load_state("domcontentloaded", timeout=15000)
+                    precio_comun = None
+                    vendido_por = seller
 
-                    # Arbol de categorias (breadcrumb VTEX)
-                    arbol_categorias = None
-                    try:
-                        elementos_breadcrumb = pagina.locator(
-                            ".vtex-breadcrumb-1-x-link--store-breadcrumb"
-                        )
-                        count = await elementos_breadcrumb.count()
-                        if count > 0:
-                            textos_breadcrumb = []
-                            for k in range(count):
-                                texto = await elementos_breadcrumb.nth(k).inner_text(timeout=2000)
-                                texto = texto.strip()
-                                if texto and texto.lower() not in ["home", "inicio"]:
-                                    textos_breadcrumb.append(texto)
-                            if textos_breadcrumb:
-                                arbol_categorias = "|".join(textos_breadcrumb)
-                    except Exception:
-                        arbol_categorias = None
+                    if "offers" in item:
+                        offers = item["offers"]
+                        if isinstance(offers, dict):
+                            precio_comun = offers.get("lowPrice") or offers.get("price")
+                            if precio_comun:
+                                precio_comun = f"$ {precio_comun:,.0f}".replace(",", ".")
+                            if (
+                                "offers" in offers
+                                and isinstance(offers["offers"], list)
+                                and len(offers["offers"]) > 0
+                            ):
+                                first_offer = offers["offers"][0]
+                                if "seller" in first_offer and isinstance(
+                                    first_offer["seller"], dict
+                                ):
+                                    vendido_por = first_offer["seller"].get("name", seller)
+
+                    url_producto = item.get("@id", None)
+                    url_imagen = item.get("image", None)
+                    if isinstance(url_imagen, list) and len(url_imagen) > 0:
+                        url_imagen = url_imagen[0]
+
+                    precio_tachado = None
+                    descuento = None
+                    cucardas = SIN_CUCARDAS
+
+                    if idx < len(tarjetas):
+                        tarjeta = tarjetas[idx]
+
+                        # Precio tachado
+                        precio_tachado_texto = tarjeta["precioTachado"]
+                        if precio_tachado_texto and "$" in precio_tachado_texto:
+                            precio_tachado = self._normalizar_precio_texto(precio_tachado_texto)
+
+                        # Descuento
+                        descuento_encontrado = False
+                        for descuento_texto in tarjeta["descuentos"]:
+                            if descuento_texto and (
+                                '%' in descuento_texto
+                                or 'off' in descuento_texto.lower()
+                            ):
+                                descuento = _NO_DIGITOS_NI_PORCENTAJE_RE.sub('', descuento_texto)
+                                if descuento and descuento != '%':
+                                    descuento_encontrado = True
+                                    break
+
+                        if not descuento_encontrado and precio_tachado and precio_comun:
+                            descuento_calculado = self._calcular_porcentaje_descuento(
+                                precio_tachado, precio_comun
+                            )
+                            if descuento_calculado:
+                                descuento = descuento_calculado
 
-                    # EAN desde JSON-LD
-                    ean_valor = prod.get("ean", None)
-                    try:
-                        ean_extraido = await pagina.evaluate("""
-                            () => {
-                                const scripts = document.querySelectorAll('script[type="application/ld+json"]');
-                                for (const script of scripts) {
-                                    try {
-                                        const data = JSON.parse(script.textContent);
-                                        if (data['@type'] === 'Product') {
-                                            if (data.gtin13) return data.gtin13;
-                                            if (data.gtin) return data.gtin;
-                                            if (data.ean) return data.ean;
-                                            if (data.mpn) return data.mpn;
-                                            if (data.sku) return data.sku;
-                                        }
-                                    } catch (e) {
-                                        console.error('Error parsing JSON-LD:', e);
-                                    }
-                                }
-                                return null;
-                            }
-                        """)
-                        if ean_extraido:
-                            ean_valor = ean_extraido
-                    except Exception:
-                        pass
+                        # Cucardas
+                        cucardas_lista = [t.strip() for t in tarjeta["cucardas"] if t and t.strip()]
+                        if cucardas_lista:
+                            cucardas = cucardas_lista
 
-                    prod["arbolCategorias"] = arbol_categorias
-                    prod["ean"] = ean_valor
+                    logger.debug(
+                        "Oncity Producto %d: %s | Precio: %s",
+                        idx + 1, nombre_producto, precio_comun,
+                    )
 
-                except Exception as e:
-                    logger.warning("No se pudo enriquecer %s: %s", prod.get("urlProducto"), e)
-                    prod["arbolCategorias"] = prod.get("arbolCategorias")
-                    prod["ean"] = prod.get("ean")
+                    productos.append({
+                        "nombreProducto": nombre_producto,
+                        "precioComun": precio_comun,
+                        "precioTachado": precio_tachado,
+                        "descuento": descuento,
+                        "urlProducto": url_producto,
+                        "cucardas": cucardas,
+                        "vendidoPor": vendido_por,
+                        "urlImagen": url_imagen,
+                        "arbolCategorias": None,
+                        "ean": sku,
+                    })
+
+            except Exception as e:
+                await self._log(
+                    tarea,
+                    f"Error al extraer productos de {seller} pagina {num_pagina}: {e}",
+                )
 
-            await navegador.close()
+            # Verificar boton "Ver mas productos" (si no aparece, era la ultima pagina)
+            try:
+                boton_ver_mas = await pagina.wait_for_selector(
+                    ONCITY_SELECTOR_VER_MAS, state="attached", timeout=ESPERA_BOTON_SIGUIENTE_MS
+                )
 
-            # --- Generar Excel ---
-            carpeta = os.path.join(settings.MEDIA_ROOT, "catalogacion")
-            os.makedirs(carpeta, exist_ok=True)
-            nombre_archivo = (
-                f'ProductosMarketPlace-Oncity-{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
+                if boton_ver_mas:
+                    href = await boton_ver_mas.get_attribute("href")
+                    if href:
+                        # absoluto, solo query ("?page=2") o relativo a la raiz del sitio
+                        await pagina.goto(urljoin(url_seller, href), timeout=100000)
+                        num_pagina += 1
+                    else:
+                        hay_mas_paginas = False
+                else:
+                    hay_mas_paginas = False
+            except Exception:
+                hay_mas_paginas = False
+
+        await self._log(tarea, f"Seller {seller}: {len(productos)} productos en {num_pagina} paginas")
+        await self._incrementar_progreso(tarea)
+
+        return productos
+
+    async def _enriquecer_producto_oncity(
+        self, pagina: Page, url: str, idx: int
+    ) -> tuple[str | None, str | None] | None:
+        """Abre la ficha *url* y devuelve (arbol de categorias, EAN), o None si no se pudo leer."""
+        return await self._enriquecer_producto_vtex(
+            pagina, url, idx, ONCITY_SELECTOR_BREADCRUMB, ONCITY_BREADCRUMB_IGNORADOS
+        )
+
+    async def _enriquecer_producto_vtex(
+        self, pagina: Page, url: str, idx: int, selector_breadcrumb: str, ignorados: frozenset[str]
+    ) -> tuple[str | None, str | None] | None:
+        """
+        Lee arbol de categorias (breadcrumb, sin los textos *ignorados*) y EAN
+        (JSON-LD) de la ficha VTEX *url*. Un EAN None conserva el SKU del listado.
+        """
+        try:
+            # El breadcrumb se arma del lado del cliente: se espera el load
+            await pagina.goto(url, timeout=30000)
+
+            # Breadcrumb y EAN en una sola llamada
+            ficha = await pagina.evaluate(VTEX_FICHA_JS, selector_breadcrumb)
+            ean_valor = self._ean_json_ld(ficha["jsonLd"])
+            textos_breadcrumb = [texto for texto in ficha["categorias"] if texto.lower() not in ignorados]
+            arbol_categorias = "|".join(textos_breadcrumb) if textos_breadcrumb else None
+
+            logger.debug(
+                "[ENRIQUECIDO] VTEX producto %d: categorias=%s, ean=%s",
+                idx, arbol_categorias, ean_valor,
             )
-            ruta_final = os.path.join(carpeta, nombre_archivo)
-            df = pd.DataFrame(lista_productos)
-            df.to_excel(ruta_final, index=False)
+            return arbol_categorias, ean_valor
 
-            ruta_relativa = f"catalogacion/{nombre_archivo}"
-            await self._guardar_archivo(tarea, ruta_relativa)
-            await self._log(tarea, f"Proceso finalizado, archivo guardado en {ruta_final}")
+        except Exception as e:
+            logger.warning("No se pudo enriquecer %s: %s", url, e)
+            return None
 
     # -------------------------------------------------------------------------
     #  PROVINCIA
     # -------------------------------------------------------------------------
 
-    async def _buscar_provincia(self, tarea: TareaCatalogacion, lista_sellers: list[str], headless: bool = True) -> None:
-        async with async_playwright() as pw:
-            await self._log(tarea, "Iniciando navegador para Provincia")
-            navegador = await pw.chromium.launch(headless=headless)
-            contexto = await navegador.new_context()
+    async def _buscar_provincia(self, tarea: TareaCatalogacion, lista_sellers: list[str], navegador: Browser) -> None:
+        await self._log(tarea, "Abriendo contexto para Provincia")
+        contexto = await navegador.new_context(service_workers="block")
+        try:
+            await contexto.route("**/*", self._filtrar_recursos_listado)
             pagina = await contexto.new_page()
-            lista_productos: list[dict] = []
 
             await self._log(tarea, "Ingresando a Provincia")
             await pagina.goto("https://www.provinciacompras.com.ar/", timeout=10000000)
-            await self._set_progreso(tarea, 0, len(lista_sellers))
-
-            for seller in lista_sellers:
-                await self._log(tarea, f"Iniciando la busqueda del seller: {seller}")
-                await pagina.goto(
-                    f"https://www.provinciacompras.com.ar/{seller}?map=seller", timeout=100000
-                )
-                await pagina.wait_for_timeout(3000)
-
-                num_pagina = 1
-                hay_mas_paginas = True
-
-                while hay_mas_paginas:
-                    await self._log(tarea, f"Procesando pagina {num_pagina} para {seller}")
-
-                    await pagina.evaluate("window.scrollTo(0, document.scrollingElement.scrollHeight)")
-                    await pagina.wait_for_timeout(3000)
-
-                    try:
-                        await self._log(
-                            tarea,
-                            f"Extrayendo productos de {seller} pagina {num_pagina} desde JSON-LD",
-                        )
-
-                        productos_json = await pagina.evaluate("""
-                            () => {
-                                const scripts = document.querySelectorAll('script[type="application/ld+json"]');
-                                for (const script of scripts) {
-                                    try {
-                                        const data = JSON.parse(script.textContent);
-                                        if (data['@type'] === 'ItemList' && data.itemListElement) {
-                                            return data.itemListElement;
-                                        }
-                                    } catch (e) {
-                                        console.error('Error parsing JSON-LD:', e);
-                                    }
-                                }
-                                return [];
-                            }
-                        """)
-
-                        await self._log(
-                            tarea,
-                            f"Se encontraron {len(productos_json)} productos en JSON-LD para {seller}",
-                        )
-
-                        tarjetas_productos = pagina.locator("article")
-                        cantidad_tarjetas = await tarjetas_productos.count()
-
-                        for idx, prod_json in enumerate(productos_json):
-                            if not isinstance(prod_json, dict):
-                                continue
-
-                            item = prod_json.get("item", {})
-                            nombre_producto = item.get("name", "Sin nombre")
-                            sku = item.get("sku", None)
-
-                            precio_comun = None
-                            vendido_por = seller
-
-                            if "offers" in item:
-                                offers = item["offers"]
-                                if isinstance(offers, dict):
-                                    precio_comun = offers.get("lowPrice") or offers.get("price")
-                                    if precio_comun:
-                                        precio_comun = f"$ {precio_comun:,.0f}".replace(",", ".")
-                                    if (
-                                        "offers" in offers
-                                        and isinstance(offers["offers"], list)
-                                        and len(offers["offers"]) > 0
-                                    ):
-                                        first_offer = offers["offers"][0]
-                                        if "seller" in first_offer and isinstance(
-                                            first_offer["seller"], dict
-                                        ):
-                                            vendido_por = first_offer["seller"].get("name", seller)
-
-                            url_producto = item.get("@id", None)
-                            url_imagen = item.get("image", None)
-                            if isinstance(url_imagen, list) and len(url_imagen) > 0:
-                                url_imagen = url_imagen[0]
-
-                            precio_tachado = None
-                            descuento = None
-                            cucardas = ["No tiene"]
 
-                            try:
-                                if idx < cantidad_tarjetas:
-                                    tarjeta_producto = tarjetas_productos.nth(idx)
-
-                                    # Precio tachado
-                                    try:
-                                        precio_tachado_texto = await tarjeta_producto.locator(
-                                            ".vtex-product-price-1-x-listPrice"
-                                        ).inner_text(timeout=2000)
-                                        if precio_tachado_texto and "$" in precio_tachado_texto:
-                                            precio_tachado = self._normalizar_precio_texto(
-                                                precio_tachado_texto
-                                            )
-                                    except Exception:
-                                        pass
-
-                                    # Descuento
-                                    try:
-                                        descuento_texto = await tarjeta_producto.locator(
-                                            "[class*='tag']"
-                                        ).inner_text(timeout=2000)
-                                        if descuento_texto and '%' in descuento_texto:
-                                            descuento = ''.join(
-                                                filter(
-                                                    lambda c: c.isdigit() or c == '%',
-                                                    descuento_texto,
-                                                )
-                                            )
-                                            if not descuento or descuento == '%':
-                                                descuento = None
-                                    except Exception:
-                                        selectores_descuento_alt = [
-                                            ".vtex-stack-layout-0-x-stackItem--highlights",
-                                            "[class*='discount']",
-                                            "[class*='badge']",
-                                        ]
-                                        for sel in selectores_descuento_alt:
-                                            try:
-                                                descuento_texto = await tarjeta_producto.locator(
-                                                    sel
-                                                ).inner_text(timeout=1000)
-                                                if descuento_texto and (
-                                                    '%' in descuento_texto
-                                                    or 'off' in descuento_texto.lower()
-                                                ):
-                                                    descuento = ''.join(
-                                                        filter(
-                                                            lambda c: c.isdigit() or c == '%',
-                                                            descuento_texto,
-                                                        )
-                                                    )
-                                                    if descuento and descuento != '%':
-                                                        break
-                                            except Exception:
-                                                continue
-
-                                    # Calcular descuento si no se encontro
-                                    if not descuento and precio_tachado and precio_comun:
-                                        descuento_calculado = self._calcular_porcentaje_descuento(
-                                            precio_tachado, precio_comun
-                                        )
-                                        if descuento_calculado:
-                                            descuento = descuento_calculado
-
-                                    # Cucardas
-                                    try:
-                                        cucarda_elements = tarjeta_producto.locator(
-                                            "[class*='cucarda'], [class*='badge'], [class*='highlight']"
-                                        )
-                                        count_cucardas = await cucarda_elements.count()
-                                        if count_cucardas > 0:
-                                            cucardas_lista = []
-                                            for k in range(count_cucardas):
-                                                texto_c = await cucarda_elements.nth(k).inner_text(
-                                                    timeout=1000
-                                                )
-                                                if texto_c and texto_c.strip():
-                                                    cucardas_lista.append(texto_c.strip())
-                                            if cucardas_lista:
-                                                cucardas = cucardas_lista
-                                    except Exception:
-                                        pass
-
-                            except Exception:
-                                pass
-
-                            logger.debug(
-                                "Provincia Producto %d: %s | Precio: %s",
-                                idx + 1, nombre_producto, precio_comun,
-                            )
-
-                            lista_productos.append({
-                                "nombreProducto": nombre_producto,
-                                "precioComun": precio_comun,
-                                "precioTachado": precio_tachado,
-                                "descuento": descuento,
-                                "urlProducto": url_producto,
-                                "cucardas": cucardas,
-                                "vendidoPor": vendido_por,
-                                "urlImagen": url_imagen,
-                                "arbolCategorias": None,
-                                "ean": sku,
-                            })
-
-                    except Exception as e:
-                        await self._log(
-                            tarea,
-                            f"Error al extraer productos de {seller} pagina {num_pagina}: {e}",
-                        )
-
-                    # Verificar boton "Mostrar mas"
-                    try:
-                        await pagina.evaluate(
-                            "window.scrollTo(0, document.scrollingElement.scrollHeight)"
-                        )
-                        await pagina.wait_for_timeout(2000)
-
-                        boton_mostrar_mas = await pagina.query_selector(
-                            "button:has-text('Mostrar más'), a:has-text('Mostrar más')"
-                        )
-
-                        if boton_mostrar_mas:
-                            await boton_mostrar_mas.click()
-                            await pagina.wait_for_timeout(3000)
-                            num_pagina += 1
-                        else:
-                            hay_mas_paginas = False
-                    except Exception:
-                        hay_mas_paginas = False
-
-                await self._incrementar_progreso(tarea)
+            # Cada seller se recorre en su propia pagina, hasta MAX_PARALLEL_PAGES a la vez
+            lista_productos = await self._recorrer_sellers_en_paralelo(
+                contexto, pagina, lista_sellers, partial(self._buscar_seller_provincia, tarea)
+            )
 
             # --- Enriquecimiento ---
             await self._log(
                 tarea,
                 "Finalizada la busqueda de sellers, iniciando enriquecimiento de productos",
             )
-            await self._set_progreso(tarea, 0, len(lista_productos))
+            # Las fichas se abren en paginas nuevas; la de los listados ya no se usa
+            await pagina.close()
+            ruta_final, ruta_relativa = self._rutas_salida("ProductosMarketPlace-Provincia")
+            async with self._excel_en_curso(ruta_final) as escribir, self._enriquecimiento_en_curso(
+                tarea, contexto, self._enriquecer_producto_provincia, escribir
+            ) as encolar:
+                await encolar(lista_productos)
+                # La cola queda como unica referencia: cada producto se libera al escribirse
+                lista_productos.clear()
+        finally:
+            # Cerrar aunque el sitio falle: los demas sitios siguen corriendo
+            await contexto.close()
+
+        await self._guardar_archivo(tarea, ruta_relativa)
+        await self._log(tarea, f"Proceso finalizado, archivo guardado en {ruta_final}")
+
+    async def _buscar_seller_provincia(self, tarea: TareaCatalogacion, pagina: Page, seller: str) -> list[dict]:
+        """Recorre todas las paginas del listado de *seller* en Provincia y devuelve sus productos."""
+        productos: list[dict] = []
+
+        await self._log(tarea, f"Iniciando la busqueda del seller: {seller}")
+        await pagina.goto(
+            f"https://www.provinciacompras.com.ar/{seller}?map=seller", timeout=100000
+        )
+
+        num_pagina = 1
+        hay_mas_paginas = True
+
+        while hay_mas_paginas:
+            logger.debug("Provincia: pagina %d para %s", num_pagina, seller)
+            await self._esperar_tarjetas(pagina, PROVINCIA_SELECTOR_TARJETA)
+
+            try:
+                listado = await pagina.evaluate(PROVINCIA_LISTADO_JS, {
+                    "tarjeta": PROVINCIA_SELECTOR_TARJETA,
+                    "precioTachado": PROVINCIA_SELECTOR_PRECIO_TACHADO,
+                    "tag": PROVINCIA_SELECTOR_TAG,
+                    "descuentos": PROVINCIA_SELECTORES_DESCUENTO,
+                    "cucardas": PROVINCIA_SELECTOR_CUCARDAS,
+                })
+                productos_json = self._item_list_json_ld(listado["jsonLd"])
+                tarjetas = listado["tarjetas"]
+
+                for idx, prod_json in enumerate(productos_json):
+                    if not isinstance(prod_json, dict):
+                        continue
 
-            for idx, prod in enumerate(lista_productos, start=1):
-                await self._incrementar_progreso(tarea)
-                if not prod["urlProducto"]:
-                    continue
+                    item = prod_json.get("item", {})
+                    nombre_producto = item.get("name", SIN_NOMBRE)
+                    sku = item.get("sku", None)
 
-                try:
-                    await pagina.goto(prod["urlProducto"], timeout=30000)
-                    await pagina.wait_for_load_state("domcontentloaded", timeout=15000)
+                    precio_comun = None
+                    vendido_por = seller
 
-                    # Arbol de categorias (breadcrumb Provincia)
-                    arbol_categorias = None
-                    try:
-                        elementos_breadcrumb = pagina.locator(
-                            ".vtex-breadcrumb-1-x-container--product-breadcrumb "
-                            ".vtex-breadcrumb-1-x-link"
+                    if "offers" in item:
+                        offers = item["offers"]
+                        if isinstance(offers, dict):
+                            precio_comun = offers.get("lowPrice") or offers.get("price")
+                            if precio_comun:
+                                precio_comun = f"$ {precio_comun:,.0f}".replace(",", ".")
+                            if (
+                                "offers" in offers
+                                and isinstance(offers["offers"], list)
+                                and len(offers["offers"]) > 0
+                            ):
+                                first_offer = offers["offers"][0]
+                                if "seller" in first_offer and isinstance(
+                                    first_offer["seller"], dict
+                                ):
+                                    vendido_por = first_offer["seller"].get("name", seller)
+
+                    url_producto = item.get("@id", None)
+                    url_imagen = item.get("image", None)
+                    if isinstance(url_imagen, list) and len(url_imagen) > 0:
+                        url_imagen = url_imagen[0]
+
+                    precio_tachado = None
+                    descuento = None
+                    cucardas = SIN_CUCARDAS
+
+                    if idx < len(tarjetas):
+                        precio_tachado, descuento, cucardas = self._datos_tarjeta_provincia(
+                            tarjetas[idx], precio_comun
                         )
-                        count = await elementos_breadcrumb.count()
-                        if count > 0:
-                            textos_breadcrumb = []
-                            for k in range(count):
-                                texto = await elementos_breadcrumb.nth(k).inner_text(timeout=2000)
-                                texto = texto.strip()
-                                if texto and texto.lower() not in [
-                                    "home",
-                                    "inicio",
-                                    "provincia compras",
-                                ]:
-                                    textos_breadcrumb.append(texto)
-                            if textos_breadcrumb:
-                                arbol_categorias = "|".join(textos_breadcrumb)
-                    except Exception:
-                        arbol_categorias = None
 
-                    # EAN desde JSON-LD
-                    ean_valor = prod.get("ean", None)
-                    try:
-                        ean_extraido = await pagina.evaluate("""
-                            () => {
-                                const scripts = document.querySelectorAll('script[type="application/ld+json"]');
-                                for (const script of scripts) {
-                                    try {
-                                        const data = JSON.parse(script.textContent);
-                                        if (data['@type'] === 'Product') {
-                                            if (data.gtin13) return data.gtin13;
-                                            if (data.gtin) return data.gtin;
-                                            if (data.ean) return data.ean;
-                                            if (data.mpn) return data.mpn;
-                                            if (data.sku) return data.sku;
-                                        }
-                                    } catch (e) {
-                                        console.error('Error parsing JSON-LD:', e);
-                                    }
-                                }
-                                return null;
-                            }
-                        """)
-                        if ean_extraido:
-                            ean_valor = ean_extraido
-                    except Exception:
-                        pass
+                    logger.debug(
+                        "Provincia Producto %d: %s | Precio: %s",
+                        idx + 1, nombre_producto, precio_comun,
+                    )
 
-                    prod["arbolCategorias"] = arbol_categorias
-                    prod["ean"] = ean_valor
+                    productos.append({
+                        "nombreProducto": nombre_producto,
+                        "precioComun": precio_comun,
+                        "precioTachado": precio_tachado,
+                        "descuento": descuento,
+                        "urlProducto": url_producto,
+                        "cucardas": cucardas,
+                        "vendidoPor": vendido_por,
+                        "urlImagen": url_imagen,
+                        "arbolCategorias": None,
+                        "ean": sku,
+                    })
+
+            except Exception as e:
+                await self._log(
+                    tarea,
+                    f"Error al extraer productos de {seller} pagina {num_pagina}: {e}",
+                )
 
-                except Exception as e:
-                    logger.warning("No se pudo enriquecer %s: %s", prod.get("urlProducto"), e)
-                    prod["arbolCategorias"] = prod.get("arbolCategorias")
-                    prod["ean"] = prod.get("ean")
+            # Verificar boton "Mostrar mas" (si no aparece, o no suma tarjetas, era la ultima pagina)
+            try:
+                boton_mostrar_mas = await pagina.wait_for_selector(
+                    PROVINCIA_SELECTOR_MOSTRAR_MAS, state="attached", timeout=ESPERA_BOTON_SIGUIENTE_MS
+                )
+
+                if boton_mostrar_mas:
+                    anteriores = await pagina.locator(PROVINCIA_SELECTOR_TARJETA).count()
+                    await boton_mostrar_mas.click()
+                    await pagina.wait_for_function(
+                        HAY_MAS_TARJETAS_JS, arg=[PROVINCIA_SELECTOR_TARJETA, anteriores], timeout=15000
+                    )
+                    num_pagina += 1
+                else:
+                    hay_mas_paginas = False
+            except Exception:
+                hay_mas_paginas = False
 
-            await navegador.close()
+        await self._log(tarea, f"Seller {seller}: {len(productos)} productos en {num_pagina} paginas")
+        await self._incrementar_progreso(tarea)
 
-            # --- Generar Excel ---
-            carpeta = os.path.join(settings.MEDIA_ROOT, "catalogacion")
-            os.makedirs(carpeta, exist_ok=True)
-            nombre_archivo = (
-                f'ProductosMarketPlace-Provincia-{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
-            )
-            ruta_final = os.path.join(carpeta, nombre_archivo)
-            df = pd.DataFrame(lista_productos)
-            df.to_excel(ruta_final, index=False)
+        return productos
 
-            ruta_relativa = f"catalogacion/{nombre_archivo}"
-            await self._guardar_archivo(tarea, ruta_relativa)
-            await self._log(tarea, f"Proceso finalizado, archivo guardado en {ruta_final}")
+    @classmethod
+    def _datos_tarjeta_provincia(
+        cls, tarjeta: dict, precio_comun: str | None
+    ) -> tuple[str | None, str | None, list[str] | tuple[str, ...]]:
+        """
+        Normaliza (precio tachado, descuento, cucardas) de una tarjeta cruda de
+        PROVINCIA_LISTADO_JS. El descuento sale del tag; si la tarjeta no tiene,
+        de los elementos alternativos, y si no aparece se calcula con los precios.
+        """
+        precio_tachado = None
+        precio_tachado_texto = tarjeta["precioTachado"]
+        if precio_tachado_texto and "$" in precio_tachado_texto:
+            precio_tachado = cls._normalizar_precio_texto(precio_tachado_texto)
+
+        descuento = None
+        descuento_texto = tarjeta["tag"]
+        if descuento_texto is not None:
+            if '%' in descuento_texto:
+                descuento = _NO_DIGITOS_NI_PORCENTAJE_RE.sub('', descuento_texto)
+                if not descuento or descuento == '%':
+                    descuento = None
+        else:
+            for descuento_texto in tarjeta["descuentos"]:
+                if descuento_texto and ('%' in descuento_texto or 'off' in descuento_texto.lower()):
+                    descuento = _NO_DIGITOS_NI_PORCENTAJE_RE.sub('', descuento_texto)
+                    if descuento and descuento != '%':
+                        break
+
+        # Calcular descuento si no se encontro
+        if not descuento and precio_tachado and precio_comun:
+            descuento = cls._calcular_porcentaje_descuento(precio_tachado, precio_comun) or descuento
+
+        return precio_tachado, descuento, tarjeta["cucardas"] or SIN_CUCARDAS
+
+    async def _enriquecer_producto_provincia(
+        self, pagina: Page, url: str, idx: int
+    ) -> tuple[str | None, str | None] | None:
+        """Abre la ficha *url* y devuelve (arbol de categorias, EAN), o None si no se pudo leer."""
+        return await self._enriquecer_producto_vtex(
+            pagina, url, idx, PROVINCIA_SELECTOR_BREADCRUMB, PROVINCIA_BREADCRUMB_IGNORADOS
+        )
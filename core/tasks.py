@@ -6,154 +6,195 @@ Separadas del servicio principal para mantener separación de responsabilidades.
 """
 from __future__ import annotations
 
-from asgiref.sync import async_to_sync
+import asyncio
+import atexit
+import threading
+import time
+from collections.abc import Awaitable, Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any
+
+from asgiref.sync import sync_to_async
 
 from core.services.ReportePaywayService import ReportePaywayService
 from core.services.ReporteVtexService import ReporteVtexService
 from core.services.ReporteCDPService import ReporteCDPService
 from core.services.ReporteJanisService import ReporteJanisService
 from core.services.CruceService import CruceService
-from core.models import ReportePayway, ReporteVtex, ReporteCDP, ReporteJanis, Cruce
+from core.services.ActualizarModalService import ActualizarModalService
+from core.services.BusquedaEanService import BusquedaEanService
+from core.services.BusquedaCategoriaService import BusquedaCategoriaService
+from core.services.SellersExternosService import SellersExternosService
+from core.models import ReportePayway, ReporteVtex, ReporteCDP, ReporteJanis, Cruce, TareaCatalogacion
 from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Model
 import logging
 import os
+import requests
 
 logger: logging.Logger = logging.getLogger(__name__)
 
 
 # ============================================================================
-# TAREA PRINCIPAL: Generar reporte de forma asíncrona
+# EVENT LOOP DEL WORKER
 # ============================================================================
 
-def generar_reporte_payway_async(fecha_inicio: str, fecha_fin: str, reporte_id: int, ruta_carpeta: str | None = None) -> int:
-    """
-    Genera un reporte de Payway de forma asíncrona.
+# Un event loop por hilo de cada proceso worker de Django-Q, reutilizado entre
+# tareas. Es local al hilo: un loop solo puede correr en el hilo que lo usa.
+_loop_worker: threading.local = threading.local()
 
-    Esta función está diseñada para ser ejecutada por Django-Q workers.
 
-    Args:
-        fecha_inicio (str): Fecha de inicio en formato DD/MM/YYYY
-        fecha_fin (str): Fecha de fin en formato DD/MM/YYYY
-        reporte_id (int): ID del reporte creado en la base de datos
-        ruta_carpeta (str, optional): Ruta donde guardar archivos.
-                                      Si es None, usa MEDIA_ROOT/reportes_payway
+def _obtener_loop_worker() -> asyncio.AbstractEventLoop:
+    """
+    Devuelve el event loop del hilo actual del worker, creandolo la primera vez.
 
-    Returns:
-        int: ID del reporte generado
+    El loop queda asociado al PID: si el proceso se forkeo (o el loop se cerro)
+    se crea uno nuevo en lugar de reutilizar el heredado. Su executor por
+    defecto, el que usan asyncio.to_thread y run_in_executor(None, ...) en los
+    servicios para el I/O bloqueante, tiene settings.TAREAS_IO_WORKERS hilos y
+    se comparte entre todas las tareas del hilo.
+    """
+    loop: asyncio.AbstractEventLoop | None = getattr(_loop_worker, 'loop', None)
+    if loop is None or loop.is_closed() or getattr(_loop_worker, 'pid', None) != os.getpid():
+        loop = asyncio.new_event_loop()
+        loop.set_default_executor(
+            ThreadPoolExecutor(max_workers=settings.TAREAS_IO_WORKERS, thread_name_prefix='qtask-io')
+        )
+        asyncio.set_event_loop(loop)
+        _loop_worker.loop = loop
+        _loop_worker.pid = os.getpid()
+    return loop
 
-    Raises:
-        ValueError: Si las fechas son inválidas o faltan credenciales
-        Exception: Si ocurre algún error durante la generación
 
-    Ejemplo de uso desde view:
-        from django_q.tasks import async_task
-
-        task_id = async_task(
-            'core.tasks.generar_reporte_payway_async',
-            '01/12/2024',
-            '10/12/2024',
-            reporte_id,
-            hook='core.tasks.notificar_reporte_completado'
-        )
+async def _con_conexiones_recicladas(
+    funcion: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any
+) -> Any:
     """
-    logger.info(f"[Django-Q] Iniciando generación asíncrona: {fecha_inicio} - {fecha_fin}")
+    Corre funcion(*args, **kwargs) cerrando antes y después las conexiones a
+    la base viejas o rotas.
 
+    Sin un async_to_sync alrededor, los sync_to_async de los servicios usan el
+    hilo global de asgiref y las conexiones quedan en ese hilo, donde el
+    close_old_connections de Django-Q (hilo principal) nunca llega; por eso se
+    llama acá, en ese mismo hilo.
+    """
+    await sync_to_async(close_old_connections)()
     try:
-        # Obtener el reporte de la base de datos
-        nuevo_reporte = ReportePayway.objects.get(id=reporte_id)
+        return await funcion(*args, **kwargs)
+    finally:
+        await sync_to_async(close_old_connections)()
 
-        # Configurar ruta si no se proporcionó
-        if ruta_carpeta is None:
-            ruta_carpeta = os.path.join(settings.MEDIA_ROOT, 'reportes_payway')
 
-        # Instanciar el servicio
-        servicio = ReportePaywayService(ruta_carpeta=ruta_carpeta)
-        reporte_id = async_to_sync(servicio.generar_reporte)(
-            fecha_inicio,
-            fecha_fin,
-            nuevo_reporte
+def _ejecutar_async(funcion: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> Any:
+    """
+    Ejecuta la corrutina funcion(*args, **kwargs) en el loop del worker y
+    devuelve su resultado, sin el hilo y el loop nuevos de async_to_sync por
+    tarea. Las tareas son sincronas: llamarla desde una corrutina del mismo
+    hilo (loop ya corriendo) es un error de uso y se rechaza.
+    """
+    loop = _obtener_loop_worker()
+    if loop.is_running():
+        raise RuntimeError(
+            "_ejecutar_async no puede llamarse con el loop del worker corriendo; "
+            "desde codigo async hay que hacer await de la corrutina"
         )
-        # Ejecutar la generación (puede tardar minutos u horas)
+    return loop.run_until_complete(_con_conexiones_recicladas(funcion, *args, **kwargs))
 
-        logger.info(f"[Django-Q] Reporte {reporte_id} generado exitosamente")
-        return reporte_id
 
-    except Exception as e:
-        logger.error(f"[Django-Q] Error al generar reporte Payway: {e}", exc_info=True)
-        raise
+# ============================================================================
+# SESION HTTP DEL WORKER
+# ============================================================================
 
+# Una sesión HTTP por proceso worker y política de reintentos: las tareas que
+# llaman APIs (VTEX, Janis, modal) reutilizan sus conexiones keep-alive en lugar
+# de abrir TCP+TLS. Solo la paginación de VTEX reintenta ante 429/5xx; Janis y
+# el modal reciben cada respuesta tal cual y manejan el estado HTTP ellos.
+_sesiones_http_worker: dict[bool, requests.Session] = {}
+_pid_sesion_http_worker: int | None = None
 
-def generar_reporte_vtex_async(fecha_inicio: str, fecha_fin: str, reporte_id: int, ruta_carpeta: str | None = None) -> int:
-    """
-    Genera un reporte de VTEX de forma asíncrona.
 
-    Esta función está diseñada para ser ejecutada por Django-Q workers.
-    Los filtros se obtienen automáticamente del reporte mediante FiltroReporteVtex.
-
-    Args:
-        fecha_inicio (str): Fecha de inicio en formato DD/MM/YYYY
-        fecha_fin (str): Fecha de fin en formato DD/MM/YYYY
-        reporte_id (int): ID del reporte creado en la base de datos
-        ruta_carpeta (str, optional): Ruta donde guardar archivos.
-                                      Si es None, usa MEDIA_ROOT/reportes_vtex
+def _obtener_sesion_http(reintentar: bool = True) -> requests.Session:
+    """
+    Devuelve la sesión HTTP del proceso worker (con o sin reintentos ante
+    429/5xx, ver ReporteVtexService.crear_sesion_http), creandola la primera vez.
 
-    Returns:
-        int: ID del reporte generado
+    Igual que el loop, quedan asociadas al PID: un proceso forkeado no reutiliza
+    los sockets heredados. Se cierran al terminar el proceso.
+    """
+    global _pid_sesion_http_worker
+    if _pid_sesion_http_worker != os.getpid():
+        _sesiones_http_worker.clear()
+        _pid_sesion_http_worker = os.getpid()
+    sesion = _sesiones_http_worker.get(reintentar)
+    if sesion is None:
+        sesion = _sesiones_http_worker[reintentar] = ReporteVtexService.crear_sesion_http(reintentar)
+        atexit.register(sesion.close)
+    return sesion
 
-    Raises:
-        ValueError: Si las fechas son inválidas
-        Exception: Si ocurre algún error durante la generación
 
-    Ejemplo de uso desde view:
-        from django_q.tasks import async_task
+# ============================================================================
+# TAREA PRINCIPAL: Generar reporte de forma asíncrona
+# ============================================================================
 
-        task_id = async_task(
-            'core.tasks.generar_reporte_vtex_async',
-            '01/12/2024',
-            '10/12/2024',
-            reporte_id
-        )
+@contextmanager
+def _registrar_tarea(descripcion: str) -> Iterator[None]:
     """
-    logger.info(f"[Django-Q] Iniciando generación asíncrona VTEX: {fecha_inicio} - {fecha_fin}")
-
+    Deja un único registro por tarea al terminar, con su duración: éxito en
+    INFO o el error con traceback (que se vuelve a lanzar para Django-Q).
+    """
+    inicio = time.perf_counter()
     try:
-        # Obtener el reporte de la base de datos
-        reporte = ReporteVtex.objects.get(id=reporte_id)
-
-        # Configurar ruta si no se proporcionó
-        if ruta_carpeta is None:
-            ruta_carpeta = os.path.join(settings.MEDIA_ROOT, 'reportes_vtex')
-
-        # Instanciar el servicio
-        servicio = ReporteVtexService(ruta_carpeta=ruta_carpeta)
-
-        # Ejecutar la generación (los filtros se obtienen del reporte)
-        resultado = async_to_sync(servicio.generar_reporte)(
-            fecha_inicio,
-            fecha_fin,
-            reporte_id
-        )
-
-        logger.info(f"[Django-Q] Reporte VTEX #{reporte_id} generado exitosamente")
-        return reporte_id
-
+        yield
     except Exception as e:
-        logger.error(f"[Django-Q] Error al generar reporte VTEX: {e}", exc_info=True)
+        logger.error(
+            f"[Django-Q] {descripcion} falló tras {time.perf_counter() - inicio:.1f}s: {e}", exc_info=True
+        )
         raise
+    logger.info(f"[Django-Q] {descripcion} finalizada en {time.perf_counter() - inicio:.1f}s")
 
 
-def generar_reporte_cdp_async(fecha_inicio: str, fecha_fin: str, reporte_id: int, ruta_carpeta: str | None = None) -> int:
+def _pendiente_de_generar(modelo: type[Model], pk: int, descripcion: str) -> Model | None:
+    """
+    Devuelve la fila *pk* de *modelo* (solo id y estado) si todavía hay que
+    generarla, o None si ya no existe o ya está COMPLETADO (p.ej. una tarea
+    encolada dos veces), para no repetir horas de trabajo.
+    """
+    objeto = modelo.objects.only('id', 'estado').filter(pk=pk).first()
+    if objeto is None:
+        logger.info(f"[Django-Q] {descripcion} no existe, se omite la tarea")
+    elif objeto.estado == modelo.Estado.COMPLETADO:
+        logger.info(f"[Django-Q] {descripcion} ya estaba completado, se omite la tarea")
+        objeto = None
+    return objeto
+
+
+# tipo de reporte -> (modelo, servicio, carpeta dentro de MEDIA_ROOT, nombre para los logs,
+#                     sesión HTTP del worker que recibe el servicio: None si no consulta
+#                     una API, si no el argumento reintentar de _obtener_sesion_http)
+_REPORTES: dict[str, tuple[type[Model], type, str, str, bool | None]] = {
+    'payway': (ReportePayway, ReportePaywayService, 'reportes_payway', 'Payway', None),
+    'vtex': (ReporteVtex, ReporteVtexService, 'reportes_vtex', 'VTEX', True),
+    'cdp': (ReporteCDP, ReporteCDPService, 'reportes_cdp', 'CDP', None),
+    'janis': (ReporteJanis, ReporteJanisService, 'reportes_janis', 'Janis', False),
+}
+
+
+def _generar_reporte(tipo: str, fecha_inicio: str, fecha_fin: str, reporte_id: int, ruta_carpeta: str | None = None) -> int:
     """
-    Genera un reporte de CDP de forma asíncrona.
+    Genera un reporte del *tipo* indicado (clave de _REPORTES) de forma asíncrona.
 
-    Esta función está diseñada para ser ejecutada por Django-Q workers.
+    Las tareas generar_reporte_<tipo>_async delegan aquí para que Django-Q
+    las siga encontrando por su ruta.
 
     Args:
+        tipo (str): 'payway', 'vtex', 'cdp' o 'janis'
         fecha_inicio (str): Fecha de inicio en formato DD/MM/YYYY
         fecha_fin (str): Fecha de fin en formato DD/MM/YYYY
         reporte_id (int): ID del reporte creado en la base de datos
         ruta_carpeta (str, optional): Ruta donde guardar archivos.
-                                      Si es None, usa MEDIA_ROOT/reportes_cdp
+                                      Si es None, usa MEDIA_ROOT/reportes_<tipo>
 
     Returns:
         int: ID del reporte generado
@@ -164,98 +205,57 @@ def generar_reporte_cdp_async(fecha_inicio: str, fecha_fin: str, reporte_id: int
 
     Ejemplo de uso desde view:
         from django_q.tasks import async_task
+        from core.tasks import generar_reporte_vtex_async
 
         task_id = async_task(
-            'core.tasks.generar_reporte_cdp_async',
+            generar_reporte_vtex_async,
             '01/12/2024',
             '10/12/2024',
             reporte_id
         )
     """
-    logger.info(f"[Django-Q] Iniciando generación asíncrona CDP: {fecha_inicio} - {fecha_fin}")
-
-    try:
-        # Obtener el reporte de la base de datos
-        reporte = ReporteCDP.objects.get(id=reporte_id)
+    modelo, clase_servicio, carpeta, nombre, reintentar_http = _REPORTES[tipo]
+    if _pendiente_de_generar(modelo, reporte_id, f"Reporte {nombre} #{reporte_id}") is None:
+        return reporte_id
 
+    with _registrar_tarea(f"Generación de reporte {nombre} #{reporte_id} ({fecha_inicio} - {fecha_fin})"):
         # Configurar ruta si no se proporcionó
         if ruta_carpeta is None:
-            ruta_carpeta = os.path.join(settings.MEDIA_ROOT, 'reportes_cdp')
-
-        # Instanciar el servicio
-        servicio = ReporteCDPService(ruta_carpeta=ruta_carpeta)
+            ruta_carpeta = os.path.join(settings.MEDIA_ROOT, carpeta)
 
-        # Ejecutar la generación (puede tardar minutos u horas)
-        resultado = async_to_sync(servicio.generar_reporte)(
-            fecha_inicio,
-            fecha_fin,
-            reporte_id
+        # Instanciar el servicio; los que consultan APIs usan la sesión del worker
+        kwargs_servicio: dict[str, Any] = (
+            {} if reintentar_http is None else {'sesion_http': _obtener_sesion_http(reintentar_http)}
         )
+        servicio = clase_servicio(ruta_carpeta=ruta_carpeta, **kwargs_servicio)
 
-        logger.info(f"[Django-Q] Reporte CDP #{reporte_id} generado exitosamente")
-        return reporte_id
-
-    except Exception as e:
-        logger.error(f"[Django-Q] Error al generar reporte CDP: {e}", exc_info=True)
-        raise
-
-
-def generar_reporte_janis_async(fecha_inicio: str, fecha_fin: str, reporte_id: int, ruta_carpeta: str | None = None) -> int:
-    """
-    Genera un reporte de Janis de forma asíncrona.
-
-    Esta función está diseñada para ser ejecutada por Django-Q workers.
+        # Ejecutar la generación (puede tardar minutos u horas)
+        _ejecutar_async(servicio.generar_reporte, fecha_inicio, fecha_fin, reporte_id)
 
-    Args:
-        fecha_inicio (str): Fecha de inicio en formato DD/MM/YYYY
-        fecha_fin (str): Fecha de fin en formato DD/MM/YYYY
-        reporte_id (int): ID del reporte creado en la base de datos
-        ruta_carpeta (str, optional): Ruta donde guardar archivos.
-                                      Si es None, usa MEDIA_ROOT/reportes_janis
+    return reporte_id
 
-    Returns:
-        int: ID del reporte generado
 
-    Raises:
-        ValueError: Si las fechas son inválidas o faltan credenciales
-        Exception: Si ocurre algún error durante la generación
+def generar_reporte_payway_async(fecha_inicio: str, fecha_fin: str, reporte_id: int, ruta_carpeta: str | None = None) -> int:
+    """Genera un reporte de Payway de forma asíncrona (ver _generar_reporte)."""
+    return _generar_reporte('payway', fecha_inicio, fecha_fin, reporte_id, ruta_carpeta)
 
-    Ejemplo de uso desde view:
-        from django_q.tasks import async_task
 
-        task_id = async_task(
-            'core.tasks.generar_reporte_janis_async',
-            '01/12/2024',
-            '10/12/2024',
-            reporte_id
-        )
+def generar_reporte_vtex_async(fecha_inicio: str, fecha_fin: str, reporte_id: int, ruta_carpeta: str | None = None) -> int:
     """
-    logger.info(f"[Django-Q] Iniciando generación asíncrona Janis: {fecha_inicio} - {fecha_fin}")
-
-    try:
-        # Obtener el reporte de la base de datos
-        reporte = ReporteJanis.objects.get(id=reporte_id)
-
-        # Configurar ruta si no se proporcionó
-        if ruta_carpeta is None:
-            ruta_carpeta = os.path.join(settings.MEDIA_ROOT, 'reportes_janis')
+    Genera un reporte de VTEX de forma asíncrona (ver _generar_reporte).
+    Los filtros se obtienen automáticamente del reporte mediante FiltroReporteVtex.
+    """
+    return _generar_reporte('vtex', fecha_inicio, fecha_fin, reporte_id, ruta_carpeta)
 
-        # Instanciar el servicio
-        servicio = ReporteJanisService(ruta_carpeta=ruta_carpeta)
 
-        # Ejecutar la generación (puede tardar minutos u horas)
-        resultado = async_to_sync(servicio.generar_reporte)(
-            fecha_inicio,
-            fecha_fin,
-            reporte_id
-        )
+def generar_reporte_cdp_async(fecha_inicio: str, fecha_fin: str, reporte_id: int, ruta_carpeta: str | None = None) -> int:
+    """Genera un reporte de CDP de forma asíncrona (ver _generar_reporte)."""
+    return _generar_reporte('cdp', fecha_inicio, fecha_fin, reporte_id, ruta_carpeta)
 
-        logger.info(f"[Django-Q] Reporte Janis #{reporte_id} generado exitosamente")
-        return reporte_id
 
-    except Exception as e:
-        logger.error(f"[Django-Q] Error al generar reporte Janis: {e}", exc_info=True)
-        raise
+def generar_reporte_janis_async(fecha_inicio: str, fecha_fin: str, reporte_id: int, ruta_carpeta: str | None = None) -> int:
+    """Genera un reporte de Janis de forma asíncrona (ver _generar_reporte)."""
+    return _generar_reporte('janis', fecha_inicio, fecha_fin, reporte_id, ruta_carpeta)
 
 
 def generar_cruce_async(cruce_id: int, reporte_vtex_id: int | None = None, reporte_payway_id: int | None = None, reporte_cdp_id: int | None = None, reporte_janis_id: int | None = None) -> int:
@@ -276,9 +276,10 @@ def generar_cruce_async(cruce_id: int, reporte_vtex_id: int | None = None, repor
 
     Ejemplo de uso desde view:
         from django_q.tasks import async_task
+        from core.tasks import generar_cruce_async
 
         task_id = async_task(
-            'core.tasks.generar_cruce_async',
+            generar_cruce_async,
             cruce_id,
             reporte_vtex_id,
             reporte_payway_id,
@@ -286,14 +287,16 @@ def generar_cruce_async(cruce_id: int, reporte_vtex_id: int | None = None, repor
             reporte_janis_id
         )
     """
-    logger.info(f"[Django-Q] Iniciando generación asíncrona de cruce #{cruce_id}")
+    if _pendiente_de_generar(Cruce, cruce_id, f"Cruce #{cruce_id}") is None:
+        return cruce_id
 
-    try:
+    with _registrar_tarea(f"Generación de cruce #{cruce_id}"):
         # Instanciar el servicio
         servicio = CruceService()
 
         # Ejecutar la generación
-        resultado = async_to_sync(servicio.generar_cruce)(
+        _ejecutar_async(
+            servicio.generar_cruce,
             cruce_id,
             reporte_vtex_id,
             reporte_payway_id,
@@ -301,86 +304,57 @@ def generar_cruce_async(cruce_id: int, reporte_vtex_id: int | None = None, repor
             reporte_janis_id
         )
 
-        logger.info(f"[Django-Q] Cruce #{cruce_id} generado exitosamente")
-        return cruce_id
-
-    except Exception as e:
-        logger.error(f"[Django-Q] Error al generar cruce: {e}", exc_info=True)
-        raise
-
+    return cruce_id
 
-from core.services.ActualizarModalService import ActualizarModalService
-from core.models import TareaCatalogacion
 
 def actualizar_modal_async(tarea_id: int, lista_skus: list) -> int:
     """Actualiza el modal logistico de SKUs via API VTEX."""
-    logger.info(f"[Django-Q] Iniciando actualizacion de modal para tarea #{tarea_id}")
-    try:
+    with _registrar_tarea(f"Actualizacion de modal de la tarea #{tarea_id}"):
         tarea = TareaCatalogacion.objects.get(id=tarea_id)
-        servicio = ActualizarModalService()
-        async_to_sync(servicio.ejecutar)(tarea, lista_skus)
-        logger.info(f"[Django-Q] Tarea #{tarea_id} finalizada")
-        return tarea_id
-    except Exception as e:
-        logger.error(f"[Django-Q] Error en tarea #{tarea_id}: {e}", exc_info=True)
-        raise
+        servicio = ActualizarModalService(sesion_http=_obtener_sesion_http(reintentar=False))
+        _ejecutar_async(servicio.ejecutar, tarea, lista_skus)
+    return tarea_id
 
 
 def busqueda_eans_async(tarea_id: int, eans: list, direccion: str, tipo_regio: str, n_workers: int, headless: bool = True) -> int:
-    """Busqueda concurrente de EANs en Carrefour."""
-    logger.info(f"[Django-Q] Iniciando busqueda de EANs para tarea #{tarea_id}")
-    try:
+    """
+    Busqueda concurrente de EANs en Carrefour. *n_workers* se acota a
+    settings.CARREFOUR_EAN_WORKERS_MAX (si no viene se usa CARREFOUR_EAN_WORKERS).
+    """
+    n_workers = min(n_workers or settings.CARREFOUR_EAN_WORKERS, settings.CARREFOUR_EAN_WORKERS_MAX)
+    with _registrar_tarea(f"Busqueda de EANs de la tarea #{tarea_id} con {n_workers} workers"):
         tarea = TareaCatalogacion.objects.get(id=tarea_id)
-        from core.services.BusquedaEanService import BusquedaEanService
         servicio = BusquedaEanService()
-        async_to_sync(servicio.ejecutar)(tarea, eans, direccion, tipo_regio, n_workers, headless)
-        logger.info(f"[Django-Q] Tarea #{tarea_id} finalizada")
-        return tarea_id
-    except Exception as e:
-        logger.error(f"[Django-Q] Error en tarea #{tarea_id}: {e}", exc_info=True)
-        raise
+        _ejecutar_async(servicio.ejecutar, tarea, eans, direccion, tipo_regio, n_workers, headless)
+    return tarea_id
 
 
 def busqueda_categorias_async(tarea_id: int, direcciones: list, categorias: list, tipo_regio: str, headless: bool = True) -> int:
-    """Busqueda concurrente de categorias en Carrefour."""
-    logger.info(f"[Django-Q] Iniciando busqueda de categorias para tarea #{tarea_id}")
-    try:
+    """Busqueda concurrente de categorias en Carrefour, con settings.CARREFOUR_CATEGORIA_WORKERS workers."""
+    n_workers = settings.CARREFOUR_CATEGORIA_WORKERS
+    with _registrar_tarea(f"Busqueda de categorias de la tarea #{tarea_id} con {n_workers} workers"):
         tarea = TareaCatalogacion.objects.get(id=tarea_id)
-        from core.services.BusquedaCategoriaService import BusquedaCategoriaService
         servicio = BusquedaCategoriaService()
-        async_to_sync(servicio.ejecutar)(tarea, direcciones, categorias, tipo_regio, headless=headless)
-        logger.info(f"[Django-Q] Tarea #{tarea_id} finalizada")
-        return tarea_id
-    except Exception as e:
-        logger.error(f"[Django-Q] Error en tarea #{tarea_id}: {e}", exc_info=True)
-        raise
+        _ejecutar_async(
+            servicio.ejecutar, tarea, direcciones, categorias, tipo_regio,
+            cantidad_workers=n_workers, headless=headless
+        )
+    return tarea_id
 
 
 def sellers_externos_async(tarea_id: int, colecciones: list, headless: bool = True) -> int:
     """Busqueda de productos en colecciones de sellers externos."""
-    logger.info(f"[Django-Q] Iniciando busqueda de sellers externos para tarea #{tarea_id}")
-    try:
+    with _registrar_tarea(f"Busqueda de sellers externos de la tarea #{tarea_id}"):
         tarea = TareaCatalogacion.objects.get(id=tarea_id)
-        from core.services.SellersExternosService import SellersExternosService
         servicio = SellersExternosService()
-        async_to_sync(servicio.ejecutar_carrefour)(tarea, colecciones, headless)
-        logger.info(f"[Django-Q] Tarea #{tarea_id} finalizada")
-        return tarea_id
-    except Exception as e:
-        logger.error(f"[Django-Q] Error en tarea #{tarea_id}: {e}", exc_info=True)
-        raise
+        _ejecutar_async(servicio.ejecutar_carrefour, tarea, colecciones, headless)
+    return tarea_id
 
 
 def sellers_no_carrefour_async(tarea_id: int, diccionario_sellers: dict, headless: bool = True) -> int:
     """Busqueda de productos en sellers no Carrefour (Fravega, Megatone, OnCity, Provincia)."""
-    logger.info(f"[Django-Q] Iniciando busqueda sellers no carrefour para tarea #{tarea_id}")
-    try:
+    with _registrar_tarea(f"Busqueda sellers no carrefour de la tarea #{tarea_id}"):
         tarea = TareaCatalogacion.objects.get(id=tarea_id)
-        from core.services.SellersExternosService import SellersExternosService
         servicio = SellersExternosService()
-        async_to_sync(servicio.ejecutar_no_carrefour)(tarea, diccionario_sellers, headless)
-        logger.info(f"[Django-Q] Tarea #{tarea_id} finalizada")
-        return tarea_id
-    except Exception as e:
-        logger.error(f"[Django-Q] Error en tarea #{tarea_id}: {e}", exc_info=True)
-        raise
+        _ejecutar_async(servicio.ejecutar_no_carrefour, tarea, diccionario_sellers, headless)
+    return tarea_id
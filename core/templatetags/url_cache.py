@@ -0,0 +1,38 @@
+"""
+Reversión de URLs cacheada para los links por fila de los listados.
+"""
+from functools import lru_cache
+
+from django import template
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.urls import get_script_prefix, reverse
+
+register = template.Library()
+
+TAMANO_CACHE_URLS = 4096
+
+
+@lru_cache(maxsize=TAMANO_CACHE_URLS)
+def _reverse_cacheado(nombre: str, pk: int, prefijo: str) -> str:
+    """reverse() de *nombre* con *pk*; *prefijo* solo forma parte de la clave."""
+    return reverse(nombre, args=[pk])
+
+
+@register.simple_tag
+def url_cacheada(nombre: str, pk: int) -> str:
+    """
+    Equivalente a {% url nombre pk %} para rutas con un solo <int:pk>.
+
+    Los listados arman detalle/reintentar/eliminar para cada fila; la ruta de
+    un mismo objeto no cambia, así que se resuelve una sola vez por proceso y
+    por prefijo de script (SCRIPT_NAME), que reverse() toma del hilo actual.
+    """
+    return _reverse_cacheado(nombre, pk, get_script_prefix())
+
+
+@receiver(setting_changed)
+def _limpiar_cache_urls(*, setting: str, **kwargs) -> None:
+    """Descarta las URLs cacheadas si cambia el URLconf (p. ej. en tests)."""
+    if setting in ('ROOT_URLCONF', 'FORCE_SCRIPT_NAME'):
+        _reverse_cacheado.cache_clear()
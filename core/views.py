@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, Callable
 
 from django.shortcuts import render, get_object_or_404, redirect
 from django.views.generic import ListView, DetailView, View, DeleteView
@@ -21,6 +21,18 @@ from core.models import (
     ValorFiltroVtex, FiltroReporteVtex,
     TareaCatalogacion
 )
+from core.tasks import (
+    actualizar_modal_async,
+    busqueda_categorias_async,
+    busqueda_eans_async,
+    generar_cruce_async,
+    generar_reporte_cdp_async,
+    generar_reporte_janis_async,
+    generar_reporte_payway_async,
+    generar_reporte_vtex_async,
+    sellers_externos_async,
+    sellers_no_carrefour_async,
+)
 from core.forms import (
     GenerarReportePaywayForm,
     GenerarReporteVtexForm,
@@ -147,7 +159,7 @@ def generar_reporte_payway_view(request: HttpRequest) -> HttpResponse:
             # Encolar tarea en Django-Q
             try:
                 task_id = async_task(
-                    'core.tasks.generar_reporte_payway_async',
+                    generar_reporte_payway_async,
                     fecha_inicio_str,
                     fecha_fin_str,
                     nuevo_reporte.id  # Pasar solo el ID, no el objeto completo
@@ -177,6 +189,7 @@ def generar_reporte_payway_view(request: HttpRequest) -> HttpResponse:
 class reporteVtexListView(ListView):
     """Vista de lista de reportes de VTEX con paginación."""
     model = ReporteVtex
+    queryset = ReporteVtex.con_filtros()  # Cada fila muestra sus filtros
     paginate_by = 50
     template_name = 'core/Vtex/vistaReportes.html'
     ordering = ['-id']
@@ -195,7 +208,7 @@ class reporteVtexDetailView(SingleObjectMixin, ListView):
 
     def get(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
         # Obtener el reporte (SingleObjectMixin)
-        self.object = self.get_object(queryset=ReporteVtex.objects.all())
+        self.object = self.get_object(queryset=ReporteVtex.con_filtros())
         return super().get(request, *args, **kwargs)
 
     def get_queryset(self) -> QuerySet[Any]:
@@ -270,7 +283,7 @@ def generar_reporte_vtex_view(request: HttpRequest) -> HttpResponse:
             # Encolar tarea en Django-Q
             try:
                 task_id = async_task(
-                    'core.tasks.generar_reporte_vtex_async',
+                    generar_reporte_vtex_async,
                     fecha_inicio_str,
                     fecha_fin_str,
                     nuevo_reporte.id  # El servicio obtendrá los filtros del reporte
@@ -460,7 +473,7 @@ def generar_reporte_cdp_view(request: HttpRequest) -> HttpResponse:
             # Encolar tarea en Django-Q
             try:
                 task_id = async_task(
-                    'core.tasks.generar_reporte_cdp_async',
+                    generar_reporte_cdp_async,
                     fecha_inicio_str,
                     fecha_fin_str,
                     nuevo_reporte.id  # Pasar solo el ID, no el objeto completo
@@ -571,7 +584,7 @@ def generar_reporte_janis_view(request: HttpRequest) -> HttpResponse:
             # Encolar tarea en Django-Q
             try:
                 task_id = async_task(
-                    'core.tasks.generar_reporte_janis_async',
+                    generar_reporte_janis_async,
                     fecha_inicio_str,
                     fecha_fin_str,
                     nuevo_reporte.id  # Pasar solo el ID, no el objeto completo
@@ -783,7 +796,7 @@ def generar_cruce_view(request: HttpRequest) -> HttpResponse:
             # Encolar tarea en Django-Q
             try:
                 task_id = async_task(
-                    'core.tasks.generar_cruce_async',
+                    generar_cruce_async,
                     nuevo_cruce.id,
                     reporte_vtex.id if reporte_vtex else None,
                     reporte_payway.id if reporte_payway else None,
@@ -820,11 +833,11 @@ class ReporteRetryMixin:
 
     Las clases que hereden deben definir:
         - model: El modelo del reporte (ReportePayway, ReporteVtex, etc.)
-        - task_name: Nombre de la tarea async ('core.tasks.generar_reporte_payway_async')
+        - tarea: Tarea async a encolar, como staticmethod(generar_reporte_payway_async)
         - success_url: URL a la que redirigir después del reintento
     """
     model: Any = None
-    task_name: str | None = None
+    tarea: Callable[..., Any] | None = None
     success_url: str | None = None
 
     def post(self, request: HttpRequest, pk: int) -> HttpResponse:
@@ -844,7 +857,7 @@ class ReporteRetryMixin:
 
         # Encolar tarea
         try:
-            async_task(self.task_name, fecha_inicio_str, fecha_fin_str, reporte.id)
+            async_task(self.tarea, fecha_inicio_str, fecha_fin_str, reporte.id)
             messages.success(request, f'Reporte #{reporte.id} encolado para reintento.')
         except Exception as e:
             messages.error(request, f'Error al encolar reintento: {str(e)}')
@@ -873,7 +886,7 @@ class ReporteDeleteMixin:
 # --- PAYWAY ---
 class ReportePaywayRetryView(ReporteRetryMixin, View):
     model = ReportePayway
-    task_name = 'core.tasks.generar_reporte_payway_async'
+    tarea = staticmethod(generar_reporte_payway_async)
     success_url = 'lista_reportes'
 
 
@@ -908,7 +921,7 @@ class ReporteVtexRetryView(View):
         # Encolar tarea (los filtros se obtienen del reporte en el servicio)
         try:
             async_task(
-                'core.tasks.generar_reporte_vtex_async',
+                generar_reporte_vtex_async,
                 fecha_inicio_str,
                 fecha_fin_str,
                 reporte.id
@@ -928,7 +941,7 @@ class ReporteVtexDeleteView(ReporteDeleteMixin, DeleteView):
 # --- CDP ---
 class ReporteCDPRetryView(ReporteRetryMixin, View):
     model = ReporteCDP
-    task_name = 'core.tasks.generar_reporte_cdp_async'
+    tarea = staticmethod(generar_reporte_cdp_async)
     success_url = 'lista_reportes_cdp'
 
 
@@ -940,7 +953,7 @@ class ReporteCDPDeleteView(ReporteDeleteMixin, DeleteView):
 # --- JANIS ---
 class ReporteJanisRetryView(ReporteRetryMixin, View):
     model = ReporteJanis
-    task_name = 'core.tasks.generar_reporte_janis_async'
+    tarea = staticmethod(generar_reporte_janis_async)
     success_url = 'lista_reportes_janis'
 
 
@@ -969,7 +982,7 @@ class CruceRetryView(View):
 
         try:
             async_task(
-                'core.tasks.generar_cruce_async',
+                generar_cruce_async,
                 cruce.id,
                 cruce.reporte_vtex.id if cruce.reporte_vtex else None,
                 cruce.reporte_payway.id if cruce.reporte_payway else None,
@@ -1000,6 +1013,7 @@ class CruceDeleteView(ReporteDeleteMixin, DeleteView):
 
 class TareaCatalogacionListView(ListView):
     model = TareaCatalogacion
+    queryset = TareaCatalogacion.objects.defer('logs')  # El listado no muestra los logs
     paginate_by = 50
     template_name = 'core/Catalogacion/listaTareas.html'
     ordering = ['-id']
@@ -1070,7 +1084,7 @@ def actualizar_modal_view(request: HttpRequest) -> HttpResponse:
                     tipo=TareaCatalogacion.TipoTarea.ACTUALIZAR_MODAL,
                     progreso_total=len(lista_skus)
                 )
-                async_task('core.tasks.actualizar_modal_async', tarea.id, lista_skus)
+                async_task(actualizar_modal_async, tarea.id, lista_skus)
                 messages.success(request, f"Tarea #{tarea.id} creada. Procesando {len(lista_skus)} SKUs.")
                 return redirect('detalle_tarea_catalogacion', pk=tarea.id)
 
@@ -1112,7 +1126,7 @@ def busqueda_eans_view(request: HttpRequest) -> HttpResponse:
                 tipo=TareaCatalogacion.TipoTarea.BUSQUEDA_EANS,
                 progreso_total=len(eans)
             )
-            async_task('core.tasks.busqueda_eans_async', tarea.id, eans, direccion, tipo_regio, n_workers, headless)
+            async_task(busqueda_eans_async, tarea.id, eans, direccion, tipo_regio, n_workers, headless)
             messages.success(request, f"Tarea #{tarea.id} creada. Buscando {len(eans)} EANs.")
             return redirect('detalle_tarea_catalogacion', pk=tarea.id)
         else:
@@ -1150,7 +1164,7 @@ def busqueda_categorias_view(request: HttpRequest) -> HttpResponse:
                 tipo=TareaCatalogacion.TipoTarea.BUSQUEDA_CATEGORIAS,
                 progreso_total=len(direcciones) * len(categorias)
             )
-            async_task('core.tasks.busqueda_categorias_async', tarea.id, direcciones, categorias, tipo_regio, headless)
+            async_task(busqueda_categorias_async, tarea.id, direcciones, categorias, tipo_regio, headless)
             messages.success(request, f"Tarea #{tarea.id} creada. Procesando {len(categorias)} categorias en {len(direcciones)} direcciones.")
             return redirect('detalle_tarea_catalogacion', pk=tarea.id)
         else:
@@ -1185,7 +1199,7 @@ def sellers_externos_view(request: HttpRequest) -> HttpResponse:
                 tipo=TareaCatalogacion.TipoTarea.SELLERS_EXTERNOS,
                 progreso_total=len(colecciones)
             )
-            async_task('core.tasks.sellers_externos_async', tarea.id, colecciones, headless)
+            async_task(sellers_externos_async, tarea.id, colecciones, headless)
             messages.success(request, f"Tarea #{tarea.id} creada. Procesando {len(colecciones)} colecciones.")
             return redirect('detalle_tarea_catalogacion', pk=tarea.id)
         else:
@@ -1224,7 +1238,7 @@ def sellers_no_carrefour_view(request: HttpRequest) -> HttpResponse:
                 tipo=TareaCatalogacion.TipoTarea.SELLERS_NO_CARREFOUR,
                 progreso_total=total
             )
-            async_task('core.tasks.sellers_no_carrefour_async', tarea.id, diccionario, headless)
+            async_task(sellers_no_carrefour_async, tarea.id, diccionario, headless)
             messages.success(request, f"Tarea #{tarea.id} creada. Procesando {total} sellers.")
             return redirect('detalle_tarea_catalogacion', pk=tarea.id)
         else:
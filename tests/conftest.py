@@ -28,6 +28,8 @@ from core.models import (
     # Cruces
     Cruce,
     TransaccionCruce,
+    # Catalogacion
+    TareaCatalogacion,
 )
 
 
@@ -284,3 +286,15 @@ def transaccion_cruce(db, cruce, fecha_hora_transaccion):
         resultado_cruce="",
         cruce=cruce
     )
+
+
+# =============================================================================
+# FIXTURES DE CATALOGACION
+# =============================================================================
+
+@pytest.fixture
+def tarea_catalogacion(db):
+    """Crea una tarea de catalogacion de sellers externos para tests."""
+    return TareaCatalogacion.objects.create(
+        tipo=TareaCatalogacion.TipoTarea.SELLERS_EXTERNOS,
+    )
@@ -0,0 +1,25 @@
+"""
+Tests para la configuracion de la app core.
+"""
+import pytest
+from django.apps import apps
+from unittest.mock import patch
+
+from core import apps as core_apps
+
+
+class TestCoreConfig:
+    """Tests para CoreConfig.ready."""
+
+    @pytest.mark.parametrize("argv, en_segundo_plano", [
+        (["manage.py", "qcluster"], True),
+        (["manage.py", "runserver"], False),
+        (["manage.py", "migrate"], False),
+    ])
+    def test_logs_en_segundo_plano_solo_en_qcluster(self, argv, en_segundo_plano):
+        """Test que el QueueListener de logs solo se instala al correr el cluster de Django-Q."""
+        with patch.object(core_apps.sys, "argv", argv), \
+                patch.object(core_apps, "_loguear_en_segundo_plano") as loguear:
+            apps.get_app_config("core").ready()
+
+        assert loguear.called is en_segundo_plano
@@ -204,6 +204,36 @@ class TestReporteVtex:
         assert "test_invoiced" in filtros_api["f_status"]
         assert "test_canceled" in filtros_api["f_status"]
 
+    def test_obtener_filtros_para_api_usa_la_precarga(
+        self, reporte_vtex, tipo_filtro_estado, valor_filtro_facturado, db, django_assert_num_queries
+    ):
+        """Test que con los filtros precargados no hace consultas adicionales."""
+        FiltroReporteVtex.objects.create(
+            reporte=reporte_vtex,
+            tipo_filtro=tipo_filtro_estado,
+            valor_filtro=valor_filtro_facturado
+        )
+        reporte = ReporteVtex.con_filtros().get(id=reporte_vtex.id)
+
+        with django_assert_num_queries(0):
+            filtros_api = reporte.obtener_filtros_para_api()
+
+        assert filtros_api == {"f_status": ["test_invoiced"]}
+
+    def test_obtener_filtros_para_api_sin_precarga_una_consulta(
+        self, reporte_vtex, tipo_filtro_estado, valor_filtro_facturado, valor_filtro_cancelado, db,
+        django_assert_num_queries
+    ):
+        """Test que sin precarga trae los filtros con su tipo y valor en una sola consulta."""
+        for valor in (valor_filtro_facturado, valor_filtro_cancelado):
+            FiltroReporteVtex.objects.create(reporte=reporte_vtex, tipo_filtro=tipo_filtro_estado, valor_filtro=valor)
+        reporte = ReporteVtex.objects.get(id=reporte_vtex.id)
+
+        with django_assert_num_queries(1):
+            filtros_api = reporte.obtener_filtros_para_api()
+
+        assert sorted(filtros_api["f_status"]) == ["test_canceled", "test_invoiced"]
+
     def test_obtener_filtros_por_tipo(self, reporte_vtex, tipo_filtro_estado, valor_filtro_facturado, db):
         """Test obtener valores de filtro por tipo."""
         FiltroReporteVtex.objects.create(
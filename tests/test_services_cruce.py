@@ -327,3 +327,78 @@ class TestGuardarTransaccionesCruce:
         cantidad = await self.service.guardar_transacciones_cruce(transacciones, cruce)
 
         assert cantidad == 50
+
+
+@pytest.mark.asyncio
+class TestGenerarCruce:
+    """Tests para el metodo generar_cruce (async)."""
+
+    @pytest.mark.django_db(transaction=True)
+    async def test_lee_las_transacciones_por_id_de_reporte(self, cruce, transaccion_vtex, transaccion_cdp):
+        """Test que trae las transacciones de los reportes indicados y completa el cruce."""
+        service = CruceService()
+
+        with patch.object(service, "cruzar_transacciones", AsyncMock(return_value=[])) as cruzar:
+            resultado = await service.generar_cruce(
+                cruce.id, reporte_vtex_id=transaccion_vtex.reporte_id, reporte_cdp_id=transaccion_cdp.reporte_id
+            )
+
+        assert resultado is True
+        vtex, payway, cdp, janis = cruzar.await_args.args
+        assert [t.id for t in vtex] == [transaccion_vtex.id]
+        assert [t.id for t in cdp] == [transaccion_cdp.id]
+        assert payway == [] and janis == []
+        await cruce.arefresh_from_db()
+        assert cruce.estado == Cruce.Estado.COMPLETADO
+
+    @pytest.mark.django_db(transaction=True)
+    async def test_solo_actualiza_estado_y_fecha(self, cruce):
+        """Test que los cambios de estado no pisan columnas editadas mientras corre el cruce."""
+        service = CruceService()
+
+        async def cruzar_y_editar(*_):
+            await Cruce.objects.filter(id=cruce.id).aupdate(revisar="Editado durante el cruce")
+            return []
+
+        with patch.object(service, "cruzar_transacciones", side_effect=cruzar_y_editar):
+            await service.generar_cruce(cruce.id)
+
+        await cruce.arefresh_from_db()
+        assert cruce.estado == Cruce.Estado.COMPLETADO
+        assert cruce.fecha_realizado is not None
+        assert cruce.revisar == "Editado durante el cruce"
+
+    @pytest.mark.django_db(transaction=True)
+    async def test_reporte_eliminado_marca_error(self, cruce, reporte_vtex):
+        """Test que si un reporte seleccionado ya no existe el cruce queda en ERROR sin cruzar."""
+        service = CruceService()
+        reporte_id = reporte_vtex.id
+        await reporte_vtex.adelete()
+
+        with patch.object(service, "cruzar_transacciones", AsyncMock(return_value=[])) as cruzar:
+            resultado = await service.generar_cruce(cruce.id, reporte_vtex_id=reporte_id)
+
+        assert resultado is False
+        cruzar.assert_not_awaited()
+        await cruce.arefresh_from_db()
+        assert cruce.estado == Cruce.Estado.ERROR
+
+    @pytest.mark.django_db(transaction=True)
+    async def test_reporte_vacio_existente_completa(self, cruce, reporte_vtex):
+        """Test que un reporte seleccionado sin transacciones pero existente no hace fallar el cruce."""
+        service = CruceService()
+
+        with patch.object(service, "cruzar_transacciones", AsyncMock(return_value=[])):
+            resultado = await service.generar_cruce(cruce.id, reporte_vtex_id=reporte_vtex.id)
+
+        assert resultado is True
+        await cruce.arefresh_from_db()
+        assert cruce.estado == Cruce.Estado.COMPLETADO
+
+    async def test_no_consulta_reportes_con_transacciones(self):
+        """Test que un reporte que trajo transacciones no se vuelve a consultar."""
+        modelo = MagicMock()
+
+        await CruceService._verificar_reportes_existen((modelo, 7, 'VTEX', [object()]), (modelo, None, 'CDP', []))
+
+        modelo.objects.filter.assert_not_called()
@@ -0,0 +1,32 @@
+"""
+Tests para ReportePaywayService.
+"""
+import pandas as pd
+import pytest
+
+from core.models import ReportePayway, TransaccionPayway
+from core.services.ReportePaywayService import ReportePaywayService
+
+
+class TestGuardarTransacciones:
+    """Tests para guardar_transacciones_sincrinico."""
+
+    @pytest.mark.django_db
+    def test_guarda_por_id_y_solo_actualiza_el_estado(self, reporte_payway, tmp_path):
+        """Test que guarda las transacciones con el ID del reporte y solo cambia su estado."""
+        service = ReportePaywayService(ruta_carpeta=str(tmp_path))
+        df = pd.DataFrame([{
+            "Fecha original": "15/01/2024 13:30:00",
+            "Monto": "1500,50",
+            "id oper.": " 123 ",
+            "Estado": "Aprobada",
+            "Tarjeta": "Visa",
+        }])
+
+        service.guardar_transacciones_sincrinico(df, reporte_payway.id)
+
+        transaccion = TransaccionPayway.objects.get(reporte_id=reporte_payway.id)
+        assert transaccion.numero_transaccion == "123"
+        reporte = ReportePayway.objects.get(id=reporte_payway.id)
+        assert reporte.estado == ReportePayway.Estado.COMPLETADO
+        assert reporte.fecha_inicio == reporte_payway.fecha_inicio
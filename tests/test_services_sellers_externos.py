@@ -0,0 +1,1250 @@
+"""
+Tests para SellersExternosService.
+"""
+import asyncio
+import csv
+
+import orjson
+import pandas as pd
+import pytest
+from asgiref.sync import sync_to_async
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+from unittest.mock import ANY, AsyncMock, MagicMock, patch
+
+from core.models import TareaCatalogacion
+from core.services.SellersExternosService import (
+    CAMPOS_PRODUCTO_CARREFOUR,
+    CARREFOUR_API_PAGE_SIZE,
+    CARREFOUR_SELECTOR_BOTON_PAGINA,
+    CARREFOUR_SELECTOR_TARJETA,
+    CARREFOUR_TARJETAS_JS,
+    FRAVEGA_BREADCRUMB_JS,
+    FRAVEGA_SELECTOR_TARJETA,
+    FRAVEGA_TARJETAS_JS,
+    MAXIMO_BOTON_PAGINA_JS,
+    MEGATONE_FICHA_JS,
+    MEGATONE_LISTADO_NUEVO_JS,
+    MEGATONE_SELECTOR_CATEGORIAS,
+    ONCITY_SELECTOR_BREADCRUMB,
+    SIN_NOMBRE,
+    SellersExternosService,
+    VTEX_FICHA_JS,
+)
+
+
+def _tarjeta_carrefour(**campos):
+    """Helper para crear una tarjeta cruda como la devuelve CARREFOUR_TARJETAS_JS."""
+    tarjeta = {
+        "precioComun": "$ 184.999\n$ 200.000",
+        "precioTachado": "$  250.000",
+        "urlRelativa": "/producto-x/p",
+        "cucardas": [],
+        "vendidoPor": "Vendido y entregado por Tienda X",
+        "nombre": "  Heladera  ",
+        "urlImagen": "https://img/x.jpg",
+    }
+    tarjeta.update(campos)
+    return tarjeta
+
+
+def _tarjeta_fravega(**campos):
+    """Helper para crear una tarjeta cruda como la devuelve FRAVEGA_TARJETAS_JS."""
+    tarjeta = {
+        "precioComun": "$\u00A0499.999",
+        "precioTachado": "$ 600.000",
+        "descuento": "16% OFF",
+        "urlRelativa": "/p/lavarropas-x/",
+        "vendidoPor": "Vendido por Tienda X",
+        "nombre": "  Lavarropas  ",
+        "urlImagen": "https://img/x.jpg",
+    }
+    tarjeta.update(campos)
+    return tarjeta
+
+
+def _cola(productos):
+    """Helper para crear la cola que consume _enriquecer_en_paralelo, cerrada con None."""
+    cola = asyncio.Queue()
+    for prod in [*productos, None]:
+        cola.put_nowait(prod)
+    return cola
+
+
+def _progreso_sumado(incrementar_progreso):
+    """Helper para sumar las cantidades con que se llamo a un mock de _incrementar_progreso."""
+    return sum(c.args[1] if len(c.args) > 1 else 1 for c in incrementar_progreso.await_args_list)
+
+
+def _producto_api(nombre="Heladera", precio=184999.0, precio_lista=250000.0):
+    """Helper para crear un producto como lo devuelve la API de Intelligent Search."""
+    return {
+        "productName": nombre,
+        "linkText": "heladera-x",
+        "specificationGroups": [
+            {"name": "Cucardas", "specifications": [{"name": "Cucardas", "values": ["Envio gratis"]}]},
+            {"name": "Garantia", "specifications": [{"name": "Meses", "values": ["12"]}]},
+        ],
+        "items": [{
+            "images": [{"imageUrl": "https://img/x.jpg"}],
+            "sellers": [
+                {"sellerName": "Otro", "sellerDefault": False, "commertialOffer": {}},
+                {
+                    "sellerName": "Tienda X",
+                    "sellerDefault": True,
+                    "commertialOffer": {"Price": precio, "ListPrice": precio_lista},
+                },
+            ],
+        }],
+    }
+
+
+def _respuesta_api(productos, total, ok=True):
+    """Helper para crear un mock de respuesta de context.request."""
+    respuesta = MagicMock(ok=ok, status=200 if ok else 404)
+    respuesta.json = AsyncMock(return_value={"products": productos, "recordsFiltered": total})
+    return respuesta
+
+
+class TestFormatearPrecio:
+    """Tests para el metodo _formatear_precio."""
+
+    def test_formatea_miles_y_decimales(self):
+        """Test que usa punto de miles y coma decimal solo si hay centavos."""
+        assert SellersExternosService._formatear_precio(184999.0) == "$ 184.999"
+        assert SellersExternosService._formatear_precio(1234.5) == "$ 1.234,50"
+        assert SellersExternosService._formatear_precio(None) is None
+
+
+class TestMapearProductoApiCarrefour:
+    """Tests para el metodo _mapear_producto_api_carrefour."""
+
+    def test_mapea_seller_por_defecto_y_cucardas(self):
+        """Test que toma la oferta del seller por defecto y solo los grupos de cucardas."""
+        producto = SellersExternosService._mapear_producto_api_carrefour(_producto_api())
+
+        assert producto == {
+            "nombreProducto": "Heladera",
+            "precioComun": "$ 184.999",
+            "precioTachado": "$ 250.000",
+            "urlProducto": "https://www.carrefour.com.ar/heladera-x/p",
+            "cucardas": ["Envio gratis"],
+            "vendidoPor": "Tienda X",
+            "urlImagen": "https://img/x.jpg",
+            "arbolCategorias": None,
+            "ean": None,
+        }
+
+    def test_sin_descuento_no_hay_precio_tachado(self):
+        """Test que el precio de lista igual al precio final no se informa como tachado."""
+        producto = SellersExternosService._mapear_producto_api_carrefour(
+            _producto_api(precio=1000.0, precio_lista=1000.0)
+        )
+
+        assert producto["precioTachado"] is None
+
+
+@pytest.mark.asyncio
+class TestBuscarColeccionCarrefourApi:
+    """Tests para el metodo _buscar_coleccion_carrefour_api (async)."""
+
+    async def test_pide_todas_las_paginas(self):
+        """Test que calcula las paginas con recordsFiltered y junta los productos."""
+        total = CARREFOUR_API_PAGE_SIZE + 1
+        contexto = MagicMock()
+        contexto.request.get = AsyncMock(side_effect=[
+            _respuesta_api([_producto_api("A")], total),
+            _respuesta_api([_producto_api("B")], total),
+        ])
+
+        productos = await SellersExternosService()._buscar_coleccion_carrefour_api(contexto, "123")
+
+        assert [p["nombreProducto"] for p in productos] == ["A", "B"]
+        paginas = [llamada.kwargs["params"]["page"] for llamada in contexto.request.get.call_args_list]
+        assert paginas == [1, 2]
+
+    async def test_error_devuelve_none(self):
+        """Test que una respuesta con error indica que hay que recorrer el sitio."""
+        contexto = MagicMock()
+        contexto.request.get = AsyncMock(return_value=_respuesta_api([], 0, ok=False))
+
+        assert await SellersExternosService()._buscar_coleccion_carrefour_api(contexto, "123") is None
+
+
+@pytest.mark.asyncio
+class TestDetectarPaginasCarrefour:
+    """Tests para el metodo _detectar_paginas_carrefour (async)."""
+
+    async def test_lee_el_maximo_en_una_llamada(self):
+        """Test que toma el mayor boton de paginado con un solo evaluate despues del scroll."""
+        pagina = MagicMock()
+        pagina.evaluate = AsyncMock(side_effect=[None, 7])
+
+        assert await SellersExternosService()._detectar_paginas_carrefour(pagina) == 7
+        pagina.evaluate.assert_awaited_with(MAXIMO_BOTON_PAGINA_JS, CARREFOUR_SELECTOR_BOTON_PAGINA)
+
+    async def test_sin_paginado_es_una_pagina(self):
+        """Test que sin botones de paginado la coleccion tiene una sola pagina."""
+        pagina = MagicMock()
+        pagina.evaluate = AsyncMock(side_effect=[None, None])
+
+        assert await SellersExternosService()._detectar_paginas_carrefour(pagina) == 1
+
+
+@pytest.mark.asyncio
+class TestExtraerTarjetasCarrefour:
+    """Tests para el metodo _extraer_tarjetas_carrefour (async)."""
+
+    async def test_extrae_todas_las_tarjetas_en_una_llamada(self):
+        """Test que hace un solo evaluate por pagina y normaliza los campos."""
+        pagina = MagicMock()
+        pagina.evaluate = AsyncMock(return_value=[_tarjeta_carrefour()])
+
+        productos = await SellersExternosService()._extraer_tarjetas_carrefour(pagina)
+
+        pagina.evaluate.assert_awaited_once_with(CARREFOUR_TARJETAS_JS, CARREFOUR_SELECTOR_TARJETA)
+        assert productos == [{
+            "nombreProducto": "Heladera",
+            "precioComun": "$ 184.999",
+            "precioTachado": "$ 250.000",
+            "urlProducto": "https://www.carrefour.com.ar/producto-x/p",
+            "cucardas": ("No tiene",),
+            "vendidoPor": "Tienda X",
+            "urlImagen": "https://img/x.jpg",
+            "arbolCategorias": None,
+            "ean": None,
+        }]
+
+    async def test_campos_faltantes_usan_valores_por_defecto(self):
+        """Test que los campos ausentes caen en los mismos valores que antes."""
+        pagina = MagicMock()
+        pagina.evaluate = AsyncMock(return_value=[_tarjeta_carrefour(
+            precioComun=None, precioTachado=None, urlRelativa=None,
+            vendidoPor=None, nombre=None, urlImagen=None,
+            cucardas=["Envio gratis", " ", None, "Envio gratis", "3 cuotas"],
+        )])
+
+        producto, = await SellersExternosService()._extraer_tarjetas_carrefour(pagina)
+
+        assert producto["precioComun"] is None
+        assert producto["urlProducto"] is None
+        assert producto["vendidoPor"] == "No especificado"
+        assert producto["nombreProducto"] == "Sin nombre"
+        assert producto["cucardas"] == ["Envio gratis", "3 cuotas"]
+
+    async def test_seller_sin_la_frase_es_no_especificado(self):
+        """Test que un texto de seller sin "Vendido y entregado por" no se toma como seller."""
+        pagina = MagicMock()
+        pagina.evaluate = AsyncMock(return_value=[_tarjeta_carrefour(vendidoPor="Carrefour")])
+
+        producto, = await SellersExternosService()._extraer_tarjetas_carrefour(pagina)
+
+        assert producto["vendidoPor"] == "No especificado"
+
+
+@pytest.mark.asyncio
+class TestFiltrarRecursos:
+    """Tests para los metodos _filtrar_recursos y _filtrar_recursos_listado (async)."""
+
+    @pytest.mark.parametrize("tipo,url,abortado", [
+        ("image", "https://www.carrefour.com.ar/x.jpg", True),
+        ("stylesheet", "https://www.carrefour.com.ar/x.css", True),
+        ("script", "https://www.googletagmanager.com/gtm.js", True),
+        ("document", "https://www.carrefour.com.ar/123?map=productClusterIds", False),
+        ("fetch", "https://www.carrefour.com.ar/api/io/_v/api/intelligent-search", False),
+    ])
+    async def test_aborta_recursos_pesados(self, tipo, url, abortado):
+        """Test que aborta por tipo de recurso o host de analytics y deja pasar el resto."""
+        route = MagicMock()
+        route.request.resource_type = tipo
+        route.request.url = url
+        route.abort = AsyncMock()
+        route.fallback = AsyncMock()
+
+        await SellersExternosService._filtrar_recursos(route)
+
+        assert route.abort.await_count == int(abortado)
+        assert route.fallback.await_count == int(not abortado)
+
+    @pytest.mark.parametrize("tipo,url,abortado", [
+        ("image", "https://www.oncity.com/x.jpg", True),
+        ("font", "https://www.oncity.com/x.woff2", True),
+        ("script", "https://connect.facebook.net/fbevents.js", True),
+        ("stylesheet", "https://www.oncity.com/x.css", False),
+        ("script", "https://www.oncity.com/x.js", False),
+    ])
+    async def test_listado_conserva_los_estilos(self, tipo, url, abortado):
+        """Test que el filtro de contexto de los listados aborta lo pesado pero deja pasar los estilos."""
+        route = MagicMock()
+        route.request.resource_type = tipo
+        route.request.url = url
+        route.abort = AsyncMock()
+        route.fallback = AsyncMock()
+
+        await SellersExternosService._filtrar_recursos_listado(route)
+
+        assert route.abort.await_count == int(abortado)
+        assert route.fallback.await_count == int(not abortado)
+
+
+class TestPreciosVectorizados:
+    """Tests para _precios_a_float y _calcular_descuentos."""
+
+    PRECIOS = ["$ 184.999", "$ 1.234,50", "$ 1,234.50", "$ 99.9", "12,5", "$ 1.000.000", None, "sin precio"]
+
+    def test_coincide_con_la_version_escalar(self):
+        """Test que la columna parseada coincide con _precio_texto_a_float valor por valor."""
+        resultado = SellersExternosService._precios_a_float(pd.Series(self.PRECIOS))
+
+        esperado = [SellersExternosService._precio_texto_a_float(p) for p in self.PRECIOS]
+        assert [None if pd.isna(v) else v for v in resultado] == esperado
+
+    def test_calcula_descuentos(self):
+        """Test que calcula el porcentaje solo cuando el precio original es mayor al final."""
+        originales = pd.Series(["$ 200.000", "$ 100", None, "$ 50"])
+        finales = pd.Series(["$ 150.000", "$ 100", "$ 10", "$ 0"])
+
+        descuentos = SellersExternosService._calcular_descuentos(originales, finales)
+
+        esperado = [
+            SellersExternosService._calcular_porcentaje_descuento(o, f) for o, f in zip(originales, finales)
+        ]
+        assert list(descuentos) == esperado == ["25%", None, None, None]
+
+
+class TestNormalizarPrecioTexto:
+    """Tests para el metodo _normalizar_precio_texto."""
+
+    def test_unifica_espacios(self):
+        """Test que reemplaza espacios no estandar y colapsa los repetidos."""
+        assert SellersExternosService._normalizar_precio_texto("\u00A0$\u202F 184.999  ") == "$ 184.999"
+        assert SellersExternosService._normalizar_precio_texto("") == ""
+        assert SellersExternosService._normalizar_precio_texto(None) is None
+
+    def test_textos_repetidos_salen_de_la_cache(self):
+        """Test que un mismo texto de precio se limpia una sola vez."""
+        SellersExternosService._normalizar_precio_texto.cache_clear()
+
+        for _ in range(3):
+            SellersExternosService._normalizar_precio_texto("$\u00A0499.999")
+
+        info = SellersExternosService._normalizar_precio_texto.cache_info()
+        assert (info.misses, info.hits) == (1, 2)
+
+
+class TestEscribirExcel:
+    """Tests para el metodo _escribir_excel."""
+
+    def test_une_cucardas_y_escribe_hoja(self, tmp_path):
+        """Test que escribe la hoja Productos con las cucardas unidas por |."""
+        ruta = tmp_path / "productos.xlsx"
+        df = pd.DataFrame([{"nombreProducto": "Heladera", "cucardas": ["Envio gratis", "3 cuotas"]}])
+
+        SellersExternosService._escribir_excel(df, str(ruta))
+
+        leido = pd.read_excel(ruta, sheet_name="Productos")
+        assert leido.loc[0, "cucardas"] == "Envio gratis|3 cuotas"
+
+
+
+@pytest.mark.asyncio
+class TestExcelEnCurso:
+    """Tests para el context manager _excel_en_curso (async)."""
+
+    async def test_escribe_productos_a_medida_que_llegan(self, tmp_path):
+        """Test que escribe los productos por lotes fila por fila, con vacios para los None."""
+        ruta = tmp_path / "productos.xlsx"
+
+        async with SellersExternosService._excel_en_curso(str(ruta)) as escribir:
+            escribir([{"nombreProducto": "Heladera", "precioComun": "$ 1.000", "cucardas": ("No tiene",), "ean": None}])
+            escribir([])
+            escribir([{"nombreProducto": "Lavarropas", "precioComun": None, "cucardas": ["A", "B"], "ean": "779"}])
+
+        leido = pd.read_excel(ruta, sheet_name="Productos", dtype=str)
+        assert list(leido.columns) == ["nombreProducto", "precioComun", "cucardas", "ean"]
+        assert list(leido["cucardas"]) == ["No tiene", "A|B"]
+        assert pd.isna(leido.loc[1, "precioComun"])
+        assert leido.loc[1, "ean"] == "779"
+
+    async def test_error_al_escribir_no_deja_archivo(self, tmp_path):
+        """Test que si falla la escritura no queda ni el archivo final ni el temporal."""
+        ruta = tmp_path / "productos.xlsx"
+
+        with pytest.raises(TypeError):
+            async with SellersExternosService._excel_en_curso(str(ruta)) as escribir:
+                escribir([{"ean": object()}])
+
+        assert list(tmp_path.iterdir()) == []
+
+    async def test_sin_productos_escribe_hoja_vacia(self, tmp_path):
+        """Test que sin productos igual genera el archivo con la hoja Productos."""
+        ruta = tmp_path / "productos.xlsx"
+
+        async with SellersExternosService._excel_en_curso(str(ruta)):
+            pass
+
+        assert pd.read_excel(ruta, sheet_name="Productos").empty
+
+
+@pytest.mark.asyncio
+class TestProgresoAgrupado:
+    """Tests para el guardado agrupado de progreso y logs (async)."""
+
+    @pytest.mark.django_db(transaction=True)
+    async def test_guarda_progreso_cada_n_items(self, tarea_catalogacion):
+        """Test que el progreso se guarda recien al acumular FLUSH_CADA_ITEMS items."""
+        servicio = SellersExternosService()
+
+        for _ in range(servicio.FLUSH_CADA_ITEMS - 1):
+            await servicio._incrementar_progreso(tarea_catalogacion)
+        await sync_to_async(tarea_catalogacion.refresh_from_db)()
+        assert tarea_catalogacion.progreso_actual == 0
+
+        await servicio._incrementar_progreso(tarea_catalogacion)
+        await sync_to_async(tarea_catalogacion.refresh_from_db)()
+        assert tarea_catalogacion.progreso_actual == servicio.FLUSH_CADA_ITEMS
+
+    @pytest.mark.django_db(transaction=True)
+    async def test_set_estado_persiste_logs_pendientes(self, tarea_catalogacion):
+        """Test que los logs encolados se escriben en un solo lote antes de cambiar de estado."""
+        servicio = SellersExternosService()
+
+        await servicio._log(tarea_catalogacion, "uno")
+        await servicio._log(tarea_catalogacion, "dos")
+        await servicio._set_estado(tarea_catalogacion, TareaCatalogacion.Estado.COMPLETADO)
+        await servicio._detener_logs()
+
+        await sync_to_async(tarea_catalogacion.refresh_from_db)()
+        assert tarea_catalogacion.logs == "uno\ndos"
+        assert tarea_catalogacion.estado == TareaCatalogacion.Estado.COMPLETADO
+
+    @pytest.mark.django_db(transaction=True)
+    async def test_guardar_archivo(self, tarea_catalogacion):
+        """Test que el archivo resultado se guarda con un UPDATE directo."""
+        await SellersExternosService()._guardar_archivo(tarea_catalogacion, "catalogacion/x.xlsx")
+
+        await sync_to_async(tarea_catalogacion.refresh_from_db)()
+        assert tarea_catalogacion.archivo_resultado.name == "catalogacion/x.xlsx"
+
+
+@pytest.mark.asyncio
+class TestExtraerTarjetasFravega:
+    """Tests para el metodo _extraer_tarjetas_fravega (async)."""
+
+    async def test_extrae_todas_las_tarjetas_en_una_llamada(self):
+        """Test que hace un solo evaluate por pagina y normaliza los campos."""
+        pagina = MagicMock()
+        pagina.evaluate = AsyncMock(return_value=[_tarjeta_fravega()])
+
+        productos = await SellersExternosService()._extraer_tarjetas_fravega(pagina, 1)
+
+        pagina.evaluate.assert_awaited_once_with(FRAVEGA_TARJETAS_JS, FRAVEGA_SELECTOR_TARJETA)
+        assert productos == [{
+            "nombreProducto": "Lavarropas",
+            "precioComun": "$ 499.999",
+            "precioTachado": "$ 600.000",
+            "descuento": "16%",
+            "urlProducto": "https://www.fravega.com/p/lavarropas-x/",
+            "cucardas": ("No tiene",),
+            "vendidoPor": "Tienda X",
+            "urlImagen": "https://img/x.jpg",
+            "arbolCategorias": None,
+            "ean": None,
+        }]
+
+    async def test_campos_faltantes_usan_valores_por_defecto(self):
+        """Test que los campos ausentes caen en los mismos valores que antes."""
+        pagina = MagicMock()
+        pagina.evaluate = AsyncMock(return_value=[_tarjeta_fravega(
+            precioComun=None, descuento=None, urlRelativa=None,
+            vendidoPor=None, nombre=None, urlImagen=None,
+        )])
+
+        producto, = await SellersExternosService()._extraer_tarjetas_fravega(pagina, 1)
+
+        assert producto["precioComun"] is None
+        assert producto["descuento"] is None
+        assert producto["urlProducto"] is None
+        assert producto["vendidoPor"] == "No especificado"
+        assert producto["nombreProducto"] == "Sin nombre"
+
+    async def test_seller_sin_la_frase_se_toma_completo(self):
+        """Test que un texto de seller sin "Vendido por" se usa tal cual."""
+        pagina = MagicMock()
+        pagina.evaluate = AsyncMock(return_value=[_tarjeta_fravega(vendidoPor=" Fravega ")])
+
+        producto, = await SellersExternosService()._extraer_tarjetas_fravega(pagina, 1)
+
+        assert producto["vendidoPor"] == "Fravega"
+
+
+@pytest.mark.asyncio
+class TestEnriquecerProductoFravega:
+    """Tests para el metodo _enriquecer_producto_fravega (async)."""
+
+    @staticmethod
+    def _pagina(breadcrumb):
+        pagina = MagicMock()
+        pagina.goto = AsyncMock()
+        pagina.wait_for_load_state = AsyncMock()
+        pagina.evaluate = AsyncMock(return_value=breadcrumb)
+        return pagina
+
+    async def test_lee_el_breadcrumb_en_una_llamada(self):
+        """Test que el arbol de categorias sale de un solo evaluate."""
+        pagina = self._pagina(["Heladeras", "No Frost"])
+
+        resultado = await SellersExternosService()._enriquecer_producto_fravega(pagina, "https://x/p", 1)
+
+        pagina.evaluate.assert_awaited_once_with(FRAVEGA_BREADCRUMB_JS)
+        assert resultado == ("Heladeras|No Frost", None)
+
+    async def test_sin_breadcrumb_devuelve_arbol_vacio(self):
+        """Test que una ficha sin breadcrumb deja el arbol en None."""
+        resultado = await SellersExternosService()._enriquecer_producto_fravega(self._pagina([]), "https://x/p", 1)
+
+        assert resultado == (None, None)
+
+
+class TestMapearProductoMegatone:
+    """Tests para el metodo _mapear_producto_megatone."""
+
+    def test_mapea_precios_marca_y_plaquetas(self):
+        """Test que arma el producto con precios formateados, descuento y cucardas."""
+        producto = {
+            "Nombre": "Heladera",
+            "Precios": {"WEB": {"Promocional": 184999.0, "Lista": 250000.0, "PorcentajeOFF": 26.4}},
+            "URL": "/producto/heladera",
+            "Imagen": "https://img/x.jpg",
+            "Marca": {"Descripcion": "Tienda X"},
+            "Plaquetas": [{"Nombre": "Envio gratis"}],
+        }
+
+        assert SellersExternosService._mapear_producto_megatone(producto, "seller") == {
+            "nombreProducto": "Heladera",
+            "precioComun": "$ 184.999",
+            "precioTachado": "$ 250.000",
+            "descuento": "26%",
+            "urlProducto": "https://www.megatone.net/producto/heladera",
+            "cucardas": ["Envio gratis"],
+            "vendidoPor": "Tienda X",
+            "urlImagen": "https://img/x.jpg",
+            "arbolCategorias": None,
+            "ean": None,
+        }
+
+    def test_campos_faltantes_usan_valores_por_defecto(self):
+        """Test que sin precios, marca ni plaquetas usa el seller y SIN_CUCARDAS."""
+        producto = SellersExternosService._mapear_producto_megatone({"Plaquetas": []}, "seller")
+
+        assert producto["nombreProducto"] == "Sin nombre"
+        assert producto["nombreProducto"] is SIN_NOMBRE
+        assert producto["precioComun"] is None
+        assert producto["urlProducto"] is None
+        assert producto["vendidoPor"] == "seller"
+        assert producto["cucardas"] == ("No tiene",)
+
+
+class TestCucardasMegatone:
+    """Tests para el metodo _cucardas_megatone."""
+
+    def test_plaquetas_como_dict(self):
+        """Test que usa Nombre/Descripcion/Texto o la clave, y conserva el orden con los textos sueltos."""
+        plaquetas = {
+            "envio": {"Nombre": "Envio gratis"},
+            "cuotas": {"Texto": "12 cuotas"},
+            "suelta": "Oferta",
+            "vacia": "",
+            "sin_nombre": {},
+        }
+
+        assert SellersExternosService._cucardas_megatone(plaquetas) == [
+            "Envio gratis", "12 cuotas", "Oferta", "sin_nombre",
+        ]
+
+    def test_plaquetas_como_lista(self):
+        """Test que descarta las plaquetas sin nombre y los valores que no son texto."""
+        plaquetas = [{"Descripcion": "Envio gratis"}, {}, "Oferta", "", 3]
+
+        assert SellersExternosService._cucardas_megatone(plaquetas) == ["Envio gratis", "Oferta"]
+
+
+@pytest.mark.asyncio
+class TestEnriquecerProductoMegatone:
+    """Tests para el metodo _enriquecer_producto_megatone (async)."""
+
+    async def test_lee_sku_y_categorias_en_una_llamada(self):
+        """Test que SKU y categorias salen de un solo evaluate y se deduplican en orden."""
+        pagina = MagicMock()
+        pagina.goto = AsyncMock()
+        pagina.wait_for_load_state = AsyncMock()
+        pagina.evaluate = AsyncMock(return_value={
+            "sku": "7791234", "categorias": ["Hogar", "Heladeras", "Hogar"],
+        })
+
+        resultado = await SellersExternosService()._enriquecer_producto_megatone(pagina, "https://x/p", 1)
+
+        pagina.goto.assert_awaited_once_with("https://x/p", wait_until="domcontentloaded", timeout=30000)
+        pagina.evaluate.assert_awaited_once_with(MEGATONE_FICHA_JS, MEGATONE_SELECTOR_CATEGORIAS)
+        assert resultado == ("Hogar|Heladeras", "7791234")
+
+    async def test_error_de_navegacion_devuelve_none(self):
+        """Test que si la ficha no abre el producto queda sin enriquecer."""
+        pagina = MagicMock()
+        pagina.goto = AsyncMock(side_effect=RuntimeError("timeout"))
+
+        assert await SellersExternosService()._enriquecer_producto_megatone(pagina, "https://x/p", 1) is None
+
+
+class TestDatosTarjetaProvincia:
+    """Tests para el metodo _datos_tarjeta_provincia."""
+
+    @staticmethod
+    def _tarjeta(**campos):
+        tarjeta = {"precioTachado": None, "tag": None, "descuentos": [None, None, None], "cucardas": []}
+        tarjeta.update(campos)
+        return tarjeta
+
+    def test_descuento_del_tag_y_cucardas(self):
+        """Test que normaliza el precio tachado, toma el descuento del tag y conserva las cucardas."""
+        tarjeta = self._tarjeta(precioTachado="$\u00A0250.000", tag="-26% OFF", cucardas=["Envio gratis"])
+
+        assert SellersExternosService._datos_tarjeta_provincia(tarjeta, "$ 184.999") == (
+            "$ 250.000", "26%", ["Envio gratis"],
+        )
+
+    def test_sin_tag_usa_los_descuentos_alternativos_en_orden(self):
+        """Test que sin tag toma el primer elemento alternativo con un porcentaje."""
+        tarjeta = self._tarjeta(descuentos=["Nuevo", "15% off", "30%"])
+
+        assert SellersExternosService._datos_tarjeta_provincia(tarjeta, None) == (None, "15%", ("No tiene",))
+
+    def test_sin_descuento_lo_calcula_con_los_precios(self):
+        """Test que si la tarjeta no informa descuento se calcula desde precio tachado y comun."""
+        tarjeta = self._tarjeta(precioTachado="$ 200.000", tag="Envio gratis")
+
+        _, descuento, _ = SellersExternosService._datos_tarjeta_provincia(tarjeta, "$ 150.000")
+
+        assert descuento == SellersExternosService._calcular_porcentaje_descuento("$ 200.000", "$ 150.000")
+        assert descuento is not None
+
+
+class TestJsonLd:
+    """Tests para _item_list_json_ld y _ean_json_ld."""
+
+    def test_item_list_saltea_invalidos_y_otros_tipos(self):
+        """Test que devuelve los itemListElement del primer ItemList valido."""
+        textos = [
+            "{no es json",
+            orjson.dumps([{"@type": "ItemList"}]).decode(),
+            orjson.dumps({"@type": "Organization"}).decode(),
+            orjson.dumps({"@type": "ItemList", "itemListElement": [{"item": {"name": "A"}}]}).decode(),
+        ]
+
+        assert SellersExternosService._item_list_json_ld(textos) == [{"item": {"name": "A"}}]
+        assert SellersExternosService._item_list_json_ld([]) == []
+
+    def test_ean_en_orden_de_preferencia(self):
+        """Test que toma gtin13, gtin, ean, mpn o sku del Product, en ese orden."""
+        producto = {"@type": "Product", "sku": "123", "mpn": "M-1"}
+
+        assert SellersExternosService._ean_json_ld([orjson.dumps(producto).decode()]) == "M-1"
+        assert SellersExternosService._ean_json_ld([orjson.dumps({"@type": "Product"}).decode()]) is None
+        assert SellersExternosService._ean_json_ld(["{no es json"]) is None
+
+
+@pytest.mark.asyncio
+class TestEnriquecerProductoVtex:
+    """Tests para _enriquecer_producto_oncity y _enriquecer_producto_provincia (async)."""
+
+    @staticmethod
+    def _pagina(categorias, ean):
+        json_ld = [orjson.dumps({"@type": "Product", "gtin13": ean}).decode()]
+        pagina = MagicMock()
+        pagina.goto = AsyncMock()
+        pagina.evaluate = AsyncMock(return_value={"categorias": categorias, "jsonLd": json_ld})
+        return pagina
+
+    async def test_lee_breadcrumb_sin_inicio_y_ean_en_una_llamada(self):
+        """Test que breadcrumb y EAN salen de un solo evaluate y el arbol no incluye el inicio."""
+        pagina = self._pagina(["Inicio", "Hogar", "Heladeras"], "7791234567890")
+
+        resultado = await SellersExternosService()._enriquecer_producto_oncity(pagina, "https://x/p", 1)
+
+        pagina.evaluate.assert_awaited_once_with(VTEX_FICHA_JS, ONCITY_SELECTOR_BREADCRUMB)
+        assert resultado == ("Hogar|Heladeras", "7791234567890")
+
+    async def test_provincia_ignora_el_nombre_del_sitio(self):
+        """Test que en Provincia el link a la home del sitio no forma parte del arbol."""
+        pagina = self._pagina(["Provincia Compras", "Hogar"], None)
+
+        resultado = await SellersExternosService()._enriquecer_producto_provincia(pagina, "https://x/p", 1)
+
+        assert resultado == ("Hogar", None)
+
+    async def test_error_de_navegacion_devuelve_none(self):
+        """Test que si la ficha no abre el producto queda sin enriquecer."""
+        pagina = self._pagina([], None)
+        pagina.goto.side_effect = RuntimeError("timeout")
+
+        assert await SellersExternosService()._enriquecer_producto_oncity(pagina, "https://x/p", 1) is None
+
+
+@pytest.mark.asyncio
+class TestEsperarListadoMegatone:
+    """Tests para el metodo _esperar_listado_megatone (async)."""
+
+    async def test_espera_que_cambie_global_listado(self):
+        """Test que espera con wait_for_function en lugar de un tiempo fijo."""
+        pagina = MagicMock()
+        pagina.wait_for_function = AsyncMock()
+
+        await SellersExternosService._esperar_listado_megatone(pagina)
+
+        pagina.wait_for_function.assert_awaited_once_with(MEGATONE_LISTADO_NUEVO_JS, timeout=15000)
+
+    async def test_timeout_no_es_error(self):
+        """Test que si el listado no cambia se sigue y se lee lo que haya."""
+        pagina = MagicMock()
+        pagina.wait_for_function = AsyncMock(side_effect=PlaywrightTimeoutError("timeout"))
+
+        await SellersExternosService._esperar_listado_megatone(pagina)
+
+
+@pytest.mark.asyncio
+class TestAbrirContextoPersistente:
+    """Tests para el metodo _abrir_contexto_persistente (async)."""
+
+    @staticmethod
+    def _playwright():
+        """Helper con un launch_persistent_context mock que devuelve un contexto nuevo por llamada."""
+        pw = MagicMock()
+        pw.chromium.launch_persistent_context = AsyncMock(side_effect=lambda **kwargs: MagicMock())
+        return pw
+
+    async def test_perfil_en_media_root_sin_service_workers(self, settings, tmp_path):
+        """Test que el perfil queda en MEDIA_ROOT y los service workers se bloquean."""
+        settings.MEDIA_ROOT = str(tmp_path)
+        pw = self._playwright()
+
+        contexto = await SellersExternosService()._abrir_contexto_persistente(pw, "oncity", True)
+        contexto.on.call_args.args[1](contexto)
+
+        kwargs = pw.chromium.launch_persistent_context.await_args.kwargs
+        assert kwargs["user_data_dir"] == str(tmp_path / ".pw-cache-oncity-0")
+        assert kwargs["service_workers"] == "block"
+
+    async def test_aperturas_simultaneas_usan_perfiles_distintos(self, settings, tmp_path):
+        """Test que dos contextos abiertos a la vez del mismo sitio no comparten el perfil."""
+        settings.MEDIA_ROOT = str(tmp_path)
+        pw = self._playwright()
+        servicio = SellersExternosService()
+
+        primero, segundo = await asyncio.gather(
+            servicio._abrir_contexto_persistente(pw, "fravega", True),
+            servicio._abrir_contexto_persistente(pw, "fravega", True),
+        )
+
+        rutas = [c.kwargs["user_data_dir"] for c in pw.chromium.launch_persistent_context.await_args_list]
+        assert len(set(rutas)) == 2
+
+        # Al cerrarse el primero su perfil vuelve a quedar libre
+        evento, liberar = primero.on.call_args.args
+        assert evento == "close"
+        liberar(primero)
+        tercero = await servicio._abrir_contexto_persistente(pw, "fravega", True)
+        assert pw.chromium.launch_persistent_context.await_args.kwargs["user_data_dir"] == rutas[0]
+        for contexto in (segundo, tercero):
+            contexto.on.call_args.args[1](contexto)
+
+
+class TestRutasSalida:
+    """Tests para el metodo _rutas_salida."""
+
+    def test_arma_ruta_absoluta_y_relativa(self, settings, tmp_path):
+        """Test que crea la carpeta de salida y devuelve ambas rutas con el mismo nombre."""
+        settings.MEDIA_ROOT = str(tmp_path)
+
+        ruta_final, ruta_relativa = SellersExternosService._rutas_salida("ProductosMarketPlace-Oncity")
+
+        assert (tmp_path / "catalogacion").is_dir()
+        assert ruta_relativa.startswith("catalogacion/ProductosMarketPlace-Oncity-")
+        assert ruta_relativa.endswith(".xlsx")
+        assert ruta_final == str(tmp_path / ruta_relativa)
+
+
+class TestCacheEan:
+    """Tests para _cargar_cache_ean y _guardar_cache_ean."""
+
+    def test_guarda_solo_entradas_con_ean(self, settings, tmp_path):
+        """Test que persiste las URLs con EAN y las vuelve a leer como tuplas."""
+        settings.MEDIA_ROOT = str(tmp_path)
+        SellersExternosService._guardar_cache_ean({
+            "https://www.carrefour.com.ar/a/p": ("Electro|Heladeras", "7791234567890"),
+            "https://www.carrefour.com.ar/b/p": ("Electro", None),
+        })
+
+        assert SellersExternosService._cargar_cache_ean() == {
+            "https://www.carrefour.com.ar/a/p": ("Electro|Heladeras", "7791234567890"),
+        }
+
+    def test_sin_archivo_o_invalido_devuelve_vacio(self, settings, tmp_path):
+        """Test que una cache inexistente o corrupta se ignora."""
+        settings.MEDIA_ROOT = str(tmp_path)
+        assert SellersExternosService._cargar_cache_ean() == {}
+
+        (tmp_path / ".ean-cache.json").write_text("{no es json")
+        assert SellersExternosService._cargar_cache_ean() == {}
+
+    def test_escritores_simultaneos_usan_temporales_distintos(self, tmp_path):
+        """Test que dos escrituras abiertas a la vez no comparten temporal y ambas terminan."""
+        ruta = str(tmp_path / ".ean-cache.json")
+
+        with SellersExternosService._archivo_atomico(ruta) as primero:
+            with SellersExternosService._archivo_atomico(ruta) as segundo:
+                assert primero.name != segundo.name
+                segundo.write(b"segundo")
+            primero.write(b"primero")
+
+        assert (tmp_path / ".ean-cache.json").read_bytes() == b"primero"
+        assert [p.name for p in tmp_path.iterdir()] == [".ean-cache.json"]
+
+    def test_error_de_escritura_borra_el_temporal(self, tmp_path):
+        """Test que si falla la escritura no queda el temporal ni se crea el destino."""
+        ruta = str(tmp_path / ".ean-cache.json")
+
+        with pytest.raises(OSError):
+            with SellersExternosService._archivo_atomico(ruta):
+                raise OSError("disco lleno")
+
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestVolcadoCarrefour:
+    """Tests para _volcar_productos y _leer_volcado."""
+
+    def test_ida_y_vuelta_conserva_textos_y_cucardas(self, tmp_path):
+        """Test que el CSV temporal conserva EANs como texto, vacios como NaN y cucardas como lista."""
+        ruta = tmp_path / "volcado.csv"
+        producto = SellersExternosService._mapear_producto_api_carrefour(_producto_api(precio_lista=None))
+        producto["ean"] = "0791234567890"
+        urls = {}
+
+        with open(ruta, "w", newline="", encoding="utf-8") as archivo:
+            volcado = csv.DictWriter(archivo, fieldnames=CAMPOS_PRODUCTO_CARREFOUR)
+            volcado.writeheader()
+            SellersExternosService._volcar_productos(volcado, [producto, {**producto, "urlProducto": None}], urls)
+
+        df = SellersExternosService._leer_volcado(str(ruta))
+
+        assert list(urls) == ["https://www.carrefour.com.ar/heladera-x/p"]
+        assert df.loc[0, "ean"] == "0791234567890"
+        assert df.loc[0, "cucardas"] == ["Envio gratis"]
+        assert pd.isna(df.loc[0, "precioTachado"])
+        assert pd.isna(df.loc[1, "urlProducto"])
+
+    def test_generar_excel_suma_enriquecimiento(self, tmp_path):
+        """Test que el Excel final cruza el volcado con arbol y EAN por URL."""
+        ruta = tmp_path / "volcado.csv"
+        producto = SellersExternosService._mapear_producto_api_carrefour(_producto_api())
+        with open(ruta, "w", newline="", encoding="utf-8") as archivo:
+            volcado = csv.DictWriter(archivo, fieldnames=CAMPOS_PRODUCTO_CARREFOUR)
+            volcado.writeheader()
+            SellersExternosService._volcar_productos(volcado, [producto], {})
+        ruta_excel = tmp_path / "salida.xlsx"
+
+        SellersExternosService._generar_excel_carrefour(
+            str(ruta), {producto["urlProducto"]: ("Heladeras", "0791234567890")}, str(ruta_excel)
+        )
+
+        df = pd.read_excel(ruta_excel, dtype=str)
+        assert df.loc[0, "arbolCategorias"] == "Heladeras"
+        assert df.loc[0, "ean"] == "0791234567890"
+        assert "descuento" in df.columns
+
+
+class TestPrecioTextoAFloat:
+    """Tests para el metodo _precio_texto_a_float."""
+
+    @pytest.mark.parametrize("texto,esperado", [
+        ("$ 184.999", 184999.0),
+        ("$ 1.000.000", 1000000.0),
+        ("500", 500.0),
+        ("$ 99.9", 99.9),
+        ("$ 1.234,50", 1234.5),
+        ("$ 1,234.50", 1234.5),
+        ("", None),
+    ])
+    def test_formatos(self, texto, esperado):
+        """Test que interpreta miles y decimales en los formatos que publican los sitios."""
+        assert SellersExternosService._precio_texto_a_float(texto) == esperado
+
+
+class TestArbolYEanDesdeApi:
+    """Tests para el metodo _arbol_y_ean_desde_api."""
+
+    def test_toma_primera_categoria_y_ean_del_item(self):
+        """Test que arma el arbol con la categoria mas especifica y lee el EAN del primer item."""
+        producto = {
+            "categories": ["/Electro/Heladeras/Con freezer/", "/Electro/Heladeras/", "/Electro/"],
+            "items": [{"ean": "7791234567890"}],
+        }
+
+        assert SellersExternosService._arbol_y_ean_desde_api(producto) == (
+            "Electro|Heladeras|Con freezer", "7791234567890",
+        )
+
+    def test_ean_desde_especificacion_y_sin_categorias(self):
+        """Test que usa la especificacion EAN si el item no lo tiene."""
+        producto = {"items": [{"ean": ""}], "EAN": ["7790000000001"]}
+
+        assert SellersExternosService._arbol_y_ean_desde_api(producto) == (None, "7790000000001")
+
+
+@pytest.mark.asyncio
+class TestEnriquecerProductoCarrefourApi:
+    """Tests para el metodo _enriquecer_producto_carrefour_api (async)."""
+
+    async def test_consulta_por_path_de_la_ficha(self):
+        """Test que arma la consulta con el path de la URL del producto."""
+        respuesta = MagicMock(ok=True)
+        respuesta.json = AsyncMock(return_value=[{"categories": ["/Electro/"], "items": [{"ean": "1"}]}])
+        contexto = MagicMock()
+        contexto.request.get = AsyncMock(return_value=respuesta)
+
+        resultado = await SellersExternosService()._enriquecer_producto_carrefour_api(
+            contexto, "https://www.carrefour.com.ar/heladera-x/p"
+        )
+
+        assert resultado == ("Electro", "1")
+        contexto.request.get.assert_awaited_once_with(
+            "https://www.carrefour.com.ar/api/catalog_system/pub/products/search/heladera-x/p"
+        )
+
+    async def test_sin_resultados_devuelve_none(self):
+        """Test que una busqueda vacia indica que hay que abrir la ficha."""
+        respuesta = MagicMock(ok=True)
+        respuesta.json = AsyncMock(return_value=[])
+        contexto = MagicMock()
+        contexto.request.get = AsyncMock(return_value=respuesta)
+
+        assert await SellersExternosService()._enriquecer_producto_carrefour_api(
+            contexto, "https://www.carrefour.com.ar/heladera-x/p"
+        ) is None
+
+
+@pytest.mark.asyncio
+class TestEjecutarNoCarrefour:
+    """Tests para el metodo ejecutar_no_carrefour (async)."""
+
+    @staticmethod
+    def _playwright_falso():
+        """Helper para reemplazar async_playwright() por un context manager con un navegador mock."""
+        navegador = MagicMock()
+        navegador.close = AsyncMock()
+        pw = MagicMock()
+        pw.chromium.launch = AsyncMock(return_value=navegador)
+        gestor = MagicMock()
+        gestor.__aenter__ = AsyncMock(return_value=pw)
+        gestor.__aexit__ = AsyncMock(return_value=False)
+        return MagicMock(return_value=gestor), navegador
+
+    @pytest.mark.django_db(transaction=True)
+    async def test_un_seller_con_error_no_corta_los_demas(self, tarea_catalogacion):
+        """Test que los sellers corren en paralelo y un error deja la tarea en ERROR."""
+        servicio = SellersExternosService()
+        async_playwright_falso, navegador = self._playwright_falso()
+        servicio._buscar_megatone = AsyncMock(side_effect=RuntimeError("sin conexion"))
+        servicio._buscar_provincia = AsyncMock()
+
+        with patch("core.services.SellersExternosService.async_playwright", async_playwright_falso):
+            await servicio.ejecutar_no_carrefour(
+                tarea_catalogacion, {"Megatone": ["a"], "Provincia": ["b", "c"]}
+            )
+
+        servicio._buscar_provincia.assert_awaited_once_with(tarea_catalogacion, ["b", "c"], navegador)
+        navegador.close.assert_awaited_once()
+        await sync_to_async(tarea_catalogacion.refresh_from_db)()
+        assert tarea_catalogacion.estado == TareaCatalogacion.Estado.ERROR
+        assert tarea_catalogacion.progreso_total == 3
+        assert "ERROR en Megatone: sin conexion" in tarea_catalogacion.logs
+
+    @pytest.mark.django_db(transaction=True)
+    async def test_sin_provincia_no_lanza_el_navegador_comun(self, tarea_catalogacion):
+        """Test que Megatone y Oncity usan sus perfiles persistentes sin el navegador comun."""
+        servicio = SellersExternosService()
+        async_playwright_falso, _ = self._playwright_falso()
+        pw = async_playwright_falso.return_value.__aenter__.return_value
+        servicio._buscar_megatone = AsyncMock()
+        servicio._buscar_oncity = AsyncMock()
+
+        with patch("core.services.SellersExternosService.async_playwright", async_playwright_falso):
+            await servicio.ejecutar_no_carrefour(tarea_catalogacion, {"Megatone": ["a"], "Oncity": ["b"]})
+
+        pw.chromium.launch.assert_not_awaited()
+        servicio._buscar_megatone.assert_awaited_once_with(tarea_catalogacion, ["a"], pw, True)
+        servicio._buscar_oncity.assert_awaited_once_with(tarea_catalogacion, ["b"], pw, True)
+        await sync_to_async(tarea_catalogacion.refresh_from_db)()
+        assert tarea_catalogacion.estado == TareaCatalogacion.Estado.COMPLETADO
+
+
+@pytest.mark.asyncio
+class TestCierreDeContextos:
+    """Tests para el cierre de contextos de cada sitio ante errores."""
+
+    @pytest.mark.parametrize("sitio", ["fravega", "megatone", "oncity", "provincia"])
+    async def test_cierra_el_contexto_si_el_sitio_falla(self, sitio, settings, tmp_path):
+        """Test que si el sitio falla a mitad de camino su contexto igual se cierra."""
+        settings.MEDIA_ROOT = str(tmp_path)
+        servicio = SellersExternosService()
+        servicio._log = AsyncMock()
+        pagina = MagicMock(goto=AsyncMock(side_effect=RuntimeError("sin conexion")))
+        contexto = MagicMock(pages=[pagina], route=AsyncMock(), close=AsyncMock())
+        contexto.new_page = AsyncMock(return_value=pagina)
+        servicio._abrir_contexto_persistente = AsyncMock(return_value=contexto)
+        navegador = MagicMock(new_context=AsyncMock(return_value=contexto))
+
+        with pytest.raises(RuntimeError):
+            if sitio == "provincia":
+                await servicio._buscar_provincia(MagicMock(), ["a"], navegador)
+            else:
+                await getattr(servicio, f"_buscar_{sitio}")(MagicMock(), ["a"], MagicMock())
+
+        contexto.close.assert_awaited_once()
+
+    async def test_carrefour_cierra_el_contexto_si_falla(self, settings, tmp_path):
+        """Test que si Carrefour falla a mitad de camino su contexto igual se cierra y la tarea queda en ERROR."""
+        settings.MEDIA_ROOT = str(tmp_path)
+        servicio = SellersExternosService()
+        for metodo in ("_log", "_set_estado", "_set_progreso", "_detener_logs", "_preparar_contexto_carrefour"):
+            setattr(servicio, metodo, AsyncMock())
+        pagina = MagicMock(goto=AsyncMock(side_effect=RuntimeError("sin conexion")))
+        contexto = MagicMock(pages=[pagina], close=AsyncMock())
+        servicio._abrir_contexto_persistente = AsyncMock(return_value=contexto)
+
+        with patch("core.services.SellersExternosService.async_playwright") as playwright:
+            playwright.return_value.__aenter__ = AsyncMock()
+            playwright.return_value.__aexit__ = AsyncMock(return_value=False)
+            await servicio.ejecutar_carrefour(MagicMock(), ["123"])
+
+        contexto.close.assert_awaited_once()
+        servicio._set_estado.assert_awaited_with(ANY, TareaCatalogacion.Estado.ERROR)
+        assert list(tmp_path.rglob("carrefour-*.csv")) == []
+
+
+@pytest.mark.asyncio
+class TestEnriquecerEnParalelo:
+    """Tests para el metodo _enriquecer_en_paralelo (async)."""
+
+    async def test_reparte_las_fichas_en_el_pool_de_paginas(self):
+        """Test que no abre mas de MAX_PARALLEL_PAGES fichas a la vez y asigna los resultados."""
+        servicio = SellersExternosService()
+        servicio._incrementar_progreso = AsyncMock()
+        paginas = []
+
+        def nueva_pagina():
+            paginas.append(MagicMock(route=AsyncMock()))
+            return paginas[-1]
+
+        contexto = MagicMock()
+        contexto.new_page = AsyncMock(side_effect=nueva_pagina)
+        abiertas = 0
+        maximo = 0
+
+        async def enriquecer(pagina, url, idx):
+            nonlocal abiertas, maximo
+            abiertas += 1
+            maximo = max(maximo, abiertas)
+            await asyncio.sleep(0)
+            abiertas -= 1
+            return f"Cat|{idx}", None if url.endswith("sin-ean") else f"ean-{idx}"
+
+        productos = [
+            {"urlProducto": f"https://x/{i}", "arbolCategorias": None, "ean": None} for i in range(10)
+        ]
+        productos.append({"urlProducto": "https://x/sin-ean", "arbolCategorias": None, "ean": "sku-listado"})
+        escritos = []
+
+        await servicio._enriquecer_en_paralelo("tarea", contexto, _cola(productos), enriquecer, escritos.extend)
+
+        assert len(paginas) == servicio.MAX_PARALLEL_PAGES
+        for pagina in paginas:
+            pagina.route.assert_awaited_once_with("**/*", servicio._filtrar_recursos)
+        assert maximo == servicio.MAX_PARALLEL_PAGES
+        assert productos[0] == {"urlProducto": "https://x/0", "arbolCategorias": "Cat|1", "ean": "ean-1"}
+        assert productos[-1]["arbolCategorias"] == "Cat|11"
+        assert productos[-1]["ean"] == "sku-listado"
+        assert _progreso_sumado(servicio._incrementar_progreso) == len(productos)
+        assert sorted(escritos, key=productos.index) == productos
+
+    async def test_sin_url_o_sin_resultado_el_producto_queda_igual(self):
+        """Test que los productos sin URL no se abren y los que fallan conservan sus valores."""
+        servicio = SellersExternosService()
+        servicio._incrementar_progreso = AsyncMock()
+        contexto = MagicMock()
+        contexto.new_page = AsyncMock(side_effect=lambda: MagicMock(route=AsyncMock()))
+        enriquecer = AsyncMock(return_value=None)
+        productos = [
+            {"urlProducto": None, "arbolCategorias": None, "ean": None},
+            {"urlProducto": "https://x/1", "arbolCategorias": None, "ean": None},
+        ]
+        escritos = []
+
+        await servicio._enriquecer_en_paralelo("tarea", contexto, _cola(productos), enriquecer, escritos.extend)
+
+        enriquecer.assert_awaited_once()
+        assert enriquecer.await_args.args[1:] == ("https://x/1", 1)
+        assert productos[1] == {"urlProducto": "https://x/1", "arbolCategorias": None, "ean": None}
+        assert _progreso_sumado(servicio._incrementar_progreso) == 2
+        assert escritos == productos
+
+    async def test_url_repetida_se_abre_una_vez(self):
+        """Test que los productos con la misma URL comparten una sola apertura de la ficha."""
+        servicio = SellersExternosService()
+        servicio._incrementar_progreso = AsyncMock()
+        contexto = MagicMock()
+        contexto.new_page = AsyncMock(side_effect=lambda: MagicMock(route=AsyncMock()))
+        enriquecer = AsyncMock(return_value=("Cat", "779"))
+        productos = [
+            {"urlProducto": "https://x/1", "vendidoPor": "A", "arbolCategorias": None, "ean": None},
+            {"urlProducto": "https://x/1", "vendidoPor": "B", "arbolCategorias": None, "ean": None},
+        ]
+        escritos = []
+
+        await servicio._enriquecer_en_paralelo("tarea", contexto, _cola(productos), enriquecer, escritos.extend)
+
+        enriquecer.assert_awaited_once()
+        assert [(p["arbolCategorias"], p["ean"]) for p in productos] == [("Cat", "779")] * 2
+        servicio._incrementar_progreso.assert_awaited_once_with("tarea", 2)
+        assert escritos == productos
+
+
+@pytest.mark.asyncio
+class TestEnriquecimientoEnCurso:
+    """Tests para el context manager _enriquecimiento_en_curso (async)."""
+
+    @staticmethod
+    def _servicio():
+        servicio = SellersExternosService()
+        servicio._incrementar_progreso = AsyncMock()
+        servicio._sumar_total = AsyncMock()
+        return servicio
+
+    @staticmethod
+    def _contexto():
+        contexto = MagicMock()
+        contexto.new_page = AsyncMock(side_effect=lambda: MagicMock(route=AsyncMock()))
+        return contexto
+
+    async def test_enriquece_mientras_se_encolan_productos(self):
+        """Test que las fichas se abren antes de salir del bloque y suman el total por lote."""
+        servicio = self._servicio()
+        enriquecer = AsyncMock(return_value=("Cat", "779"))
+        primero = {"urlProducto": "https://x/1", "arbolCategorias": None, "ean": None}
+        repetido = {"urlProducto": "https://x/1", "arbolCategorias": None, "ean": None}
+        escritos = []
+
+        async with servicio._enriquecimiento_en_curso(
+            "tarea", self._contexto(), enriquecer, escritos.extend
+        ) as encolar:
+            await encolar([primero])
+            for _ in range(5):
+                await asyncio.sleep(0)
+            assert primero["ean"] == "779"
+            assert escritos == [primero]
+            await encolar([repetido])
+
+        enriquecer.assert_awaited_once()
+        assert repetido["ean"] == "779"
+        assert escritos == [primero, repetido]
+        assert [c.args[1] for c in servicio._sumar_total.await_args_list] == [1, 1]
+        assert _progreso_sumado(servicio._incrementar_progreso) == 2
+
+    async def test_productos_sin_url_no_se_encolan(self):
+        """Test que los productos sin URL no suman al total ni al progreso del enriquecimiento."""
+        servicio = self._servicio()
+        enriquecer = AsyncMock(return_value=("Cat", "779"))
+        sin_url = {"urlProducto": None, "arbolCategorias": None, "ean": None}
+        escritos = []
+
+        async with servicio._enriquecimiento_en_curso(
+            "tarea", self._contexto(), enriquecer, escritos.extend
+        ) as encolar:
+            await encolar([sin_url])
+
+        servicio._sumar_total.assert_not_awaited()
+        servicio._incrementar_progreso.assert_not_awaited()
+        enriquecer.assert_not_awaited()
+        assert escritos == [sin_url]
+
+    async def test_error_en_el_listado_cancela_el_enriquecimiento(self):
+        """Test que si falla el recorrido de listados no queda el enriquecimiento colgado."""
+        servicio = self._servicio()
+        enriquecer = AsyncMock()
+
+        with pytest.raises(RuntimeError):
+            async with servicio._enriquecimiento_en_curso("tarea", self._contexto(), enriquecer, MagicMock()):
+                raise RuntimeError("sin conexion")
+
+        assert all(t.done() for t in asyncio.all_tasks() if t is not asyncio.current_task())
+
+
+@pytest.mark.asyncio
+class TestRecorrerSellersEnParalelo:
+    """Tests para el metodo _recorrer_sellers_en_paralelo (async)."""
+
+    @staticmethod
+    def _contexto():
+        contexto = MagicMock()
+        contexto.new_page = AsyncMock(side_effect=lambda: MagicMock(close=AsyncMock()))
+        return contexto
+
+    async def test_sellers_en_paralelo_y_productos_en_orden(self):
+        """Test que recorre los sellers a la vez y devuelve los productos en el orden de la lista."""
+        contexto = self._contexto()
+        en_curso = 0
+        maximo = 0
+
+        async def recorrer(pagina, seller):
+            nonlocal en_curso, maximo
+            en_curso += 1
+            maximo = max(maximo, en_curso)
+            await asyncio.sleep(0.01 if seller == "a" else 0)
+            en_curso -= 1
+            return [{"seller": seller}]
+
+        productos = await SellersExternosService()._recorrer_sellers_en_paralelo(
+            contexto, MagicMock(), ["a", "b", "c"], recorrer
+        )
+
+        assert [p["seller"] for p in productos] == ["a", "b", "c"]
+        assert maximo == 3
+        assert contexto.new_page.await_count == 2
+
+    async def test_no_abre_mas_de_max_parallel_pages(self):
+        """Test que con mas sellers que paginas reutiliza el pool sin pasarse del maximo."""
+        contexto = self._contexto()
+        recorrer = AsyncMock(return_value=[])
+        sellers = [str(i) for i in range(SellersExternosService.MAX_PARALLEL_PAGES * 2)]
+
+        await SellersExternosService()._recorrer_sellers_en_paralelo(contexto, MagicMock(), sellers, recorrer)
+
+        assert contexto.new_page.await_count == SellersExternosService.MAX_PARALLEL_PAGES - 1
+        assert recorrer.await_count == len(sellers)
+
+    async def test_error_en_un_seller_cancela_los_demas(self):
+        """Test que si un seller falla se propaga el error y no quedan busquedas colgadas."""
+        async def recorrer(pagina, seller):
+            if seller == "roto":
+                raise RuntimeError("sin conexion")
+            await asyncio.sleep(10)
+
+        paginas = []
+        contexto = MagicMock()
+        contexto.new_page = AsyncMock(side_effect=lambda: paginas.append(MagicMock(close=AsyncMock())) or paginas[-1])
+        with pytest.raises(RuntimeError):
+            await SellersExternosService()._recorrer_sellers_en_paralelo(
+                contexto, MagicMock(), ["a", "roto"], recorrer
+            )
+
+        assert all(t.done() for t in asyncio.all_tasks() if t is not asyncio.current_task())
+        assert paginas and all(pagina.close.await_count == 1 for pagina in paginas)
@@ -0,0 +1,137 @@
+"""
+Tests para ReporteVtexService.
+"""
+import orjson
+import pandas as pd
+import pytest
+from asgiref.sync import sync_to_async
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+from core.models import TransaccionVtex
+from core.services.ReporteVtexService import ReporteVtexService
+
+
+def _pedido(order_id, sequence="1", estado="Facturado"):
+    """Helper para crear un pedido como lo devuelve la API de VTEX."""
+    return {
+        "orderId": order_id,
+        "sequence": sequence,
+        "creationDate": "2024-01-15T13:30:00.0000000+00:00",
+        "paymentNames": "Visa",
+        "statusDescription": estado,
+        "totalValue": 150050,
+        "items": [{"id": "1"}],
+    }
+
+
+def _respuesta(pedidos, paginas=1):
+    """Helper para crear un mock de respuesta de requests."""
+    response = MagicMock()
+    response.content = orjson.dumps({"list": pedidos, "paging": {"pages": paginas}})
+    return response
+
+
+@pytest.mark.asyncio
+class TestDescargarVtex:
+    """Tests para el metodo descargarVtex (async)."""
+
+    def setup_method(self):
+        """Setup para cada test."""
+        self.credenciales = MagicMock(app_key="key", app_token="token", account_name="cuenta")
+
+    async def test_elimina_duplicados_y_columnas_extra(self, tmp_path):
+        """Test que deduplica por orderId y conserva solo las columnas requeridas."""
+        service = ReporteVtexService(ruta_carpeta=str(tmp_path))
+        pedidos = [_pedido("A-01"), _pedido("B-01"), _pedido("A-01", estado="Cancelado")]
+
+        with patch.object(service._http, "get", return_value=_respuesta(pedidos)):
+            df = await service.descargarVtex("15/01/2024", "15/01/2024", self.credenciales, incluir_sellers=False)
+
+        assert sorted(df["orderId"]) == ["A-01", "B-01"]
+        assert df.loc[df["orderId"] == "A-01", "statusDescription"].item() == "Cancelado"
+        assert "items" not in df.columns
+        assert set(df["seller"]) == {"No consultado"}
+
+    async def test_asigna_sellers_por_pedido(self, tmp_path):
+        """Test que el seller de cada pedido se asigna en el mismo orden que los pedidos."""
+        service = ReporteVtexService(ruta_carpeta=str(tmp_path))
+        pedidos = [_pedido("A-01"), _pedido("B-01")]
+
+        async def sellers_fake(order_ids, url_base, headers):
+            return [f"Seller {order_id}" for order_id in order_ids]
+
+        with patch.object(service._http, "get", return_value=_respuesta(pedidos)), \
+                patch.object(service, "obtener_todos_sellers", side_effect=sellers_fake):
+            df = await service.descargarVtex("15/01/2024", "15/01/2024", self.credenciales)
+
+        assert dict(zip(df["orderId"], df["seller"])) == {"A-01": "Seller A-01", "B-01": "Seller B-01"}
+
+    async def test_no_vuelve_a_pedir_la_primera_pagina(self, tmp_path):
+        """Test que la pagina 1 del sondeo se reutiliza y no se vuelve a pedir."""
+        service = ReporteVtexService(ruta_carpeta=str(tmp_path))
+        respuestas = [_respuesta([_pedido("A-01")], paginas=2), _respuesta([_pedido("B-01")], paginas=2)]
+
+        with patch.object(service._http, "get", side_effect=respuestas) as mock_get:
+            df = await service.descargarVtex("15/01/2024", "15/01/2024", self.credenciales, incluir_sellers=False)
+
+        assert mock_get.call_count == 2
+        assert [llamada.kwargs["params"]["page"] for llamada in mock_get.call_args_list] == [1, 2]
+        assert sorted(df["orderId"]) == ["A-01", "B-01"]
+
+    async def test_sin_pedidos(self, tmp_path):
+        """Test que un intervalo sin pedidos devuelve un DataFrame vacio."""
+        service = ReporteVtexService(ruta_carpeta=str(tmp_path))
+
+        with patch.object(service._http, "get", return_value=_respuesta([], paginas=0)):
+            df = await service.descargarVtex("15/01/2024", "15/01/2024", self.credenciales, incluir_sellers=False)
+
+        assert df.empty
+
+
+class TestSesionHttp:
+    """Tests para la sesion HTTP del listado de pedidos."""
+
+    def test_reintentos_configurados_en_adapter(self, tmp_path):
+        """Test que la sesion reintenta 429/5xx respetando Retry-After."""
+        service = ReporteVtexService(ruta_carpeta=str(tmp_path))
+        retry = service._http.get_adapter("https://cuenta.vtexcommercestable.com.br").max_retries
+
+        assert retry.total == 3
+        assert 429 in retry.status_forcelist
+        assert retry.respect_retry_after_header is True
+
+
+@pytest.mark.asyncio
+class TestGuardarTransacciones:
+    """Tests para el metodo guardar_transacciones (async)."""
+
+    @pytest.mark.django_db(transaction=True)
+    async def test_guardar_transacciones(self, reporte_vtex, tmp_path):
+        """Test que parsea fechas y valores de toda la columna y guarda en BD."""
+        service = ReporteVtexService(ruta_carpeta=str(tmp_path))
+        df = pd.DataFrame([
+            {**_pedido("A-01"), "seller": "Carrefour"},
+            {**_pedido("B-01"), "seller": "Carrefour", "totalValue": None},
+        ])
+
+        cantidad = await service.guardar_transacciones(df, reporte_vtex)
+
+        assert cantidad == 2
+        transacciones = await sync_to_async(list)(
+            TransaccionVtex.objects.filter(reporte=reporte_vtex).order_by("numero_pedido")
+        )
+        assert transacciones[0].fecha_hora == datetime(2024, 1, 15, 13, 30, tzinfo=timezone.utc)
+        assert transacciones[0].valor == Decimal("1500.50")
+        assert transacciones[1].valor is None
+
+    @pytest.mark.django_db(transaction=True)
+    async def test_descarta_fechas_invalidas(self, reporte_vtex, tmp_path):
+        """Test que las filas con fecha no parseable se descartan."""
+        service = ReporteVtexService(ruta_carpeta=str(tmp_path))
+        df = pd.DataFrame([_pedido("A-01"), {**_pedido("B-01"), "creationDate": "no-es-fecha"}])
+
+        cantidad = await service.guardar_transacciones(df, reporte_vtex)
+
+        assert cantidad == 1
@@ -0,0 +1,289 @@
+"""
+Tests para las tareas de Django-Q.
+"""
+import asyncio
+import io
+import logging
+import os
+import threading
+
+import pytest
+import urllib3
+from asgiref.sync import sync_to_async
+from unittest.mock import MagicMock, patch
+
+from core import tasks
+from core.models import Cruce, ReporteJanis, ReportePayway, ReporteVtex, TareaCatalogacion
+
+
+@pytest.fixture
+def loop_worker_limpio():
+    """
+    Arranca sin loop de worker y cierra el que haya creado el test. El cierre
+    de conexiones se anula: estos tests no usan la base.
+    """
+    with patch.object(tasks, "_loop_worker", threading.local()), \
+            patch.object(tasks, "close_old_connections"):
+        yield
+        loop = getattr(tasks._loop_worker, "loop", None)
+        if loop is not None:
+            loop.close()
+
+
+@pytest.mark.usefixtures("loop_worker_limpio")
+class TestEjecutarAsync:
+    """Tests para _ejecutar_async y el loop del worker."""
+
+    def test_reutiliza_el_loop_entre_tareas(self):
+        """Test que dos tareas seguidas corren en el mismo event loop y devuelven su resultado."""
+        async def sumar(a, b=0):
+            return a + b
+
+        assert tasks._ejecutar_async(sumar, 1, b=2) == 3
+        loop = tasks._loop_worker.loop
+        assert tasks._ejecutar_async(sumar, 5) == 5
+        assert tasks._loop_worker.loop is loop
+        assert not loop.is_closed()
+
+    def test_to_thread_usa_el_executor_compartido(self):
+        """Test que asyncio.to_thread dentro de una tarea corre en los hilos del worker."""
+        async def nombre_hilo():
+            return await asyncio.to_thread(lambda: threading.current_thread().name)
+
+        assert tasks._ejecutar_async(nombre_hilo).startswith("qtask-io")
+
+    @pytest.mark.parametrize("falla", [False, True])
+    def test_cierra_conexiones_en_el_hilo_del_orm(self, falla):
+        """Test que close_old_connections corre antes y despues de la tarea, en el hilo de sync_to_async."""
+        hilos_cierre = []
+
+        async def tarea():
+            hilo_orm = await sync_to_async(threading.get_ident)()
+            if falla:
+                raise RuntimeError(hilo_orm)
+            return hilo_orm
+
+        with patch.object(tasks, "close_old_connections", lambda: hilos_cierre.append(threading.get_ident())):
+            if falla:
+                with pytest.raises(RuntimeError) as error:
+                    tasks._ejecutar_async(tarea)
+                hilo_orm = error.value.args[0]
+            else:
+                hilo_orm = tasks._ejecutar_async(tarea)
+
+        assert hilos_cierre == [hilo_orm, hilo_orm]
+        assert hilo_orm != threading.get_ident()
+
+    def test_crea_otro_loop_en_un_proceso_forkeado(self):
+        """Test que un PID distinto al que creo el loop arma uno nuevo."""
+        primero = tasks._obtener_loop_worker()
+
+        with patch.object(tasks.os, "getpid", return_value=tasks._loop_worker.pid + 1):
+            segundo = tasks._obtener_loop_worker()
+
+        assert segundo is not primero
+        primero.close()
+
+    def test_cada_hilo_usa_su_propio_loop(self):
+        """Test que un segundo hilo no reutiliza ni reemplaza el loop del primero."""
+        primero = tasks._obtener_loop_worker()
+        otros = []
+
+        def en_otro_hilo():
+            otros.append(tasks._obtener_loop_worker())
+            otros[0].close()
+
+        hilo = threading.Thread(target=en_otro_hilo)
+        hilo.start()
+        hilo.join()
+
+        assert otros[0] is not primero
+        assert tasks._obtener_loop_worker() is primero
+
+    def test_llamada_con_el_loop_corriendo_falla(self):
+        """Test que llamar desde una corrutina del loop del worker da un error claro."""
+        async def anidada():
+            return 1
+
+        async def tarea():
+            tasks._ejecutar_async(anidada)
+
+        with pytest.raises(RuntimeError, match="await"):
+            tasks._ejecutar_async(tarea)
+
+
+class TestObtenerSesionHttp:
+    """Tests para la sesion HTTP compartida del worker."""
+
+    def test_reutiliza_la_sesion_en_el_mismo_proceso(self):
+        """Test que las tareas de un mismo proceso comparten la sesion y sus reintentos."""
+        sesion = tasks._obtener_sesion_http()
+
+        assert tasks._obtener_sesion_http() is sesion
+        assert sesion.get_adapter("https://oms.janis.in").max_retries.total == 3
+
+    def test_crea_otra_sesion_en_un_proceso_forkeado(self):
+        """Test que un PID distinto al que creo la sesion arma una nueva."""
+        primera = tasks._obtener_sesion_http()
+
+        with patch.object(tasks.os, "getpid", return_value=tasks._pid_sesion_http_worker + 1):
+            segunda = tasks._obtener_sesion_http()
+
+        assert segunda is not primera
+
+    def test_sin_reintentos_es_otra_sesion(self):
+        """Test que la sesion sin reintentos (Janis, modal) es otra y no reintenta ante 5xx."""
+        sin_reintentos = tasks._obtener_sesion_http(reintentar=False)
+
+        assert sin_reintentos is not tasks._obtener_sesion_http()
+        assert tasks._obtener_sesion_http(reintentar=False) is sin_reintentos
+        assert sin_reintentos.get_adapter("https://oms.janis.in").max_retries.total == 0
+
+
+class TestRegistrarTarea:
+    """Tests para el registro unico por tarea."""
+
+    def test_un_solo_registro_al_terminar(self, caplog):
+        """Test que una tarea exitosa deja un unico registro con la duracion."""
+        with caplog.at_level(logging.INFO, logger=tasks.logger.name):
+            with tasks._registrar_tarea("Prueba #1"):
+                pass
+
+        assert len(caplog.records) == 1
+        assert caplog.records[0].levelno == logging.INFO
+        assert "Prueba #1 finalizada en" in caplog.records[0].getMessage()
+
+    def test_error_se_registra_y_se_relanza(self, caplog):
+        """Test que un error se registra una vez con traceback y se vuelve a lanzar."""
+        with caplog.at_level(logging.INFO, logger=tasks.logger.name), pytest.raises(ValueError):
+            with tasks._registrar_tarea("Prueba #2"):
+                raise ValueError("sin credenciales")
+
+        assert len(caplog.records) == 1
+        assert caplog.records[0].levelno == logging.ERROR
+        assert caplog.records[0].exc_info is not None
+        assert "sin credenciales" in caplog.records[0].getMessage()
+
+
+class TestGenerarReporte:
+    """Tests para el despachador _generar_reporte."""
+
+    @staticmethod
+    def _generar(tipo, modelo, reporte_id, ruta_carpeta=None):
+        """Corre la tarea con el servicio de *tipo* mockeado y devuelve (resultado, servicio, ejecutar)."""
+        servicio = MagicMock()
+        carpeta, nombre, reintentar_http = tasks._REPORTES[tipo][2:]
+        with patch.dict(tasks._REPORTES, {tipo: (modelo, servicio, carpeta, nombre, reintentar_http)}), \
+                patch.object(tasks, "_ejecutar_async") as ejecutar:
+            resultado = tasks._generar_reporte(tipo, "01/12/2024", "10/12/2024", reporte_id, ruta_carpeta)
+        return resultado, servicio, ejecutar
+
+    @pytest.mark.django_db
+    def test_vtex_recibe_el_id_y_la_carpeta_por_defecto(
+        self, reporte_vtex, settings, tmp_path, django_assert_num_queries
+    ):
+        """Test que arma la carpeta en MEDIA_ROOT y le pasa el ID al servicio con una sola consulta."""
+        settings.MEDIA_ROOT = str(tmp_path)
+
+        with django_assert_num_queries(1):
+            resultado, servicio, ejecutar = self._generar("vtex", ReporteVtex, reporte_vtex.id)
+
+        assert resultado == reporte_vtex.id
+        servicio.assert_called_once_with(
+            ruta_carpeta=os.path.join(str(tmp_path), "reportes_vtex"), sesion_http=tasks._obtener_sesion_http()
+        )
+        ejecutar.assert_called_once_with(
+            servicio.return_value.generar_reporte, "01/12/2024", "10/12/2024", reporte_vtex.id
+        )
+
+    @pytest.mark.django_db
+    def test_janis_recibe_la_sesion_sin_reintentos(self, reporte_janis, tmp_path):
+        """Test que Janis usa la sesion del worker que no reintenta ante 429/5xx."""
+        _, servicio, _ = self._generar("janis", ReporteJanis, reporte_janis.id, str(tmp_path))
+
+        servicio.assert_called_once_with(
+            ruta_carpeta=str(tmp_path), sesion_http=tasks._obtener_sesion_http(reintentar=False)
+        )
+
+    @pytest.mark.django_db
+    def test_payway_recibe_el_id(self, reporte_payway, tmp_path):
+        """Test que el servicio de Payway recibe el ID, como el resto, y respeta la ruta indicada."""
+        resultado, servicio, ejecutar = self._generar("payway", ReportePayway, reporte_payway.id, str(tmp_path))
+
+        assert resultado == reporte_payway.id
+        servicio.assert_called_once_with(ruta_carpeta=str(tmp_path))
+        ejecutar.assert_called_once_with(
+            servicio.return_value.generar_reporte, "01/12/2024", "10/12/2024", reporte_payway.id
+        )
+
+    @pytest.mark.django_db
+    def test_reporte_inexistente_no_llama_al_servicio(self):
+        """Test que un ID inexistente termina la tarea sin llamar al servicio."""
+        resultado, servicio, ejecutar = self._generar("payway", ReportePayway, 999)
+
+        assert resultado == 999
+        servicio.assert_not_called()
+        ejecutar.assert_not_called()
+
+    @pytest.mark.django_db
+    def test_reporte_completado_no_se_regenera(self, reporte_vtex):
+        """Test que un reporte ya COMPLETADO no vuelve a generarse."""
+        ReporteVtex.objects.filter(id=reporte_vtex.id).update(estado=ReporteVtex.Estado.COMPLETADO)
+
+        resultado, servicio, ejecutar = self._generar("vtex", ReporteVtex, reporte_vtex.id)
+
+        assert resultado == reporte_vtex.id
+        ejecutar.assert_not_called()
+
+
+class TestGenerarCruceAsync:
+    """Tests para la tarea generar_cruce_async."""
+
+    @pytest.mark.django_db
+    @pytest.mark.parametrize("estado, ejecuta", [(Cruce.Estado.PENDIENTE, True), (Cruce.Estado.COMPLETADO, False)])
+    def test_solo_genera_cruces_sin_completar(self, cruce, estado, ejecuta):
+        """Test que la tarea se omite si el cruce ya esta COMPLETADO."""
+        Cruce.objects.filter(id=cruce.id).update(estado=estado)
+
+        with patch.object(tasks, "_ejecutar_async") as ejecutar:
+            assert tasks.generar_cruce_async(cruce.id) == cruce.id
+
+        assert ejecutar.called is ejecuta
+
+
+class TestActualizarModalAsync:
+    """Tests para la tarea actualizar_modal_async."""
+
+    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.usefixtures("loop_worker_limpio")
+    def test_http_5xx_queda_en_el_resultado_del_sku(self, tarea_catalogacion, usuario_vtex, settings, tmp_path):
+        """Test que un 503 de VTEX se registra como error del SKU, sin reintentos ni RetryError."""
+        settings.MEDIA_ROOT = str(tmp_path)
+        respuesta = urllib3.HTTPResponse(body=io.BytesIO(b""), status=503, preload_content=False)
+
+        with patch.object(urllib3.connectionpool.HTTPConnectionPool, "_make_request", return_value=respuesta) as make, \
+                patch("core.services.ActualizarModalService.pd.DataFrame") as dataframe:
+            tasks.actualizar_modal_async(tarea_catalogacion.id, [{"skuid": 7, "modal": "Frio"}])
+
+        assert make.call_count == 1
+        assert dataframe.call_args.args[0] == [{
+            "skuid": 7, "modal_anterior": "ERROR", "modal_nuevo": "Frio", "estado": "Error GET: HTTP 503"
+        }]
+        tarea_catalogacion.refresh_from_db()
+        assert tarea_catalogacion.estado == TareaCatalogacion.Estado.COMPLETADO
+
+
+class TestBusquedaEansAsync:
+    """Tests para la tarea busqueda_eans_async."""
+
+    @pytest.mark.django_db
+    @pytest.mark.parametrize("pedidos, efectivos", [(2, 2), (50, 4), (0, 3)])
+    def test_acota_los_workers_con_los_settings(self, tarea_catalogacion, settings, pedidos, efectivos):
+        """Test que la cantidad de workers pedida se acota al maximo configurado."""
+        settings.CARREFOUR_EAN_WORKERS = 3
+        settings.CARREFOUR_EAN_WORKERS_MAX = 4
+
+        with patch.object(tasks, "_ejecutar_async") as ejecutar:
+            tasks.busqueda_eans_async(tarea_catalogacion.id, ["779"], "Calle 1", "retiro", pedidos)
+
+        assert ejecutar.call_args.args[5] == efectivos
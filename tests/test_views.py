@@ -4,14 +4,16 @@ Tests para las vistas de Django.
 import pytest
 from datetime import date, timedelta
 from django.test import Client
-from django.urls import reverse
+from django.urls import reverse, set_script_prefix
 from unittest.mock import patch, MagicMock
 
 from core.models import (
     ReportePayway, ReporteVtex, ReporteCDP, ReporteJanis, Cruce,
     TransaccionPayway, TransaccionVtex, TransaccionCDP, TransaccionJanis,
-    TransaccionCruce, UsuarioPayway, UsuarioCDP
+    TransaccionCruce, UsuarioPayway, UsuarioCDP, TareaCatalogacion, FiltroReporteVtex
 )
+from core.tasks import generar_reporte_payway_async
+from core.templatetags.url_cache import url_cacheada
 
 
 @pytest.fixture
@@ -119,6 +121,56 @@ class TestReporteVtexViews:
         response = client.get(reverse('lista_reportes_vtex'))
         assert response.status_code == 200
 
+    def test_lista_reportes_vtex_links_por_fila(self, client, reporte_vtex):
+        """Test que los links de cada fila (cacheados) apuntan a las rutas del reporte."""
+        response = client.get(reverse('lista_reportes_vtex'))
+
+        contenido = response.content.decode()
+        assert reverse('detalle_reporte_vtex', kwargs={'pk': reporte_vtex.pk}) in contenido
+        assert reverse('eliminar_reporte_vtex', kwargs={'pk': reporte_vtex.pk}) in contenido
+
+    def test_url_cacheada_respeta_el_prefijo_de_script(self, reporte_vtex):
+        """Test que la misma ruta se cachea por separado para cada SCRIPT_NAME."""
+        pk = reporte_vtex.pk
+        sin_prefijo = url_cacheada('detalle_reporte_vtex', pk)
+
+        set_script_prefix('/app/')
+        try:
+            con_prefijo = url_cacheada('detalle_reporte_vtex', pk)
+        finally:
+            set_script_prefix('/')
+
+        assert con_prefijo == '/app' + sin_prefijo
+        assert url_cacheada('detalle_reporte_vtex', pk) == sin_prefijo
+
+    def test_lista_reportes_vtex_filtros_sin_n_mas_1(
+        self, client, reporte_vtex, valor_filtro_facturado, valor_filtro_cancelado, django_assert_num_queries
+    ):
+        """Test que los filtros de cada fila se traen en una consulta, sin importar cuantos reportes haya."""
+        for _ in range(3):
+            reporte = ReporteVtex.objects.create(fecha_inicio=date.today(), fecha_fin=date.today())
+            for valor in (valor_filtro_facturado, valor_filtro_cancelado):
+                FiltroReporteVtex.objects.create(reporte=reporte, tipo_filtro=valor.tipo_filtro, valor_filtro=valor)
+
+        # count de la paginacion + reportes + filtros (con tipo y valor)
+        with django_assert_num_queries(3):
+            response = client.get(reverse('lista_reportes_vtex'))
+
+        assert valor_filtro_cancelado.nombre in response.content.decode()
+
+    def test_detalle_reporte_vtex_consultas_fijas(
+        self, client, reporte_vtex, valor_filtro_facturado, transaccion_vtex, django_assert_num_queries
+    ):
+        """Test que el detalle usa un numero fijo de consultas: reporte, filtros, count y pagina."""
+        FiltroReporteVtex.objects.create(
+            reporte=reporte_vtex, tipo_filtro=valor_filtro_facturado.tipo_filtro, valor_filtro=valor_filtro_facturado
+        )
+
+        with django_assert_num_queries(4):
+            response = client.get(reverse('detalle_reporte_vtex', kwargs={'pk': reporte_vtex.pk}))
+
+        assert valor_filtro_facturado.nombre in response.content.decode()
+
     def test_detalle_reporte_vtex(self, client, reporte_vtex):
         """Test detalle de reporte VTEX."""
         response = client.get(
@@ -237,6 +289,21 @@ class TestCruceViews:
         assert not Cruce.objects.filter(pk=pk).exists()
 
 
+class TestTareaCatalogacionViews:
+    """Tests para las vistas de tareas de catalogacion."""
+
+    def test_lista_tareas_no_trae_los_logs(self, client, tarea_catalogacion):
+        """Test que el listado no carga los logs de las tareas."""
+        tarea_catalogacion.agregar_log("linea de log")
+
+        response = client.get(reverse('lista_tareas_catalogacion'))
+
+        assert response.status_code == 200
+        tareas = list(response.context['object_list'])
+        assert [t.id for t in tareas] == [tarea_catalogacion.id]
+        assert tareas[0].get_deferred_fields() == {'logs'}
+
+
 class TestAjustesView:
     """Tests para la vista de ajustes."""
 
@@ -302,7 +369,8 @@ class TestRetryViews:
         assert response.status_code == 302
         reporte.refresh_from_db()
         assert reporte.estado == 'PENDIENTE'
-        mock_async_task.assert_called_once()
+        fecha = hoy.strftime('%d/%m/%Y')
+        mock_async_task.assert_called_once_with(generar_reporte_payway_async, fecha, fecha, reporte.id)
 
     @patch('core.views.async_task')
     def test_reintentar_reporte_vtex(self, mock_async_task, client, db):